@@ -0,0 +1,237 @@
+import csv
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, TypedDict
+
+from loguru import logger
+
+from shutterscout_ai.tools.combined import codec
+
+JOB_STATES = ("pending", "running", "done", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    spec TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    result BLOB,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, id);
+"""
+
+
+class JobSpec(TypedDict, total=False):
+    """Location to scout; either coordinates, a place name, or both"""
+
+    latitude: float
+    longitude: float
+    place_name: str
+    custom_prompt: str
+
+
+class Job(TypedDict):
+    id: int
+    key: str
+    spec: JobSpec
+    attempts: int
+
+
+def job_key(spec: JobSpec) -> str:
+    """Identity of a job, so enqueueing the same location twice is a no-op"""
+    latitude, longitude = spec.get("latitude"), spec.get("longitude")
+    coordinates = f"{latitude:.5f},{longitude:.5f}" if latitude is not None and longitude is not None else ","
+    return f"{coordinates}|{spec.get('place_name', '').strip().casefold()}|{spec.get('custom_prompt', '')}"
+
+
+class JobQueue:
+    """
+    Durable job queue in a SQLite database. Every state change is committed before it is acted on,
+    so a run that is killed can be resumed from the same file: finished jobs stay finished, and jobs
+    that were running are handed out again once their lease expires.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 900.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent claimers never hand out the same job
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def enqueue(self, specs: Iterable[JobSpec]) -> int:
+        """
+        Add jobs, skipping any already in the queue in whatever state.
+
+        Returns:
+            Number of jobs added
+        """
+        now = time.time()
+        rows = [(job_key(spec), json.dumps(spec), now) for spec in specs]
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany("INSERT OR IGNORE INTO jobs (key, spec, created_at) VALUES (?, ?, ?)", rows)
+            return connection.total_changes - before
+
+    def claim(self, worker: str, limit: int = 1) -> List[Job]:
+        """Lease up to limit pending jobs, or running jobs whose lease ran out, to a worker"""
+        now = time.time()
+        with self._transaction() as connection:
+            rows = connection.execute(
+                "SELECT id, key, spec, attempts FROM jobs "
+                "WHERE state = 'pending' OR (state = 'running' AND lease_expires < ?) ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE jobs SET state = 'running', worker = ?, lease_expires = ?, started_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                [(worker, now + self.lease_seconds, now, row[0]) for row in rows],
+            )
+        return [{"id": row[0], "key": row[1], "spec": json.loads(row[2]), "attempts": row[3] + 1} for row in rows]
+
+    def complete(self, job_id: int, result: Any) -> None:
+        """Mark a job done; the result is stored in the compact combined data encoding"""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET state = 'done', result = ?, error = NULL, lease_expires = NULL, finished_at = ? "
+                "WHERE id = ?",
+                (codec.encode(result), time.time(), job_id),
+            )
+
+    def fail(self, job_id: int, error: str, max_attempts: int = 3) -> str:
+        """
+        Record a failed attempt. The job goes back to pending until it has used up max_attempts.
+
+        Returns:
+            The job's new state
+        """
+        with self._transaction() as connection:
+            (attempts,) = connection.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            state = "failed" if attempts >= max_attempts else "pending"
+            connection.execute(
+                "UPDATE jobs SET state = ?, error = ?, lease_expires = NULL, finished_at = ? WHERE id = ?",
+                (state, error, time.time(), job_id),
+            )
+        return state
+
+    def release(self, job_id: int) -> None:
+        """Put a running job back without counting the attempt, e.g. when the provider quota ran out"""
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET state = 'pending', lease_expires = NULL, attempts = MAX(attempts - 1, 0) "
+                "WHERE id = ? AND state = 'running'",
+                (job_id,),
+            )
+
+    def requeue_running(self) -> int:
+        """Return every running job to pending; only safe when no other process works on this queue"""
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.execute(
+                "UPDATE jobs SET state = 'pending', lease_expires = NULL, attempts = MAX(attempts - 1, 0) "
+                "WHERE state = 'running'"
+            )
+            return connection.total_changes - before
+
+    def retry_failed(self) -> int:
+        """Give failed jobs a fresh set of attempts"""
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.execute("UPDATE jobs SET state = 'pending', attempts = 0 WHERE state = 'failed'")
+            return connection.total_changes - before
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per state"""
+        with self._lock:
+            rows = self._connection.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall()
+        counts = dict.fromkeys(JOB_STATES, 0)
+        counts.update(dict(rows))
+        return counts
+
+    def results(self, include_failed: bool = False, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Finished jobs in queue order with their spec and result (or error), read a page at a time"""
+        states = ("done", "failed") if include_failed else ("done",)
+        placeholders = ", ".join("?" for _ in states)
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT id, spec, state, result, error FROM jobs WHERE state IN ({placeholders}) AND id > ? "
+                    "ORDER BY id LIMIT ?",
+                    (*states, last_id, page_size),
+                ).fetchall()
+            if not rows:
+                return
+            for job_id, spec, state, result, error in rows:
+                # Queues written before results were encoded hold them as JSON text
+                if isinstance(result, bytes):
+                    result = codec.decode(result)
+                elif result is not None:
+                    result = json.loads(result)
+                yield {
+                    "id": job_id,
+                    "spec": json.loads(spec),
+                    "state": state,
+                    "result": result,
+                    "error": error,
+                }
+            last_id = rows[-1][0]
+
+
+def load_specs(path: str) -> List[JobSpec]:
+    """
+    Read locations to scout from a CSV file with latitude, longitude and/or place columns,
+    or a JSON Lines file with JobSpec objects.
+
+    Raises:
+        ValueError: If a row has neither coordinates nor a place name
+    """
+    specs: List[JobSpec] = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".jsonl", ".ndjson"):
+            rows: Iterable[Dict[str, Any]] = (json.loads(line) for line in f if line.strip())
+        else:
+            rows = csv.DictReader(f)
+        for number, row in enumerate(rows, start=1):
+            spec: JobSpec = {}
+            latitude, longitude = row.get("latitude"), row.get("longitude")
+            if latitude not in (None, "") and longitude not in (None, ""):
+                spec["latitude"] = float(latitude)
+                spec["longitude"] = float(longitude)
+            place_name = (row.get("place_name") or row.get("place") or "").strip()
+            if place_name:
+                spec["place_name"] = place_name
+            if row.get("custom_prompt"):
+                spec["custom_prompt"] = row["custom_prompt"]
+            if "latitude" not in spec and "place_name" not in spec:
+                logger.error(f"{path}: row {number} has no coordinates or place name")
+                raise ValueError(f"{path}: row {number} has no coordinates or place name")
+            specs.append(spec)
+    return specs
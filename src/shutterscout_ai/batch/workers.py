@@ -0,0 +1,268 @@
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Optional, TypedDict
+
+from loguru import logger
+from smolagents import Model
+
+from shutterscout_ai.batch.jobs import Job, JobQueue, JobSpec
+from shutterscout_ai.core.shutterscout_agent import get_location_recommendations
+from shutterscout_ai.tools.combined.combiner import get_combined_data
+from shutterscout_ai.utils.instrumentation import (
+    BATCH_IN_FLIGHT,
+    BATCH_JOB_DURATION_MS,
+    BATCH_JOBS_TOTAL,
+    increment,
+    observe,
+)
+
+DEFAULT_MODEL_ID = "meta-llama/Llama-3.3-70B-Instruct"
+IN_FLIGHT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class JobOutcome(TypedDict):
+    """What a worker reports back for one job"""
+
+    job_id: int
+    ok: bool
+    result: Optional[Dict[str, Any]]
+    error: str
+    quota_exhausted: bool
+    duration_ms: float
+
+
+class BatchStats(TypedDict):
+    """Summary of one batch run"""
+
+    processed: int
+    succeeded: int
+    failed: int
+    retried: int
+    requeued: int
+    elapsed_seconds: float
+    jobs_per_second: float
+    peak_in_flight: int
+    stopped: str
+    remaining: Dict[str, int]
+
+
+def is_quota_error(error: BaseException) -> bool:
+    """
+    Whether an error, or one it was raised from, is a 429 Too Many Requests response: the provider quota
+    is used up and retrying other jobs would fail the same way. HTTP errors from requests and from the
+    model client both carry the response they were raised for.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        response = getattr(current, "response", None)
+        if getattr(response, "status_code", None) == HTTPStatus.TOO_MANY_REQUESTS:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+def run_job(
+    job_id: int,
+    spec: JobSpec,
+    combined_only: bool = False,
+    model_id: str = DEFAULT_MODEL_ID,
+    model_factory: Optional[Callable[[], Model]] = None,
+    sectioned: bool = False,
+) -> JobOutcome:
+    """
+    Scout one location: fetch the combined data once, then have the agent analyze that same data.
+    Runs in a worker process, so it never raises; failures are reported in the outcome.
+    """
+    start = time.perf_counter()
+    try:
+        combined = get_combined_data(
+            latitude=spec.get("latitude"), longitude=spec.get("longitude"), place_name=spec.get("place_name", "")
+        )
+        result: Dict[str, Any] = {"combined": combined}
+        if not combined_only:
+            result["recommendations"] = get_location_recommendations(
+                custom_prompt=spec.get("custom_prompt", ""),
+                model_id=model_id,
+                model=model_factory() if model_factory is not None and not sectioned else None,
+                latitude=spec.get("latitude"),
+                longitude=spec.get("longitude"),
+                place_name=spec.get("place_name", ""),
+                combined_data=combined,
+                sectioned=sectioned,
+                model_factory=model_factory if sectioned else None,
+            )
+        return {
+            "job_id": job_id,
+            "ok": True,
+            "result": result,
+            "error": "",
+            "quota_exhausted": False,
+            "duration_ms": (time.perf_counter() - start) * 1000.0,
+        }
+    except Exception as e:
+        return {
+            "job_id": job_id,
+            "ok": False,
+            "result": None,
+            "error": str(e),
+            "quota_exhausted": is_quota_error(e),
+            "duration_ms": (time.perf_counter() - start) * 1000.0,
+        }
+
+
+def run_batch(
+    queue: JobQueue,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    max_attempts: int = 3,
+    combined_only: bool = False,
+    model_id: str = DEFAULT_MODEL_ID,
+    model_factory: Optional[Callable[[], Model]] = None,
+    limit: Optional[int] = None,
+    recover: bool = False,
+    progress_interval: float = 10.0,
+    sectioned: bool = False,
+) -> BatchStats:
+    """
+    Work through the queue with a pool of worker processes until it is drained, the limit is reached,
+    or a provider reports its quota is used up. Only this process touches the database: it leases jobs,
+    hands them to the pool and checkpoints every result as soon as it arrives.
+
+    Args:
+        queue: Queue to work on
+        workers: Worker processes (default one per CPU); 0 runs jobs one at a time in this process
+        max_in_flight: Jobs handed to the pool at once (default twice the workers); bounds memory and
+            the number of jobs to redo after a crash
+        max_attempts: Attempts per job before it is marked failed
+        combined_only: Only collect combined data, without the agent's recommendations
+        model_id: Model for the recommendations
+        model_factory: Picklable callable building the model in the worker, e.g. a stub model class
+        limit: Stop after dispatching this many jobs
+        recover: Return jobs left running by an earlier, interrupted run to the queue first, rather than
+            waiting for their leases to expire; only safe when no other run works on this queue
+        progress_interval: Seconds between progress log lines
+        sectioned: Write each report as concurrently generated sections
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    max_in_flight = max_in_flight or max(1, 2 * max(workers, 1))
+    worker_name = f"{socket.gethostname()}:{os.getpid()}"
+    if recover:
+        recovered = queue.requeue_running()
+        if recovered:
+            logger.info(f"Resuming: {recovered} interrupted jobs returned to the queue")
+
+    stats: BatchStats = {
+        "processed": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "retried": 0,
+        "requeued": 0,
+        "elapsed_seconds": 0.0,
+        "jobs_per_second": 0.0,
+        "peak_in_flight": 0,
+        "stopped": "drained",
+        "remaining": {},
+    }
+    executor: Executor = ProcessPoolExecutor(max_workers=workers) if workers > 0 else ThreadPoolExecutor(max_workers=1)
+    in_flight: Dict[Future, Job] = {}
+    dispatched = 0
+    stopping = False
+    start = last_progress = time.perf_counter()
+    logger.info(f"Batch run started with {workers} workers, up to {max_in_flight} jobs in flight")
+
+    try:
+        while True:
+            # Backpressure: only lease as many jobs as there are free in-flight slots
+            capacity = max_in_flight - len(in_flight)
+            if limit is not None:
+                capacity = min(capacity, limit - dispatched)
+            if not stopping and capacity > 0:
+                for job in queue.claim(worker_name, capacity):
+                    future = executor.submit(
+                        run_job, job["id"], job["spec"], combined_only, model_id, model_factory, sectioned
+                    )
+                    in_flight[future] = job
+                    dispatched += 1
+                observe(BATCH_IN_FLIGHT, len(in_flight), IN_FLIGHT_BUCKETS)
+                stats["peak_in_flight"] = max(stats["peak_in_flight"], len(in_flight))
+
+            if not in_flight:
+                if limit is not None and dispatched >= limit:
+                    stats["stopped"] = "limit"
+                break
+
+            done, _ = wait(in_flight, timeout=progress_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                outcome = future.result()
+                if _checkpoint(queue, job, outcome, max_attempts, stats):
+                    if not stopping:
+                        logger.warning("Provider quota exhausted, finishing in-flight jobs and stopping")
+                    stopping = True
+                    stats["stopped"] = "quota"
+
+            now = time.perf_counter()
+            if now - last_progress >= progress_interval:
+                last_progress = now
+                rate = stats["processed"] / (now - start)
+                logger.info(
+                    f"Batch progress: {stats['succeeded']} done, {stats['failed']} failed, "
+                    f"{len(in_flight)} in flight, {rate:.2f} jobs/s"
+                )
+    except KeyboardInterrupt:
+        stats["stopped"] = "interrupted"
+        for job in in_flight.values():
+            queue.release(job["id"])
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning(f"Batch run interrupted, {len(in_flight)} in-flight jobs returned to the queue")
+    except BrokenProcessPool as e:
+        # A worker died outright (e.g. out of memory); its jobs are retried on the next run
+        for job in in_flight.values():
+            queue.release(job["id"])
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.error(f"Batch worker process died: {str(e)}")
+        raise RuntimeError(f"Batch worker process died: {str(e)}") from e
+    else:
+        executor.shutdown()
+
+    stats["elapsed_seconds"] = time.perf_counter() - start
+    stats["jobs_per_second"] = stats["processed"] / stats["elapsed_seconds"] if stats["elapsed_seconds"] else 0.0
+    stats["remaining"] = queue.counts()
+    logger.info(
+        f"Batch run {stats['stopped']}: {stats['succeeded']} done, {stats['failed']} failed, "
+        f"{stats['retried']} retried in {stats['elapsed_seconds']:.1f}s ({stats['jobs_per_second']:.2f} jobs/s)"
+    )
+    return stats
+
+
+def _checkpoint(queue: JobQueue, job: Job, outcome: JobOutcome, max_attempts: int, stats: BatchStats) -> bool:
+    """Store a job's outcome; returns True when the outcome means the provider quota ran out"""
+    observe(BATCH_JOB_DURATION_MS, outcome["duration_ms"])
+    if outcome["ok"]:
+        queue.complete(job["id"], outcome["result"])
+        stats["processed"] += 1
+        stats["succeeded"] += 1
+        increment(BATCH_JOBS_TOTAL, outcome="done")
+        return False
+    if outcome["quota_exhausted"]:
+        queue.release(job["id"])
+        stats["requeued"] += 1
+        increment(BATCH_JOBS_TOTAL, outcome="requeued")
+        return True
+
+    state = queue.fail(job["id"], outcome["error"], max_attempts=max_attempts)
+    if state == "failed":
+        stats["processed"] += 1
+        stats["failed"] += 1
+        logger.error(f"Job {job['id']} failed after {job['attempts']} attempts: {outcome['error']}")
+    else:
+        stats["retried"] += 1
+        logger.warning(f"Job {job['id']} attempt {job['attempts']} failed, will retry: {outcome['error']}")
+    increment(BATCH_JOBS_TOTAL, outcome=state if state == "failed" else "retried")
+    return False
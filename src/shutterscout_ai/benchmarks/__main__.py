@@ -0,0 +1,71 @@
+import argparse
+import sys
+
+from loguru import logger
+
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.benchmarks.pipeline import pipeline_cases, select_cases
+from shutterscout_ai.benchmarks.results import compare_results, format_results, load_results, save_results
+from shutterscout_ai.benchmarks.runner import run_case
+
+
+def main() -> int:
+    """Run the benchmark suite against replayed provider fixtures"""
+    parser = argparse.ArgumentParser(description="ShutterScout AI - Benchmark suite")
+    parser.add_argument("--iterations", type=int, default=20, help="Measured calls per case (default: 20)")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 8],
+        help="Concurrency levels to run every case at (default: 1 8)",
+    )
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for the simulated provider latency, 0 to measure pure CPU cost (default: 1.0)",
+    )
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Simulated stub model latency")
+    parser.add_argument("--case", action="append", default=[], help="Only run cases containing this substring")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Results file from an earlier commit to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=10.0, help="Allowed regression in percent before failing (default: 10)"
+    )
+    args = parser.parse_args()
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = []
+    with replay_providers(latency_scale=args.latency_scale):
+        cases = select_cases(pipeline_cases(model_latency_ms=args.model_latency_ms), args.case)
+        for concurrency in args.concurrency:
+            for name, fn in cases.items():
+                results.append(run_case(name, fn, iterations=args.iterations, concurrency=concurrency))
+
+    # Cases are compared by name, so fold the concurrency level into it
+    for result in results:
+        result["name"] = f"{result['name']}@c{result['concurrency']}"
+
+    print(format_results(results))
+    save_results(results, args.output)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_results(load_results(args.baseline), results, threshold_pct=args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.1f}%:")
+            for regression in regressions:
+                print(
+                    f"- {regression['case']} {regression['metric']}: "
+                    f"{regression['baseline']:.2f} -> {regression['current']:.2f} ({regression['change_pct']:+.1f}%)"
+                )
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.1f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+import requests
+
+from shutterscout_ai.benchmarks.fixtures import flickr_payload, places_payload, weather_payload
+from shutterscout_ai.tools.photos.photos import SEARCH_PROJECTION
+from shutterscout_ai.tools.places.places import PLACES_PROJECTION
+from shutterscout_ai.tools.weather.weather import FORECAST_PROJECTION
+from shutterscout_ai.utils import decoding
+from shutterscout_ai.utils.decoding import Projection, decode_json
+
+
+def large_weather_payload(hours: int = 2000) -> bytes:
+    """Daily forecast plus a long hourly timeline, as returned when timesteps are not restricted"""
+    document = weather_payload(days=15)
+    template = document["timelines"]["daily"][0]["values"]
+    document["timelines"]["hourly"] = [
+        {"time": f"2025-02-12T{hour % 24:02d}:00:00Z", "values": {**template, "hour": hour}} for hour in range(hours)
+    ]
+    return json.dumps(document).encode("utf-8")
+
+
+def large_places_payload(count: int = 2000) -> bytes:
+    """Wide-area Foursquare search with the verbose fields a full response carries"""
+    document = places_payload(count=count)
+    for place in document["results"]:
+        place["location"] = {"address": "Coolsingel 40", "locality": "Rotterdam", "formatted_address": "x" * 80}
+        place["chains"] = []
+        place["related_places"] = {"children": [{"fsq_id": "child", "name": "Child place"}] * 3}
+    return json.dumps(document).encode("utf-8")
+
+
+def large_flickr_payload(count: int = 5000) -> bytes:
+    """A large Flickr result page with the requested extras"""
+    return json.dumps(flickr_payload(count=count)).encode("utf-8")
+
+
+def _buffered(payload: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = payload
+    response._content_consumed = True
+    return response
+
+
+def _streamed(payload: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(payload)
+    return response
+
+
+def _strategies(projection: Projection) -> Dict[str, Callable[[bytes], object]]:
+    def full_stdlib(payload: bytes) -> object:
+        return _buffered(payload).json()
+
+    def projected(backend: str) -> Callable[[bytes], object]:
+        def run(payload: bytes) -> object:
+            os.environ["SHUTTERSCOUT_JSON_BACKEND"] = backend
+            return decode_json(_buffered(payload), projection)
+
+        return run
+
+    strategies = {"response.json() full": full_stdlib, "json + projection": projected("json")}
+    if decoding.orjson is not None:
+        strategies["orjson + projection"] = projected("orjson")
+    if decoding.ijson is not None and projection.stream_prefix() is not None:
+        strategies["ijson stream + projection"] = lambda payload: decode_json(_streamed(payload), projection)
+    return strategies
+
+
+def measure(fn: Callable[[bytes], object], payload: bytes, repeat: int) -> Tuple[float, float, float]:
+    """Median time in ms, peak traced memory in KiB and retained result size in KiB"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(payload)
+        timings.append((time.perf_counter() - start) * 1000.0)
+
+    tracemalloc.start()
+    result = fn(payload)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(timings), peak / 1024.0, retained / 1024.0
+
+
+def run(repeat: int = 5) -> List[Dict[str, object]]:
+    cases = [
+        ("weather (daily + hourly)", large_weather_payload(), FORECAST_PROJECTION),
+        ("places (wide area)", large_places_payload(), PLACES_PROJECTION),
+        ("flickr (large page)", large_flickr_payload(), SEARCH_PROJECTION),
+    ]
+    previous_backend = os.environ.get("SHUTTERSCOUT_JSON_BACKEND")
+    rows = []
+    try:
+        for name, payload, projection in cases:
+            for strategy, fn in _strategies(projection).items():
+                median_ms, peak_kb, retained_kb = measure(fn, payload, repeat)
+                rows.append(
+                    {
+                        "payload": name,
+                        "size_kb": len(payload) / 1024.0,
+                        "strategy": strategy,
+                        "median_ms": median_ms,
+                        "peak_kb": peak_kb,
+                        "retained_kb": retained_kb,
+                    }
+                )
+    finally:
+        if previous_backend is None:
+            os.environ.pop("SHUTTERSCOUT_JSON_BACKEND", None)
+        else:
+            os.environ["SHUTTERSCOUT_JSON_BACKEND"] = previous_backend
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ShutterScout AI - Response decoding microbenchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per strategy (default: 5)")
+    args = parser.parse_args()
+
+    print(f"{'payload':<26} {'size KB':>8} {'strategy':<28} {'median ms':>10} {'peak KB':>10} {'kept KB':>9}")
+    for row in run(repeat=args.repeat):
+        print(
+            f"{row['payload']:<26} {row['size_kb']:>8.0f} {row['strategy']:<28} "
+            f"{row['median_ms']:>10.2f} {row['peak_kb']:>10.0f} {row['retained_kb']:>9.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
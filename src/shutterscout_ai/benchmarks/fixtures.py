@@ -0,0 +1,187 @@
+import json
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+from unittest.mock import patch
+
+import requests
+
+# Simulated round-trip latency per provider host, in milliseconds
+DEFAULT_LATENCY_MS: Dict[str, float] = {
+    "ipapi.co": 40.0,
+    "api.tomorrow.io": 120.0,
+    "api.sunrise-sunset.org": 60.0,
+    "api.foursquare.com": 150.0,
+    "www.flickr.com": 180.0,
+}
+
+BASE_LATITUDE = 51.9181
+BASE_LONGITUDE = 4.4739
+
+
+def location_payload() -> dict:
+    """Recorded-shape ipapi.co response"""
+    return {
+        "ip": "203.0.113.7",
+        "latitude": BASE_LATITUDE,
+        "longitude": BASE_LONGITUDE,
+        "city": "Rotterdam",
+        "region": "South Holland",
+        "country_name": "Netherlands",
+        "timezone": "Europe/Amsterdam",
+    }
+
+
+def weather_payload(days: int = 6) -> dict:
+    """Recorded-shape Tomorrow.io daily forecast response"""
+    daily = []
+    for day in range(days):
+        daily.append(
+            {
+                "time": f"2025-02-{12 + day:02d}T05:00:00Z",
+                "values": {
+                    "temperatureMin": 1.7 + day,
+                    "temperatureMax": 6.2 + day,
+                    "cloudCoverAvg": 93 - day * 10,
+                    "precipitationProbabilityAvg": 1,
+                    "visibilityAvg": 13.44,
+                    "sunriseTime": f"2025-02-{12 + day:02d}T06:59:00Z",
+                    "sunsetTime": f"2025-02-{12 + day:02d}T16:54:00Z",
+                    "windSpeedAvg": 1.6,
+                    "humidityAvg": 92,
+                    "uvIndexAvg": 0,
+                    "pressureSurfaceLevelAvg": 1021.4,
+                    "dewPointAvg": 1.2,
+                },
+            }
+        )
+    return {"timelines": {"daily": daily}, "location": {"lat": BASE_LATITUDE, "lon": BASE_LONGITUDE}}
+
+
+def sun_payload() -> dict:
+    """Recorded-shape sunrise-sunset.org response"""
+    return {
+        "results": {
+            "sunrise": "6:59:00 AM",
+            "sunset": "4:54:00 PM",
+            "solar_noon": "11:56:30 AM",
+            "day_length": "09:55:00",
+        },
+        "status": "OK",
+    }
+
+
+def places_payload(count: int = 12) -> dict:
+    """Recorded-shape Foursquare place search response"""
+    results = []
+    for index in range(count):
+        results.append(
+            {
+                "fsq_id": f"fsq{index:04d}",
+                "name": f"Landmark {index}",
+                "geocodes": {
+                    "main": {
+                        "latitude": BASE_LATITUDE + index * 0.004,
+                        "longitude": BASE_LONGITUDE - index * 0.003,
+                    }
+                },
+                "categories": [{"id": 16032, "name": "Landmark"}],
+                "distance": 250 * index,
+            }
+        )
+    return {"results": results}
+
+
+def flickr_payload(count: int = 5) -> dict:
+    """Recorded-shape Flickr photo search response"""
+    photos = []
+    for index in range(count):
+        photos.append(
+            {
+                "id": f"5321{index:04d}",
+                "owner": "12345678@N00",
+                "secret": f"a1b2c3d{index}",
+                "server": "65535",
+                "farm": 66,
+                "title": f"Sample shot {index}",
+                "ispublic": 1,
+                "isfriend": 0,
+                "isfamily": 0,
+                "views": str(1000 - index * 17),
+                "datetaken": f"2024-0{1 + index % 9}-15 18:{index:02d}:00",
+            }
+        )
+    return {"photos": {"page": 1, "pages": 1, "perpage": count, "total": count, "photo": photos}, "stat": "ok"}
+
+
+PAYLOADS: Dict[str, Callable[[], dict]] = {
+    "ipapi.co": location_payload,
+    "api.tomorrow.io": weather_payload,
+    "api.sunrise-sunset.org": sun_payload,
+    "api.foursquare.com": places_payload,
+    "www.flickr.com": flickr_payload,
+}
+
+
+def _host(url: str) -> str:
+    return url.split("://", 1)[-1].split("/", 1)[0]
+
+
+class ReplayTransport:
+    """
+    Serves recorded provider payloads in place of requests.get, sleeping for the
+    configured per-host latency so concurrency behaves like it does against real APIs.
+    """
+
+    def __init__(self, latency_ms: Optional[Dict[str, float]] = None, latency_scale: float = 1.0):
+        self.latency_ms = dict(DEFAULT_LATENCY_MS if latency_ms is None else latency_ms)
+        self.latency_scale = latency_scale
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._bodies = {host: json.dumps(factory()).encode("utf-8") for host, factory in PAYLOADS.items()}
+
+    def get(self, url: str, *args, **kwargs) -> requests.Response:
+        host = _host(url)
+        if host not in self._bodies:
+            raise requests.ConnectionError(f"No replay fixture for host {host}")
+
+        with self._lock:
+            self.calls[host] = self.calls.get(host, 0) + 1
+
+        delay = self.latency_ms.get(host, 0.0) * self.latency_scale / 1000.0
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers["Content-Type"] = "application/json"
+        response._content = self._bodies[host]
+        response._content_consumed = True
+        return response
+
+
+@contextmanager
+def replay_providers(
+    latency_ms: Optional[Dict[str, float]] = None, latency_scale: float = 1.0
+) -> Iterator[ReplayTransport]:
+    """
+    Route all provider HTTP calls to recorded fixtures for the duration of the block.
+    Conditions are archived to a temporary directory, so replayed runs never touch the real archive.
+
+    Args:
+        latency_ms: Per-host simulated latency in milliseconds (defaults to DEFAULT_LATENCY_MS)
+        latency_scale: Multiplier applied to every latency, 0 disables the simulated delay
+    """
+    transport = ReplayTransport(latency_ms=latency_ms, latency_scale=latency_scale)
+    with tempfile.TemporaryDirectory(prefix="shutterscout-replay-") as archive_dir:
+        env = {
+            "TOMORROW_API_KEY": "replay",
+            "FOURSQUARE_API_KEY": "replay",
+            "FLICKR_API_KEY": "replay",
+            "SHUTTERSCOUT_ARCHIVE_DIR": archive_dir,
+        }
+        with patch("requests.get", side_effect=transport.get), patch.dict("os.environ", env):
+            yield transport
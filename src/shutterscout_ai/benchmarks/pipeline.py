@@ -0,0 +1,69 @@
+from typing import Callable, Dict, List, Sequence
+
+from smolagents.monitoring import LogLevel
+
+from shutterscout_ai.benchmarks.fixtures import BASE_LATITUDE, BASE_LONGITUDE
+from shutterscout_ai.benchmarks.stub_model import STUB_SECTION_RESPONSE, StubModel
+from shutterscout_ai.core.sectioned_report import generate_sectioned_report
+from shutterscout_ai.core.shutterscout_agent import INSTRUCTION_PROMPT, create_shutterscout_agent
+from shutterscout_ai.tools.astronomy.astronomy import get_sunrise_sunset
+from shutterscout_ai.tools.combined.combiner import get_combined_data
+from shutterscout_ai.tools.location.location import clear_location_cache, get_location
+from shutterscout_ai.tools.photos.photos import search_flickr_photos
+from shutterscout_ai.tools.places.places import get_interesting_places
+from shutterscout_ai.tools.weather.weather import get_weather_forecast
+
+
+def _uncached_location() -> object:
+    clear_location_cache()
+    return get_location()
+
+
+def _run_recommendations(model_latency_ms: float) -> str:
+    agent = create_shutterscout_agent(model=StubModel(latency_ms=model_latency_ms))
+    agent.logger.level = LogLevel.OFF
+    return agent.run(INSTRUCTION_PROMPT)
+
+
+def _run_sectioned_recommendations(model_latency_ms: float) -> str:
+    combined = get_combined_data()
+    report = generate_sectioned_report(
+        combined, lambda: StubModel(latency_ms=model_latency_ms, response=STUB_SECTION_RESPONSE)
+    )
+    return report["markdown"]
+
+
+def pipeline_cases(
+    max_places_values: Sequence[int] = (1, 3, 5, 10), model_latency_ms: float = 0.0
+) -> Dict[str, Callable[[], object]]:
+    """
+    Build the named zero-argument callables that make up the end-to-end benchmark suite.
+
+    Args:
+        max_places_values: max_places settings to benchmark get_combined_data with
+        model_latency_ms: Simulated generation latency of the stub model
+    """
+    lat, lon = BASE_LATITUDE, BASE_LONGITUDE
+    cases: Dict[str, Callable[[], object]] = {
+        "get_location[cold]": _uncached_location,
+        "get_location[cached]": lambda: get_location(),
+        "get_location[override]": lambda: get_location(latitude=lat, longitude=lon, place_name="Rotterdam"),
+        "get_weather_forecast": lambda: get_weather_forecast(lat, lon),
+        "get_sunrise_sunset": lambda: get_sunrise_sunset(lat, lon),
+        "get_interesting_places": lambda: get_interesting_places(lat, lon),
+        "search_flickr_photos": lambda: search_flickr_photos("Landmark 0", lat, lon),
+    }
+    for max_places in max_places_values:
+        cases[f"get_combined_data[max_places={max_places}]"] = lambda max_places=max_places: get_combined_data(
+            max_places=max_places
+        )
+    cases["get_location_recommendations[stub]"] = lambda: _run_recommendations(model_latency_ms)
+    cases["get_location_recommendations[sectioned-stub]"] = lambda: _run_sectioned_recommendations(model_latency_ms)
+    return cases
+
+
+def select_cases(cases: Dict[str, Callable[[], object]], patterns: List[str]) -> Dict[str, Callable[[], object]]:
+    """Keep only cases whose name contains one of the given substrings (all cases when empty)"""
+    if not patterns:
+        return cases
+    return {name: fn for name, fn in cases.items() if any(pattern in name for pattern in patterns)}
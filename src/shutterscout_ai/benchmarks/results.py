@@ -0,0 +1,101 @@
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, TypedDict
+
+from shutterscout_ai.benchmarks.runner import BenchmarkResult
+
+# Metrics where a larger value is worse, compared against the baseline
+LOWER_IS_BETTER = ("p50_ms", "p90_ms", "peak_memory_kb")
+# Metrics where a smaller value is worse
+HIGHER_IS_BETTER = ("throughput_per_s",)
+
+
+class Regression(TypedDict):
+    """A metric that moved past the allowed threshold relative to the baseline"""
+
+    case: str
+    metric: str
+    baseline: float
+    current: float
+    change_pct: float
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results: List[BenchmarkResult], path: str) -> dict:
+    """Write benchmark results with commit and environment metadata to a JSON file"""
+    document = {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2)
+    return document
+
+
+def load_results(path: str) -> Dict[str, BenchmarkResult]:
+    """Load a results file written by save_results, keyed by case name"""
+    with open(path) as f:
+        document = json.load(f)
+    return {result["name"]: result for result in document.get("results", [])}
+
+
+def compare_results(
+    baseline: Dict[str, BenchmarkResult], current: List[BenchmarkResult], threshold_pct: float = 10.0
+) -> List[Regression]:
+    """
+    Compare current results against a baseline and return every metric that regressed by more than threshold_pct.
+    Cases missing from the baseline are ignored.
+    """
+    regressions: List[Regression] = []
+    for result in current:
+        reference = baseline.get(result["name"])
+        if reference is None:
+            continue
+
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before = float(reference.get(metric, 0.0))
+            after = float(result.get(metric, 0.0))
+            if before <= 0:
+                continue
+            change_pct = (after - before) / before * 100.0
+            worse = change_pct > threshold_pct if metric in LOWER_IS_BETTER else change_pct < -threshold_pct
+            if worse:
+                regressions.append(
+                    {
+                        "case": result["name"],
+                        "metric": metric,
+                        "baseline": before,
+                        "current": after,
+                        "change_pct": change_pct,
+                    }
+                )
+    return regressions
+
+
+def format_results(results: List[BenchmarkResult]) -> str:
+    """Render results as a fixed-width text table"""
+    header = (
+        f"{'case':<38} {'conc':>4} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+        f"{'ops/s':>8} {'peak KB':>9} {'threads':>7} {'err':>4}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['name']:<38} {r['concurrency']:>4} {r['p50_ms']:>9.2f} {r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+            f"{r['throughput_per_s']:>8.2f} {r['peak_memory_kb']:>9.1f} {r['peak_threads']:>7} {r['errors']:>4}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+import math
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, TypedDict
+
+
+class BenchmarkResult(TypedDict):
+    """Latency distribution and resource usage for one benchmark case"""
+
+    name: str
+    iterations: int
+    concurrency: int
+    mean_ms: float
+    min_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+    throughput_per_s: float
+    peak_memory_kb: float
+    peak_threads: int
+    errors: int
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    index = min(len(samples) - 1, max(0, math.ceil(fraction * len(samples)) - 1))
+    return samples[index]
+
+
+class _ThreadSampler:
+    """Polls threading.active_count() in the background to capture the peak thread count"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-thread-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Exclude the sampler itself from the count
+            self.peak = max(self.peak, threading.active_count() - 1)
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "_ThreadSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_case(
+    name: str, fn: Callable[[], object], iterations: int = 20, concurrency: int = 1, warmup: int = 1
+) -> BenchmarkResult:
+    """
+    Run fn repeatedly and collect latency percentiles, throughput, peak traced memory and peak thread count.
+
+    Args:
+        name: Case name used in reports and for regression comparison
+        fn: Zero-argument callable to measure
+        iterations: Total number of measured calls
+        concurrency: Number of calls kept in flight at once
+        warmup: Unmeasured calls made before timing starts
+    """
+    if iterations < 1:
+        raise ValueError(f"iterations must be positive, got {iterations}")
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, got {concurrency}")
+
+    for _ in range(warmup):
+        fn()
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def timed_call() -> None:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        elapsed = (time.perf_counter() - start) * 1000.0
+        with lock:
+            latencies.append(elapsed)
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    with _ThreadSampler() as sampler:
+        wall_start = time.perf_counter()
+        if concurrency == 1:
+            for _ in range(iterations):
+                timed_call()
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as executor:
+                for future in [executor.submit(timed_call) for _ in range(iterations)]:
+                    future.result()
+        wall_elapsed = time.perf_counter() - wall_start
+
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "min_ms": latencies[0] if latencies else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "throughput_per_s": len(latencies) / wall_elapsed if wall_elapsed > 0 else 0.0,
+        "peak_memory_kb": peak_bytes / 1024.0,
+        "peak_threads": sampler.peak,
+        "errors": errors,
+    }
@@ -0,0 +1,83 @@
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.tools.combined import codec
+from shutterscout_ai.tools.combined.combiner import CombinedData, get_combined_data
+from shutterscout_ai.utils import decoding
+
+
+def sample_combined() -> CombinedData:
+    """Combined data for one location, built from the recorded provider responses"""
+    with replay_providers(latency_scale=0):
+        return get_combined_data(latitude=51.9181, longitude=4.4739, place_name="Rotterdam")
+
+
+def _formats() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    formats = {
+        "json": (lambda value: json.dumps(value).encode("utf-8"), json.loads),
+        "compact": (codec.encode, codec.decode),
+    }
+    if decoding.orjson is not None:
+        formats["orjson"] = (decoding.orjson.dumps, decoding.orjson.loads)
+    return formats
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return statistics.median(timings)
+
+
+def run(repeat: int = 20, batch: int = 100) -> List[Dict[str, object]]:
+    combined = sample_combined()
+    cases = [
+        ("combined data", combined),
+        (f"batch of {batch}", [combined] * batch),
+        ("weather", combined["weather"]),
+        ("photos", combined["photos_by_place"]),
+    ]
+    rows = []
+    for name, value in cases:
+        for format_name, (encode, decode) in _formats().items():
+            encoded = encode(value)
+            if decode(encoded) != json.loads(json.dumps(value)):
+                raise RuntimeError(f"{format_name} did not round-trip {name}")
+            rows.append(
+                {
+                    "payload": name,
+                    "format": format_name,
+                    "size_bytes": len(encoded),
+                    "encode_ms": _median_ms(lambda: encode(value), repeat),
+                    "decode_ms": _median_ms(lambda: decode(encoded), repeat),
+                }
+            )
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ShutterScout AI - Combined data serialization microbenchmark")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per format (default: 20)")
+    parser.add_argument("--batch", type=int, default=100, help="Locations in the batch payload (default: 100)")
+    args = parser.parse_args()
+
+    print(f"{'payload':<18} {'format':<10} {'bytes':>9} {'vs json':>8} {'encode ms':>10} {'decode ms':>10}")
+    json_sizes: Dict[str, int] = {}
+    for row in run(repeat=args.repeat, batch=args.batch):
+        relative = row["size_bytes"] / json_sizes.setdefault(row["payload"], row["size_bytes"])
+        print(
+            f"{row['payload']:<18} {row['format']:<10} {row['size_bytes']:>9} "
+            f"{relative:>7.0%} {row['encode_ms']:>10.3f} {row['decode_ms']:>10.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+from typing import Dict, List
+
+from shutterscout_ai.benchmarks.serialization import sample_combined
+from shutterscout_ai.benchmarks.stub_model import STUB_SECTION_RESPONSE
+from shutterscout_ai.publish.site import SiteRecord, build_site
+
+STUB_REPORT = "\n\n".join(
+    f"## {heading}\n\n{STUB_SECTION_RESPONSE}"
+    for heading in ("🌤️ Photography Conditions", "⏰ Best Shooting Times", "📸 Location Recommendations")
+)
+
+
+def synthetic_records(count: int, seed: int = 7) -> List[SiteRecord]:
+    """count locations spread over Europe, each with the recorded combined data and a short report"""
+    rng = random.Random(seed)
+    combined = sample_combined()
+    records: List[SiteRecord] = []
+    for number in range(count):
+        latitude, longitude = rng.uniform(36.0, 60.0), rng.uniform(-9.0, 25.0)
+        weather = [{**day, "cloud_cover": rng.randint(0, 100)} for day in combined["weather"]]
+        records.append(
+            {
+                "spec": {"latitude": latitude, "longitude": longitude, "place_name": f"Spot {number}"},
+                "combined": {
+                    **combined,
+                    "location": {**combined["location"], "latitude": latitude, "longitude": longitude},
+                    "weather": weather,
+                },
+                "recommendations": f"# 📍 Spot {number}\n\n{STUB_REPORT}",
+            }
+        )
+    return records
+
+
+def run(count: int = 10000, changed: float = 0.01, workers: int | None = None) -> List[Dict[str, object]]:
+    records = synthetic_records(count)
+    directory = tempfile.mkdtemp(prefix="shutterscout-site-")
+    rows = []
+    try:
+        rows.append({"build": "full", **build_site(records, directory, workers=workers)})
+        rows.append({"build": "unchanged", **build_site(records, directory, workers=workers)})
+        for record in random.Random(11).sample(records, max(1, int(count * changed))):
+            record["recommendations"] += "\n\nUpdated."
+        rows.append({"build": f"{changed:.0%} changed", **build_site(records, directory, workers=workers)})
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ShutterScout AI - Static site build benchmark")
+    parser.add_argument("--locations", type=int, default=10000, help="Locations to publish (default: 10000)")
+    parser.add_argument("--changed", type=float, default=0.01, help="Share of locations changed before a rebuild")
+    parser.add_argument("--workers", type=int, help="Render processes (default: one per CPU, 0 for none)")
+    args = parser.parse_args()
+
+    print(f"{'build':<14} {'pages':>7} {'rendered':>9} {'seconds':>8}")
+    for row in run(args.locations, args.changed, args.workers):
+        print(f"{row['build']:<14} {row['pages']:>7} {row['rendered']:>9} {row['elapsed_seconds']:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import time
+from typing import Dict, List, Optional
+
+from smolagents import ChatMessage, Model
+
+STUB_CODE_RESPONSE = """Thought: I will fetch all data with one call and summarise it.
+Code:
+```py
+data = get_combined_data()
+lines = ["# 📍 ShutterScout.AI Location Overview", data["location"]["city"]]
+for place in data["places"][:3]:
+    lines.append("### " + place["name"])
+for photos in data["photos_by_place"].values():
+    for photo in photos:
+        lines.append("- [" + photo["title"] + "](" + photo["url"] + ")")
+final_answer("\\n".join(lines))
+```<end_code>"""
+
+# Answer for sectioned report generation, where each call writes one short section
+STUB_SECTION_RESPONSE = """- Low side light from the east rakes across the facades
+- Scattered cloud should catch colour just after sunrise
+- Bring a tripod for the blue hour"""
+
+
+class StubModel(Model):
+    """
+    Deterministic stand-in for the LLM that always answers with the same single-step program,
+    optionally sleeping to emulate generation latency.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, response: str = STUB_CODE_RESPONSE, **kwargs):
+        super().__init__(**kwargs)
+        self.latency_ms = latency_ms
+        self.response = response
+        self.calls = 0
+
+    def __call__(
+        self,
+        messages: List[Dict[str, str]],
+        stop_sequences: Optional[List[str]] = None,
+        grammar: Optional[str] = None,
+        **kwargs,
+    ) -> ChatMessage:
+        self.calls += 1
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+        self.last_input_token_count = sum(len(str(message.get("content", ""))) // 4 for message in messages)
+        self.last_output_token_count = len(self.response) // 4
+        return ChatMessage(role="assistant", content=self.response)
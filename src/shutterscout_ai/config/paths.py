@@ -0,0 +1,35 @@
+import os
+
+
+def cache_dir(*parts: str) -> str:
+    """
+    Directory for ShutterScout's local caches and indexes, created on demand.
+    Defaults to ~/.cache/shutterscout and can be moved with SHUTTERSCOUT_CACHE_DIR.
+
+    Args:
+        parts: Optional subdirectory path components
+    """
+    base = os.getenv("SHUTTERSCOUT_CACHE_DIR") or os.path.join(
+        os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "shutterscout"
+    )
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_dir(*parts: str, create: bool = True) -> str:
+    """
+    Directory for data ShutterScout keeps between runs, such as the conditions archive, created on demand.
+    Defaults to ~/.local/share/shutterscout and can be moved with SHUTTERSCOUT_DATA_DIR.
+
+    Args:
+        parts: Optional subdirectory path components
+        create: Create the directory when it is missing; off for directories the user fills in
+    """
+    base = os.getenv("SHUTTERSCOUT_DATA_DIR") or os.path.join(
+        os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"), "shutterscout"
+    )
+    path = os.path.join(base, *parts)
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
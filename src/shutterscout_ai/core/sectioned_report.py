@@ -0,0 +1,294 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, TypedDict
+
+from loguru import logger
+from smolagents import Model
+
+from shutterscout_ai.tools.combined.combiner import CombinedData
+from shutterscout_ai.tools.places.places import Place
+from shutterscout_ai.utils.instrumentation import (
+    REPORT_SECTION_LATENCY_MS,
+    REPORT_SECTION_TOKENS_TOTAL,
+    increment,
+    observe,
+    span,
+    submit_traced,
+)
+
+SYSTEM_PROMPT = """You are ShutterScout AI, a photography location scout assistant. You write one section of a
+markdown report for photographers. Write only the body of the requested section: no heading, no preamble, and
+nothing about other sections. Base everything on the data given; do not invent weather or times."""
+
+LOCATION_INSTRUCTIONS = """- **Best subjects/angles**: [Details]
+- **Ideal timing**: [Time recommendations; follow the itinerary visit when given]
+- **Technical tips**: [Camera settings, lens choices]
+- **Unique features**: [Special photographic opportunities]"""
+
+# Photos listed per place in the report; the list is built from the data, not generated
+MAX_PHOTOS_PER_PLACE = 5
+
+
+@dataclass(frozen=True)
+class ReportSection:
+    """One independently generated part of the report: its heading, what to write and the data it needs"""
+
+    key: str
+    heading: str
+    instructions: str
+    data: Callable[[CombinedData], Any]
+    # Heading of the enclosing section, written before this one's
+    parent: str = ""
+    # Fixed markdown between the heading and the generated text
+    lead: str = ""
+
+
+class SectionResult(TypedDict):
+    key: str
+    heading: str
+    text: str
+    input_tokens: int
+    output_tokens: int
+    latency_ms: float
+    error: str
+
+
+class SectionedReport(TypedDict):
+    """The assembled report with per-section accounting"""
+
+    markdown: str
+    sections: List[SectionResult]
+    wall_ms: float
+    input_tokens: int
+    output_tokens: int
+
+
+def _day_summary(combined: CombinedData) -> List[Dict[str, Any]]:
+    return [
+        {key: day[key] for key in ("time", "cloud_cover", "precipitation_probability", "sunrise_time", "sunset_time")}
+        for day in combined["weather"][:2]
+    ]
+
+
+def _featured_places(combined: CombinedData, count: int = 3) -> List[Place]:
+    """The places to write up: those on the itinerary first, in visiting order, then the rest"""
+    by_name = {place["name"]: place for place in combined["places"]}
+    names = [visit["place"] for visit in combined.get("itinerary", {}).get("visits", [])]
+    names += [place["name"] for place in combined["places"] if place["name"] not in names]
+    return [by_name[name] for name in names if name in by_name][:count]
+
+
+def _place_data(combined: CombinedData, place: Place) -> Dict[str, Any]:
+    visit = next(
+        (visit for visit in combined.get("itinerary", {}).get("visits", []) if visit["place"] == place["name"]), None
+    )
+    data: Dict[str, Any] = {
+        "place": place,
+        "city": combined["location"]["city"],
+        "photo_titles": [photo["title"] for photo in combined["photos_by_place"].get(place["name"], [])][:10],
+        "days": _day_summary(combined),
+    }
+    if visit is not None:
+        data["itinerary_visit"] = visit
+    if place["name"] in combined.get("horizon_light", {}):
+        data["horizon_light"] = combined["horizon_light"][place["name"]]
+    return data
+
+
+def _photo_list(combined: CombinedData) -> str:
+    lines = ["### Available Photos"]
+    for photos in combined["photos_by_place"].values():
+        lines.extend(f"- [{photo['title'] or 'Untitled'}]({photo['url']})" for photo in photos[:MAX_PHOTOS_PER_PLACE])
+    return "\n".join(lines) + "\n\n### Shot Ideas"
+
+
+def _place_names(combined: CombinedData) -> Dict[str, Any]:
+    return {"places": [place["name"] for place in combined["places"]], "location": combined["location"]}
+
+
+def build_sections(combined: CombinedData) -> List[ReportSection]:
+    """The report's sections in order, each with only the slice of the combined data it needs"""
+    sections = [
+        ReportSection(
+            "overview",
+            "# 📍 ShutterScout.AI Location Overview",
+            "Two or three sentences on the location and its current conditions for photography.",
+            lambda c: {"location": c["location"], "days": _day_summary(c)},
+        ),
+        ReportSection(
+            "conditions",
+            "## 🌤️ Photography Conditions",
+            "Bullets on the key weather factors for shoots: temperature range, cloud cover impact, visibility "
+            "conditions and wind considerations.",
+            lambda c: {"weather": c["weather"][:2]},
+        ),
+        ReportSection(
+            "best_times",
+            "## ⏰ Best Shooting Times",
+            "Bullets on the best times with reasoning: sunrise/sunset timings, golden hour periods and "
+            "weather-based recommendations.",
+            lambda c: {
+                "sun_times": c["sun_times"],
+                "days": _day_summary(c),
+                "light_windows": c.get("itinerary", {}).get("windows", []),
+                "horizon_light": c.get("horizon_light", {}),
+                "best_months": c.get("seasonal_conditions", {}).get("best_months", []),
+            },
+        ),
+    ]
+    for number, place in enumerate(_featured_places(combined), start=1):
+        sections.append(
+            ReportSection(
+                f"location_{number}",
+                f"### Location {number}: {place['name']}",
+                f"Photography tips for {place['name']} in exactly these bullets:\n{LOCATION_INSTRUCTIONS}",
+                lambda c, place=place: _place_data(c, place),
+                parent="## 📸 Location Recommendations" if number == 1 else "",
+            )
+        )
+    sections.extend(
+        [
+            ReportSection(
+                "photos",
+                "## 🎯 Sample Photos & Shot Ideas",
+                "Three to five concrete shot ideas inspired by these photo titles.",
+                lambda c: {
+                    "photo_titles": {name: [p["title"] for p in ps] for name, ps in c["photos_by_place"].items()}
+                },
+                lead=_photo_list(combined),
+            ),
+            ReportSection(
+                "equipment",
+                "### Equipment Needed",
+                "A bullet list of recommended equipment, with specific gear per location if needed.",
+                lambda c: {**_place_names(c), "weather": c["weather"][:2]},
+                parent="## ⚠️ Photographer's Notes",
+            ),
+            ReportSection(
+                "access",
+                "### Access Information",
+                "Bullets on access details, opening hours and restrictions, and parking for the featured locations.",
+                lambda c: {"places": c["places"], "location": c["location"]},
+            ),
+            ReportSection(
+                "safety",
+                "### Safety Considerations",
+                "Bullets on weather-related precautions, location-specific safety notes and equipment protection.",
+                lambda c: {**_place_names(c), "weather": c["weather"][:2]},
+            ),
+        ]
+    )
+    return sections
+
+
+def section_messages(section: ReportSection, combined: CombinedData, custom_prompt: str = "") -> List[Dict[str, Any]]:
+    system = SYSTEM_PROMPT + (f"\n\nAdditional Focus:\n{custom_prompt}" if custom_prompt else "")
+    user = (
+        f"Section: {section.heading.lstrip('# ')}\n\nWrite:\n{section.instructions}\n\n"
+        f"Data:\n{json.dumps(section.data(combined), ensure_ascii=False, default=str)}"
+    )
+    return [
+        {"role": "system", "content": [{"type": "text", "text": system}]},
+        {"role": "user", "content": [{"type": "text", "text": user}]},
+    ]
+
+
+def _strip_heading(text: str, heading: str) -> str:
+    """Drop a heading the model repeated despite the instructions"""
+    first, _, rest = text.strip().partition("\n")
+    if first.lstrip("# ").strip().lower() == heading.lstrip("# ").strip().lower():
+        return rest.strip()
+    return text.strip()
+
+
+def _generate(section: ReportSection, model: Model, messages: List[Dict[str, Any]]) -> SectionResult:
+    start = time.perf_counter()
+    error, text = "", ""
+    try:
+        text = _strip_heading(model(messages).content or "", section.heading)
+    except Exception as e:
+        logger.error(f"Failed to generate report section {section.key}: {str(e)}")
+        error = str(e)
+    latency_ms = (time.perf_counter() - start) * 1000.0
+    input_tokens = getattr(model, "last_input_token_count", None) or 0
+    output_tokens = getattr(model, "last_output_token_count", None) or 0
+    observe(REPORT_SECTION_LATENCY_MS, latency_ms, section=section.key)
+    increment(REPORT_SECTION_TOKENS_TOTAL, input_tokens, section=section.key, direction="input")
+    increment(REPORT_SECTION_TOKENS_TOTAL, output_tokens, section=section.key, direction="output")
+    return {
+        "key": section.key,
+        "heading": section.heading,
+        "text": text,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "latency_ms": latency_ms,
+        "error": error,
+    }
+
+
+def generate_sectioned_report(
+    combined: CombinedData,
+    model_factory: Callable[[], Model],
+    custom_prompt: str = "",
+    max_workers: Optional[int] = None,
+) -> SectionedReport:
+    """
+    Write the recommendation report as independent sections generated concurrently, each from only the
+    data it needs, and assemble them in report order. Wall-clock time approaches that of the longest
+    section instead of the whole report.
+
+    Args:
+        combined: Result of get_combined_data
+        model_factory: Builds the model for one section; each section gets its own, so token counts
+            reported by the model are not mixed up between concurrent calls
+        custom_prompt: Optional custom instructions for analysis focus
+        max_workers: Sections generated at once (default: all of them)
+
+    Raises:
+        RuntimeError: If every section failed
+    """
+    sections = build_sections(combined)
+    start = time.perf_counter()
+    with span("report.sectioned", sections=len(sections)):
+        with ThreadPoolExecutor(max_workers=max_workers or len(sections)) as executor:
+            futures = [
+                submit_traced(
+                    executor,
+                    "report.section",
+                    _generate,
+                    section,
+                    model_factory(),
+                    section_messages(section, combined, custom_prompt),
+                )
+                for section in sections
+            ]
+            results = [future.result() for future in futures]
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    if all(result["error"] for result in results):
+        raise RuntimeError(f"Failed to generate any report section: {results[0]['error']}")
+
+    parts = []
+    for section, result in zip(sections, results):
+        if section.parent:
+            parts.append(section.parent)
+        parts.append(section.heading)
+        if section.lead:
+            parts.append(section.lead)
+        parts.append(result["text"] or "_This section could not be generated._")
+    report: SectionedReport = {
+        "markdown": "\n\n".join(parts) + "\n",
+        "sections": results,
+        "wall_ms": wall_ms,
+        "input_tokens": sum(result["input_tokens"] for result in results),
+        "output_tokens": sum(result["output_tokens"] for result in results),
+    }
+    slowest = max(results, key=lambda result: result["latency_ms"])
+    logger.info(
+        f"Generated {len(results)} report sections in {wall_ms:.0f} ms "
+        f"(slowest {slowest['key']} {slowest['latency_ms']:.0f} ms, "
+        f"{report['input_tokens']} input and {report['output_tokens']} output tokens)"
+    )
+    return report
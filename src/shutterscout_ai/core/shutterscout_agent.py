@@ -1,7 +1,13 @@
+import copy
+from typing import Callable, Optional
+
 from loguru import logger
-from smolagents import CodeAgent, HfApiModel
+from smolagents import CodeAgent, HfApiModel, Model, Tool
+from smolagents.memory import ActionStep
 
-from shutterscout_ai.tools.combined.combiner import get_combined_data
+from shutterscout_ai.core.sectioned_report import generate_sectioned_report
+from shutterscout_ai.tools.combined.combiner import CombinedData, get_combined_data
+from shutterscout_ai.utils.instrumentation import record_span, span
 
 INSTRUCTION_PROMPT = """You are ShutterScout AI, a photography location scout assistant. Make one call to
  get_combined_data() and analyze the results for photographers.
@@ -11,6 +17,8 @@ Analyze:
 - Best shooting times based on sun position and weather
 - Location potential and current conditions
 - Available sample photos
+- The itinerary, when present: its visits already fit travel times into the light windows, so base
+ each location's ideal timing on it
 
 Format your response in markdown:
 
@@ -76,8 +84,42 @@ Format your response in markdown:
 - [Equipment protection tips]"""
 
 
+def _record_agent_step(step: ActionStep) -> None:
+    """Step callback that turns each finished agent step into a span"""
+    if step.start_time is None or step.end_time is None:
+        return
+    record_span(
+        "agent.step",
+        step.start_time,
+        step.end_time,
+        error=str(step.error) if step.error else None,
+        step=step.step_number or 0,
+    )
+
+
+class PrefetchedCombinedData(Tool):
+    """Stands in for get_combined_data with data fetched beforehand, so the agent makes no provider calls"""
+
+    name = get_combined_data.name
+    description = get_combined_data.description
+    inputs = get_combined_data.inputs
+    output_type = get_combined_data.output_type
+    skip_forward_signature_validation = True
+
+    def __init__(self, data: CombinedData):
+        super().__init__()
+        self.data = data
+
+    def forward(self, *args, **kwargs) -> CombinedData:
+        return self.data
+
+
 def create_shutterscout_agent(
-    model_id: str = "meta-llama/Llama-3.3-70B-Instruct", temperature: float = 0.7, max_tokens: int = 2048
+    model_id: str = "meta-llama/Llama-3.3-70B-Instruct",
+    temperature: float = 0.7,
+    max_tokens: int = 2048,
+    model: Optional[Model] = None,
+    combined_data: Optional[CombinedData] = None,
 ) -> CodeAgent:
     """
     Create and configure a ShutterScout AI agent with photography location scouting capabilities.
@@ -86,6 +128,8 @@ def create_shutterscout_agent(
         model_id: Hugging Face model identifier for the language model.
         temperature: Sampling temperature for model outputs (0.0-1.0).
         max_tokens: Maximum number of tokens in the model response.
+        model: Optional pre-built model; when given, model_id, temperature and max_tokens are ignored.
+        combined_data: Optional result of get_combined_data for the agent to use instead of fetching it.
 
     Returns:
         CodeAgent: Configured agent ready to provide photography location recommendations.
@@ -97,9 +141,15 @@ def create_shutterscout_agent(
         if max_tokens < 1:
             raise ValueError(f"max_tokens must be positive, got {max_tokens}")
 
-        model = HfApiModel(model_id=model_id, temperature=temperature, max_tokens=max_tokens)
+        if model is None:
+            model = HfApiModel(model_id=model_id, temperature=temperature, max_tokens=max_tokens)
 
-        agent = CodeAgent(tools=[get_combined_data], model=model, additional_authorized_imports=["json"])
+        agent = CodeAgent(
+            tools=[get_combined_data if combined_data is None else PrefetchedCombinedData(combined_data)],
+            model=model,
+            additional_authorized_imports=["json"],
+            step_callbacks=[_record_agent_step],
+        )
 
         logger.info(f"Successfully created ShutterScout agent with model {model_id}")
         return agent
@@ -109,28 +159,78 @@ def create_shutterscout_agent(
         raise RuntimeError(f"Failed to create ShutterScout agent: {str(e)}") from e
 
 
-def get_location_recommendations(custom_prompt: str = "", model_id: str = "meta-llama/Llama-3.3-70B-Instruct") -> str:
+def location_instruction(
+    latitude: Optional[float] = None, longitude: Optional[float] = None, place_name: str = ""
+) -> str:
+    """Prompt addition telling the agent which location to pass to get_combined_data()"""
+    if latitude is None and longitude is None and not place_name:
+        return ""
+    arguments = []
+    if latitude is not None and longitude is not None:
+        arguments.extend([f"latitude={latitude}", f"longitude={longitude}"])
+    if place_name:
+        arguments.append(f"place_name={place_name!r}")
+    return (
+        f"\n\nLocation:\nScout this location instead of the user's own: call get_combined_data({', '.join(arguments)})."
+    )
+
+
+def get_location_recommendations(
+    custom_prompt: str = "",
+    model_id: str = "meta-llama/Llama-3.3-70B-Instruct",
+    model: Optional[Model] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    place_name: str = "",
+    combined_data: Optional[CombinedData] = None,
+    sectioned: bool = False,
+    model_factory: Optional[Callable[[], Model]] = None,
+) -> str:
     """
     Generate photography location recommendations using the ShutterScout AI agent.
     Makes a single call to get_combined_data() to gather all necessary information.
+    In sectioned mode the report is instead written section by section, with the sections generated
+    concurrently by plain model calls, so the wait is that of the longest section rather than the whole report.
 
     Args:
         custom_prompt: Optional custom instructions for analysis focus.
         model_id: Optional override for the model ID.
+        model: Optional pre-built model, e.g. a stub model for benchmarks.
         latitude: Optional latitude coordinate for location override.
         longitude: Optional longitude coordinate for location override.
+        place_name: Optional name of the location to scout.
+        combined_data: Optional result of get_combined_data to analyze instead of fetching it again.
+        sectioned: Generate the report as concurrent sections instead of one agent run.
+        model_factory: Optional callable building a model per section in sectioned mode; defaults to
+            copies of model, or a new model for model_id.
 
     Returns:
         str: Formatted recommendation text with practical photography guidance.
     """
     try:
-        agent = create_shutterscout_agent(model_id=model_id)
-
-        prompt = INSTRUCTION_PROMPT
+        if sectioned:
+            if combined_data is None:
+                combined_data = get_combined_data(latitude=latitude, longitude=longitude, place_name=place_name)
+            if model_factory is None:
+                # A copy per section keeps each section's token counts apart
+                model_factory = (
+                    (lambda: copy.copy(model))
+                    if model is not None
+                    else (lambda: HfApiModel(model_id=model_id, temperature=0.7, max_tokens=2048))
+                )
+            with span("agent.run", model_id=model_id, sectioned=True):
+                report = generate_sectioned_report(combined_data, model_factory, custom_prompt=custom_prompt)
+            logger.info("Successfully generated location recommendations")
+            return report["markdown"]
+
+        agent = create_shutterscout_agent(model_id=model_id, model=model, combined_data=combined_data)
+
+        prompt = INSTRUCTION_PROMPT + location_instruction(latitude, longitude, place_name)
         if custom_prompt:
             prompt += f"\n\nAdditional Focus:\n{custom_prompt}"
 
-        result = agent.run(prompt)
+        with span("agent.run", model_id=model_id):
+            result = agent.run(prompt)
 
         logger.info("Successfully generated location recommendations")
         return result
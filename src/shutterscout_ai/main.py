@@ -1,15 +1,28 @@
 import argparse
+import json
 import sys
+import time
+from contextlib import nullcontext
+from typing import Optional
 
 from dotenv import load_dotenv
 from loguru import logger
 
+from shutterscout_ai.batch.jobs import JobQueue, load_specs
+from shutterscout_ai.batch.workers import run_batch
+from shutterscout_ai.config.paths import data_dir
 from shutterscout_ai.core.shutterscout_agent import get_location_recommendations
+from shutterscout_ai.publish.site import build_site, records_from_results
 from shutterscout_ai.tools.astronomy.astronomy import get_sunrise_sunset
+from shutterscout_ai.tools.combined.combiner import get_combined_data
 from shutterscout_ai.tools.location.location import get_location
 from shutterscout_ai.tools.photos.photos import search_flickr_photos
 from shutterscout_ai.tools.places.places import get_interesting_places
 from shutterscout_ai.tools.weather.weather import get_weather_forecast
+from shutterscout_ai.utils.exporters import JsonLogExporter, OTelExporter, render_json, render_prometheus
+from shutterscout_ai.utils.instrumentation import add_span_exporter
+from shutterscout_ai.utils.profiling import PROFILE_MODES, ProfileSession
+from shutterscout_ai.watch.watcher import DEFAULT_THRESHOLD, JsonlAlertSink, Watcher
 
 
 def test_tools() -> None:
@@ -49,6 +62,91 @@ def test_tools() -> None:
         logger.error(f"Error during tool testing: {str(e)}")
 
 
+def write_metrics(path: str, metrics_format: str, otel_exporter: Optional[OTelExporter]) -> None:
+    """Write the collected metrics (and spans, for the otel format) to a file"""
+    if metrics_format == "prometheus":
+        content = render_prometheus()
+    elif metrics_format == "otel":
+        document = otel_exporter.render_metrics(timestamp=time.time()) if otel_exporter else {}
+        if otel_exporter:
+            document.update(otel_exporter.render_spans())
+        content = json.dumps(document, indent=2)
+    else:
+        content = json.dumps(render_json(), indent=2)
+
+    with open(path, "w") as f:
+        f.write(content)
+    logger.info(f"Metrics written to {path}")
+
+
+def run_batch_command(args: argparse.Namespace) -> int:
+    """Queue, run, inspect or export a batch of locations; returns the process exit code"""
+    queue = JobQueue(args.db)
+    try:
+        if args.input:
+            added = queue.enqueue(load_specs(args.input))
+            logger.info(f"Queued {added} new locations from {args.input}")
+        if args.retry_failed:
+            logger.info(f"Retrying {queue.retry_failed()} failed jobs")
+        if args.export:
+            with open(args.export, "w") as f:
+                for record in queue.results(include_failed=True):
+                    f.write(json.dumps(record) + "\n")
+            logger.info(f"Results written to {args.export}")
+        if args.status or args.export:
+            logger.info(f"Jobs by state: {json.dumps(queue.counts())}")
+            return 0
+
+        stats = run_batch(
+            queue,
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            max_attempts=args.max_attempts,
+            combined_only=args.combined_only,
+            limit=args.limit,
+            recover=args.resume,
+            sectioned=args.sectioned,
+        )
+        logger.info(f"Batch summary: {json.dumps(stats)}")
+        return 0 if stats["stopped"] in ("drained", "limit") else 1
+    finally:
+        queue.close()
+
+
+def run_site_command(args: argparse.Namespace) -> int:
+    """Publish the finished jobs of a batch queue as a static site; returns the process exit code"""
+    queue = JobQueue(args.db)
+    try:
+        stats = build_site(
+            records_from_results(queue.results()),
+            args.output,
+            workers=args.workers,
+            force=args.force,
+            thumbnails=args.thumbnails,
+        )
+    finally:
+        queue.close()
+    logger.info(f"Site summary: {json.dumps(stats)}")
+    return 0
+
+
+def run_watch_command(args: argparse.Namespace) -> int:
+    """Watch saved locations and alert on good conditions tomorrow; returns the process exit code"""
+    watcher = Watcher(
+        load_specs(args.locations),
+        state_dir=args.state_dir or data_dir("watch"),
+        sink=JsonlAlertSink(args.alerts),
+        threshold=args.threshold,
+        recommend=args.recommend,
+    )
+    logger.info(f"Watching {len(watcher.specs)} locations, alerts go to {args.alerts}")
+    try:
+        watcher.run(args.interval, cycles=1 if args.once else None)
+    except KeyboardInterrupt:
+        logger.info("Watch stopped")
+    return 0
+
+
 def main() -> None:
     """Main entry point for the ShutterScout AI application."""
     parser = argparse.ArgumentParser(description="ShutterScout AI - Photography Location Scout")
@@ -58,31 +156,167 @@ def main() -> None:
         default="photography_location_recommendations.md",
         help="Output file path for recommendations (default: photography_location_recommendations.md)",
     )
+    parser.add_argument("--latitude", type=float, help="Latitude to scout instead of your IP location")
+    parser.add_argument("--longitude", type=float, help="Longitude to scout instead of your IP location")
+    parser.add_argument("--place", default="", help="Name of the location to scout")
+    parser.add_argument(
+        "--sectioned",
+        action="store_true",
+        help="Generate the report as concurrent sections instead of one long generation",
+    )
+    parser.add_argument("--metrics-output", help="Write collected metrics to this file when the run finishes")
+    parser.add_argument(
+        "--metrics-format",
+        choices=["prometheus", "otel", "json"],
+        default="prometheus",
+        help="Format for --metrics-output: Prometheus text, OTLP/JSON (metrics and spans) or plain JSON",
+    )
+    parser.add_argument("--log-spans", action="store_true", help="Log every traced span as a JSON line")
+    parser.add_argument(
+        "--profile",
+        nargs="+",
+        choices=PROFILE_MODES,
+        help="Profile the run with cProfile, a wall-clock sampling profiler and/or tracemalloc",
+    )
+    parser.add_argument(
+        "--profile-target",
+        choices=["recommendations", "combined"],
+        default="recommendations",
+        help="Run to profile: the full recommendation run, or get_combined_data alone (default: recommendations)",
+    )
+    parser.add_argument("--profile-dir", default="profile", help="Directory for profile output (default: profile)")
+
+    subparsers = parser.add_subparsers(dest="command")
+    batch_parser = subparsers.add_parser(
+        "batch", help="Scout many locations with worker processes; interrupted runs resume where they stopped"
+    )
+    batch_parser.add_argument(
+        "--db", default="shutterscout_jobs.sqlite", help="Job queue database (default: shutterscout_jobs.sqlite)"
+    )
+    batch_parser.add_argument(
+        "--input", help="CSV (latitude, longitude and/or place columns) or JSON Lines file of locations to queue"
+    )
+    batch_parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    batch_parser.add_argument("--max-in-flight", type=int, help="Jobs handed to workers at once (default: 2x workers)")
+    batch_parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per job (default: 3)")
+    batch_parser.add_argument("--limit", type=int, help="Stop after this many jobs")
+    batch_parser.add_argument(
+        "--combined-only", action="store_true", help="Only collect combined data, skip the model recommendations"
+    )
+    batch_parser.add_argument("--retry-failed", action="store_true", help="Give failed jobs another set of attempts")
+    batch_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Requeue jobs an interrupted run left running now instead of when their lease expires; "
+        "only when no other batch run uses the same database",
+    )
+    batch_parser.add_argument(
+        "--sectioned",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Generate each report as concurrent sections",
+    )
+    batch_parser.add_argument("--status", action="store_true", help="Show job counts per state and exit")
+    batch_parser.add_argument("--export", help="Write finished jobs as JSON Lines to this file and exit")
+
+    site_parser = subparsers.add_parser(
+        "site", help="Publish batch results as a static site; rebuilds only render pages whose data changed"
+    )
+    site_parser.add_argument(
+        "--db", default="shutterscout_jobs.sqlite", help="Job queue database (default: shutterscout_jobs.sqlite)"
+    )
+    site_parser.add_argument("--output", default="site", help="Site directory (default: site)")
+    site_parser.add_argument("--workers", type=int, help="Render processes (default: one per CPU)")
+    site_parser.add_argument("--force", action="store_true", help="Render every page, not only changed ones")
+    site_parser.add_argument(
+        "--thumbnails",
+        action="store_true",
+        help="Copy photo thumbnails into the site and show near-identical photos once, instead of linking to Flickr",
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Poll the weather for saved locations and alert when tomorrow's conditions become good"
+    )
+    watch_parser.add_argument(
+        "--locations", required=True, help="CSV (latitude, longitude and/or place columns) or JSON Lines file"
+    )
+    watch_parser.add_argument("--interval", type=float, default=1800.0, help="Seconds between polls (default: 1800)")
+    watch_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Light score from 0 to 1 that counts as good (default: {DEFAULT_THRESHOLD})",
+    )
+    watch_parser.add_argument("--alerts", default="shutterscout_alerts.jsonl", help="Append alerts to this file")
+    watch_parser.add_argument(
+        "--state-dir", help="Where the last seen data per location is kept (default: watch under the data directory)"
+    )
+    watch_parser.add_argument("--recommend", action="store_true", help="Add the model's recommendations to alerts")
+    watch_parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+
     args = parser.parse_args()
+    if (args.latitude is None) != (args.longitude is None):
+        parser.error("--latitude and --longitude must be given together")
 
     # Configure logger
     logger.remove()  # Remove default handler
     log_level = "DEBUG" if args.verbose else "INFO"
     logger.add(sys.stderr, level=log_level)
 
+    if args.log_spans:
+        add_span_exporter(JsonLogExporter(level="INFO"))
+    otel_exporter = None
+    if args.metrics_output and args.metrics_format == "otel":
+        otel_exporter = OTelExporter()
+        add_span_exporter(otel_exporter)
+
     logger.info("Starting ShutterScout AI...")
     load_dotenv()
     logger.debug("Environment variables loaded")
 
+    if args.command == "batch":
+        exit_code = run_batch_command(args)
+        if args.metrics_output:
+            write_metrics(args.metrics_output, args.metrics_format, otel_exporter)
+        sys.exit(exit_code)
+    if args.command == "site":
+        exit_code = run_site_command(args)
+        if args.metrics_output:
+            write_metrics(args.metrics_output, args.metrics_format, otel_exporter)
+        sys.exit(exit_code)
+    if args.command == "watch":
+        exit_code = run_watch_command(args)
+        if args.metrics_output:
+            write_metrics(args.metrics_output, args.metrics_format, otel_exporter)
+        sys.exit(exit_code)
+
     # test_tools()
+    profile_session = ProfileSession(args.profile, output_dir=args.profile_dir) if args.profile else nullcontext()
     try:
-        logger.info("Getting photography location recommendations...")
-        recommendations = get_location_recommendations()
+        if args.profile_target == "combined" and args.profile:
+            logger.info("Profiling combined data collection...")
+            with profile_session:
+                data = get_combined_data(latitude=args.latitude, longitude=args.longitude, place_name=args.place)
+            logger.info(f"Collected data for {data['location']['city']} with {len(data['places'])} places")
+        else:
+            logger.info("Getting photography location recommendations...")
+            with profile_session:
+                recommendations = get_location_recommendations(
+                    latitude=args.latitude, longitude=args.longitude, place_name=args.place, sectioned=args.sectioned
+                )
 
-        with open(args.output, "w") as f:
-            f.write(recommendations)
+            with open(args.output, "w") as f:
+                f.write(recommendations)
 
-        logger.info("\nPhotography Location Recommendations:")
-        logger.info(recommendations)
+            logger.info("\nPhotography Location Recommendations:")
+            logger.info(recommendations)
 
     except Exception as e:
         logger.error(f"Error getting recommendations: {str(e)}")
 
+    if args.metrics_output:
+        write_metrics(args.metrics_output, args.metrics_format, otel_exporter)
+
     logger.info("ShutterScout AI stopped")
 
 
@@ -0,0 +1,425 @@
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, NotRequired, Optional, Tuple, TypedDict
+
+from loguru import logger
+
+from shutterscout_ai.batch.jobs import JobSpec, job_key
+from shutterscout_ai.tools.combined.combiner import CombinedData
+from shutterscout_ai.tools.itinerary.itinerary import light_factor
+from shutterscout_ai.tools.photos.thumbnails import PhotoAsset, collect_photo_assets
+from shutterscout_ai.utils import decoding
+
+# Part of every page hash; bump when templates change so the next build re-renders everything
+SITE_VERSION = 1
+MANIFEST_NAME = ".manifest.json"
+INDEX_PAGE_SIZE = 500
+# Pages handed to a worker process at once
+RENDER_CHUNK_SIZE = 64
+PHOTOS_PER_PLACE = 3
+THUMBNAILS_DIR = "thumbnails"
+MAP_WIDTH, MAP_HEIGHT = 1000, 560
+
+STYLE = """body{font-family:system-ui,sans-serif;max-width:60rem;margin:2rem auto;padding:0 1rem;color:#222}
+table{border-collapse:collapse;width:100%}td,th{padding:.3rem .5rem;border-bottom:1px solid #ddd;text-align:left}
+nav a{margin-right:1rem}.photos img{height:120px;margin:0 .3rem .3rem 0}
+svg{width:100%;height:auto;background:#eef3f7}"""
+
+
+class SiteRecord(TypedDict):
+    """One scouted location: its job spec, combined data and, when generated, the recommendations"""
+
+    spec: JobSpec
+    combined: CombinedData
+    recommendations: NotRequired[str]
+
+
+class BuildStats(TypedDict):
+    pages: int
+    rendered: int
+    skipped: int
+    removed: int
+    elapsed_seconds: float
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.casefold()).strip("-") or "location"
+
+
+def location_slug(spec: JobSpec, combined: CombinedData) -> str:
+    """File name of a location's page, stable across builds and unique per job"""
+    name = spec.get("place_name") or combined["location"]["city"]
+    return f"{slugify(name)}-{hashlib.sha256(job_key(spec).encode('utf-8')).hexdigest()[:8]}"
+
+
+def records_from_results(results: Iterable[Dict[str, Any]]) -> Iterable[SiteRecord]:
+    """Site records from JobQueue.results, skipping jobs without combined data"""
+    for result in results:
+        data = result.get("result") or {}
+        if "combined" not in data:
+            continue
+        record: SiteRecord = {"spec": result["spec"], "combined": data["combined"]}
+        if data.get("recommendations"):
+            record["recommendations"] = data["recommendations"]
+        yield record
+
+
+def _content_hash(data: Any) -> str:
+    if decoding.orjson is not None:
+        payload = decoding.orjson.dumps(data, option=decoding.orjson.OPT_SORT_KEYS)
+    else:
+        payload = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(b"%d:" % SITE_VERSION + payload).hexdigest()
+
+
+def _summary(slug: str, record: SiteRecord) -> Dict[str, Any]:
+    """What the index and map show for a location"""
+    combined = record["combined"]
+    location, days = combined["location"], combined["weather"]
+    return {
+        "slug": slug,
+        "name": record["spec"].get("place_name") or location["city"],
+        "country": location["country"],
+        "latitude": location["latitude"],
+        "longitude": location["longitude"],
+        "date": days[0]["time"][:10] if days else "",
+        "cloud_cover": days[0]["cloud_cover"] if days else None,
+        "score": light_factor(days[0]) if days else None,
+        "places": len(combined["places"]),
+    }
+
+
+_LINK = re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_CODE = re.compile(r"`([^`]+)`")
+
+
+def _inline(text: str) -> str:
+    text = html.escape(text, quote=False)
+    # The text is escaped already, apart from quotes, which would end the attribute
+    text = _LINK.sub(lambda m: f'<a href="{m.group(2).replace(chr(34), "&quot;")}">{m.group(1)}</a>', text)
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    return _CODE.sub(r"<code>\1</code>", text)
+
+
+def markdown_to_html(text: str) -> str:
+    """The markdown the reports use: headings, bullet lists, paragraphs, links, bold and code"""
+    parts: List[str] = []
+    paragraph: List[str] = []
+    in_list = False
+
+    def flush() -> None:
+        nonlocal in_list
+        if paragraph:
+            parts.append(f"<p>{' '.join(paragraph)}</p>")
+            paragraph.clear()
+        if in_list:
+            parts.append("</ul>")
+            in_list = False
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = re.match(r"(#{1,6})\s+(.*)", stripped)
+        if heading:
+            flush()
+            level = len(heading.group(1))
+            parts.append(f"<h{level}>{_inline(heading.group(2))}</h{level}>")
+        elif stripped.startswith(("- ", "* ")):
+            if paragraph:
+                parts.append(f"<p>{' '.join(paragraph)}</p>")
+                paragraph.clear()
+            if not in_list:
+                parts.append("<ul>")
+                in_list = True
+            parts.append(f"<li>{_inline(stripped[2:])}</li>")
+        elif stripped:
+            if in_list:
+                flush()
+            paragraph.append(_inline(stripped))
+        else:
+            flush()
+    flush()
+    return "\n".join(parts)
+
+
+def _page(title: str, body: str, root: str = "") -> str:
+    return (
+        f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+        f'<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>{html.escape(title)} - ShutterScout.AI</title><style>{STYLE}</style></head><body>"
+        f'<nav><a href="{root}index.html">All locations</a><a href="{root}map.html">Map</a></nav>\n'
+        f"{body}\n</body></html>\n"
+    )
+
+
+def _cell(value: Any, unit: str = "") -> str:
+    return "" if value is None else html.escape(f"{value}{unit}")
+
+
+def render_location(data: Dict[str, Any]) -> str:
+    combined: CombinedData = data["combined"]
+    location = combined["location"]
+    name = data["name"]
+    body = [
+        f"<h1>📍 {html.escape(name)}</h1>",
+        f"<p>{html.escape(', '.join(filter(None, (location['city'], location['region'], location['country']))))} "
+        f"({location['latitude']:.4f}, {location['longitude']:.4f}, {html.escape(location['timezone'])})</p>",
+        "<h2>Forecast</h2><table><tr><th>Day</th><th>Temperature</th><th>Clouds</th><th>Rain</th>"
+        "<th>Visibility</th><th>Wind</th><th>Sunrise</th><th>Sunset</th><th>Light</th></tr>",
+    ]
+    for day in combined["weather"]:
+        body.append(
+            f"<tr><td>{html.escape(day['time'][:10])}</td>"
+            f"<td>{_cell(day['temperature_min'])} to {_cell(day['temperature_max'], ' °C')}</td>"
+            f"<td>{_cell(day['cloud_cover'], '%')}</td><td>{_cell(day['precipitation_probability'], '%')}</td>"
+            f"<td>{_cell(day['visibility'], ' km')}</td><td>{_cell(day['wind_speed'], ' km/h')}</td>"
+            f"<td>{html.escape(day['sunrise_time'][11:16])}</td><td>{html.escape(day['sunset_time'][11:16])}</td>"
+            f"<td>{light_factor(day):.2f}</td></tr>"
+        )
+    body.append("</table>")
+
+    visits = combined.get("itinerary", {}).get("visits", [])
+    if visits:
+        body.append("<h2>Itinerary</h2><ol>")
+        body.extend(
+            f"<li>{html.escape(visit['start'][11:16])} to {html.escape(visit['end'][11:16])} "
+            f"{html.escape(visit['place'])} ({html.escape(visit['window'].replace('_', ' '))})</li>"
+            for visit in visits
+        )
+        body.append("</ol>")
+
+    assets: Optional[List[PhotoAsset]] = data.get("assets")
+    if combined["places"]:
+        body.append("<h2>Places</h2>")
+    for place in combined["places"]:
+        body.append(f"<h3>{html.escape(place['name'])}</h3>")
+        if assets is not None:
+            # Near-identical shots are shown once, under the first place they were found for
+            photos = [
+                (asset["url"], asset["title"], asset["thumbnail_path"] or asset["url"])
+                for asset in assets
+                if asset["places"][0] == place["name"]
+            ]
+        else:
+            photos = [
+                (photo["url"], photo["title"], photo["url"])
+                for photo in combined["photos_by_place"].get(place["name"], [])
+            ]
+        if photos:
+            body.append('<div class="photos">')
+            body.extend(
+                f'<a href="{html.escape(url)}"><img loading="lazy" src="{html.escape(src)}" '
+                f'alt="{html.escape(title or "Untitled")}"></a>'
+                for url, title, src in photos[:PHOTOS_PER_PLACE]
+            )
+            body.append("</div>")
+
+    if data.get("recommendations"):
+        body.append(f'<section class="report">{markdown_to_html(data["recommendations"])}</section>')
+    return _page(name, "\n".join(body), root="../")
+
+
+def render_index(data: Dict[str, Any]) -> str:
+    rows = [
+        f'<tr><td><a href="locations/{summary["slug"]}.html">{html.escape(summary["name"])}</a></td>'
+        f"<td>{html.escape(summary['country'])}</td><td>{html.escape(summary['date'])}</td>"
+        f"<td>{_cell(summary['cloud_cover'], '%')}</td>"
+        f"<td>{'' if summary['score'] is None else format(summary['score'], '.2f')}</td>"
+        f"<td>{summary['places']}</td></tr>"
+        for summary in data["summaries"]
+    ]
+    pages = " ".join(
+        f'<a href="{_index_name(number)}">{number}</a>' if number != data["number"] else f"<strong>{number}</strong>"
+        for number in range(1, data["total"] + 1)
+    )
+    body = (
+        f"<h1>Scouted locations</h1><p>{data['count']} locations</p>"
+        "<table><tr><th>Location</th><th>Country</th><th>Date</th><th>Clouds</th><th>Light</th><th>Places</th></tr>"
+        + "\n".join(rows)
+        + f"</table><p>{pages if data['total'] > 1 else ''}</p>"
+    )
+    return _page("Scouted locations", body)
+
+
+def render_map(data: Dict[str, Any]) -> str:
+    """All locations on an equirectangular map zoomed to their extent, coloured by light score"""
+    summaries = data["summaries"]
+    south = min((s["latitude"] for s in summaries), default=-60.0)
+    north = max((s["latitude"] for s in summaries), default=75.0)
+    west = min((s["longitude"] for s in summaries), default=-180.0)
+    east = max((s["longitude"] for s in summaries), default=180.0)
+    margin = max(north - south, east - west, 0.5) * 0.05
+    south, north, west, east = south - margin, north + margin, west - margin, east + margin
+    scale = min(MAP_WIDTH / (east - west), MAP_HEIGHT / (north - south))
+
+    markers = []
+    for summary in summaries:
+        x = (summary["longitude"] - west) * scale
+        y = (north - summary["latitude"]) * scale
+        score = summary["score"] if summary["score"] is not None else 0.0
+        colour = f"hsl({round(score * 120)},70%,45%)"
+        markers.append(
+            f'<a href="locations/{summary["slug"]}.html"><circle cx="{x:.1f}" cy="{y:.1f}" r="4" fill="{colour}">'
+            f"<title>{html.escape(summary['name'])}</title></circle></a>"
+        )
+    svg = (
+        f'<svg viewBox="0 0 {(east - west) * scale:.0f} {(north - south) * scale:.0f}" '
+        f'xmlns="http://www.w3.org/2000/svg">{"".join(markers)}</svg>'
+    )
+    return _page("Map", f"<h1>Map</h1><p>Green is good light, red is poor.</p>{svg}")
+
+
+RENDERERS = {"location": render_location, "index": render_index, "map": render_map}
+
+
+def _index_name(number: int) -> str:
+    return "index.html" if number == 1 else f"index-{number}.html"
+
+
+def _publish_photos(combined: CombinedData, output_dir: str) -> Optional[List[PhotoAsset]]:
+    """
+    A location's photos deduplicated by look, with their thumbnails copied into the site and linked
+    relative to the location page. None when the thumbnails cannot be collected.
+    """
+    try:
+        assets = collect_photo_assets(combined["photos_by_place"], processes=0)
+        for asset in assets:
+            if not asset["thumbnail_path"]:
+                continue
+            name = os.path.basename(asset["thumbnail_path"])
+            target = os.path.join(output_dir, THUMBNAILS_DIR, name)
+            if not os.path.exists(target):
+                temporary = f"{target}.{os.getpid()}.tmp"
+                shutil.copyfile(asset["thumbnail_path"], temporary)
+                os.replace(temporary, target)
+            asset["thumbnail_path"] = f"../{THUMBNAILS_DIR}/{name}"
+        return assets
+    except (OSError, ValueError) as e:
+        logger.warning(f"Failed to publish thumbnails, linking photos instead: {str(e)}")
+        return None
+
+
+def _render_pages(output_dir: str, pages: List[Tuple[str, str, Dict[str, Any]]]) -> int:
+    """Render and write a chunk of pages; runs in a worker process"""
+    for path, kind, data in pages:
+        if kind == "location" and data.get("thumbnails"):
+            # Only pages being rendered download and hash their thumbnails
+            data = {**data, "assets": _publish_photos(data["combined"], output_dir)}
+        target = os.path.join(output_dir, path)
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            f.write(RENDERERS[kind](data))
+        os.replace(target + ".tmp", target)
+    return len(pages)
+
+
+def _load_manifest(output_dir: str) -> Dict[str, str]:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable site manifest: {str(e)}")
+        return {}
+    return manifest["pages"] if manifest.get("version") == SITE_VERSION else {}
+
+
+def build_site(
+    records: Iterable[SiteRecord],
+    output_dir: str,
+    workers: Optional[int] = None,
+    force: bool = False,
+    thumbnails: bool = False,
+) -> BuildStats:
+    """
+    Render a static site with a page per location plus index and map pages. Every page's inputs are
+    hashed and the hashes kept in a manifest, so a rebuild only renders pages whose inputs changed and
+    removes pages of locations that are gone. Pages are rendered in parallel across worker processes.
+
+    Args:
+        records: Locations to publish, e.g. records_from_results(queue.results())
+        output_dir: Site directory, created when missing
+        workers: Worker processes (default one per CPU); 0 renders in this process
+        force: Render every page regardless of the manifest
+        thumbnails: Download photo thumbnails into the site, showing near-identical photos once,
+            instead of linking to Flickr's images
+
+    Raises:
+        ValueError: If two records would get the same page
+    """
+    start = time.perf_counter()
+    os.makedirs(os.path.join(output_dir, "locations"), exist_ok=True)
+    if thumbnails:
+        os.makedirs(os.path.join(output_dir, THUMBNAILS_DIR), exist_ok=True)
+    previous = {} if force else _load_manifest(output_dir)
+
+    pages: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+    summaries = []
+    for record in records:
+        slug = location_slug(record["spec"], record["combined"])
+        path = f"locations/{slug}.html"
+        if path in pages:
+            raise ValueError(f"Two records would both be published as {path}")
+        summary = _summary(slug, record)
+        summaries.append(summary)
+        pages[path] = ("location", {**record, "name": summary["name"], **({"thumbnails": True} if thumbnails else {})})
+
+    summaries.sort(key=lambda summary: (summary["name"].casefold(), summary["slug"]))
+    total = max(1, -(-len(summaries) // INDEX_PAGE_SIZE))
+    for number in range(1, total + 1):
+        chunk = summaries[(number - 1) * INDEX_PAGE_SIZE : number * INDEX_PAGE_SIZE]
+        pages[_index_name(number)] = (
+            "index",
+            {"summaries": chunk, "number": number, "total": total, "count": len(summaries)},
+        )
+    pages["map.html"] = ("map", {"summaries": summaries})
+
+    hashes = {path: _content_hash(data) for path, (_, data) in pages.items()}
+    stale = [
+        (path, kind, data)
+        for path, (kind, data) in pages.items()
+        if previous.get(path) != hashes[path] or not os.path.exists(os.path.join(output_dir, path))
+    ]
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if stale:
+        chunks = [stale[i : i + RENDER_CHUNK_SIZE] for i in range(0, len(stale), RENDER_CHUNK_SIZE)]
+        parallel = workers > 1 and len(chunks) > 1
+        executor: Executor = (
+            ProcessPoolExecutor(max_workers=min(workers, len(chunks))) if parallel else ThreadPoolExecutor(1)
+        )
+        with executor:
+            for _ in executor.map(_render_pages, [output_dir] * len(chunks), chunks):
+                pass
+
+    removed = 0
+    for path in set(previous) - set(pages):
+        try:
+            os.remove(os.path.join(output_dir, path))
+            removed += 1
+        except FileNotFoundError:
+            pass
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": SITE_VERSION, "pages": hashes}, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+    stats: BuildStats = {
+        "pages": len(pages),
+        "rendered": len(stale),
+        "skipped": len(pages) - len(stale),
+        "removed": removed,
+        "elapsed_seconds": time.perf_counter() - start,
+    }
+    logger.info(
+        f"Site built in {stats['elapsed_seconds']:.1f}s: {stats['rendered']} of {stats['pages']} pages rendered, "
+        f"{stats['removed']} removed"
+    )
+    return stats
@@ -0,0 +1,388 @@
+import mmap
+import os
+import threading
+import time
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict, is_dataclass
+from datetime import datetime, timezone, tzinfo
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, TypedDict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from loguru import logger
+
+from shutterscout_ai.config.paths import data_dir
+from shutterscout_ai.tools.astronomy.astronomy import SunTimes
+from shutterscout_ai.tools.weather.weather import DailyWeather
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Locations are bucketed on a 0.1 degree grid (about 11 km), so nearby lookups share their history
+QUANTUM_DEGREES = 0.1
+# Days with at most this much cloud cover count as clear
+CLEAR_CLOUD_COVER = 30.0
+
+WEATHER_COLUMNS = (
+    ("time", "q"),
+    ("observed_at", "q"),
+    ("temperature_min", "d"),
+    ("temperature_max", "d"),
+    ("cloud_cover", "d"),
+    ("precipitation_probability", "d"),
+    ("visibility", "d"),
+    ("wind_speed", "d"),
+    ("humidity", "d"),
+    ("sunrise", "q"),
+    ("sunset", "q"),
+)
+SUN_COLUMNS = (
+    ("time", "q"),
+    ("observed_at", "q"),
+    ("sunrise", "q"),
+    ("sunset", "q"),
+    ("day_length", "d"),
+)
+
+
+class MonthlyConditions(TypedDict):
+    """Average archived conditions for one calendar month"""
+
+    month: int
+    days: int
+    cloud_cover: float
+    precipitation_probability: float
+    visibility: float
+    clear_day_ratio: float
+    sunrise: str
+    sunset: str
+
+
+class SeasonalConditions(TypedDict):
+    """Archived conditions for a location, aggregated per month"""
+
+    observations: int
+    first_day: str
+    last_day: str
+    by_month: List[MonthlyConditions]
+    best_months: List[int]
+
+
+def quantize(latitude: float, longitude: float) -> Tuple[int, int]:
+    """Grid cell of a coordinate"""
+    return round(latitude / QUANTUM_DEGREES), round(longitude / QUANTUM_DEGREES)
+
+
+def _epoch(timestamp: str) -> int:
+    """Seconds since the epoch for an ISO 8601 timestamp; naive timestamps are taken as UTC"""
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _clock_seconds(clock: str) -> int:
+    """Seconds since midnight for "7:27:02 AM" or "10:22:35" style times"""
+    text, _, meridiem = clock.strip().partition(" ")
+    hours, minutes, seconds = (int(part) for part in text.split(":"))
+    if meridiem.upper() == "PM" and hours != 12:
+        hours += 12
+    elif meridiem.upper() == "AM" and hours == 12:
+        hours = 0
+    return hours * 3600 + minutes * 60 + seconds
+
+
+class ColumnarTable:
+    """
+    Append-only table stored column by column, partitioned by grid cell.
+
+    Every partition is a directory holding one flat binary file per column (array typecodes), so scans
+    memory-map only the columns they read, and appends are plain writes at the end of each file.
+    Rows are never updated: readers keep the last row written for each time value.
+    """
+
+    def __init__(self, directory: str, columns: Sequence[Tuple[str, str]], time_column: str = "time"):
+        self.directory = directory
+        self.columns = dict(columns)
+        self.time_column = time_column
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _partition(self, cell: Tuple[int, int]) -> str:
+        return os.path.join(self.directory, f"cell={cell[0]}_{cell[1]}")
+
+    def _path(self, partition: str, column: str) -> str:
+        return os.path.join(partition, f"{column}.{self.columns[column]}")
+
+    @contextmanager
+    def _locked(self, partition: str) -> Iterator[None]:
+        # The thread lock covers this process, flock covers other processes appending to the same archive
+        with self._lock, open(os.path.join(partition, ".lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _row_count(self, partition: str) -> int:
+        counts = []
+        for column, typecode in self.columns.items():
+            path = self._path(partition, column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // array(typecode).itemsize)
+        return min(counts)
+
+    def append(self, cell: Tuple[int, int], rows: Sequence[Dict[str, float]]) -> int:
+        """
+        Append rows to a cell's partition. Every row must have a value for every column.
+
+        Returns:
+            Number of rows in the partition afterwards
+        """
+        if not rows:
+            return self.row_count(cell)
+        partition = self._partition(cell)
+        os.makedirs(partition, exist_ok=True)
+        with self._locked(partition):
+            # An interrupted append can leave some columns longer than others; cut them back first
+            count = self._row_count(partition)
+            for column, typecode in self.columns.items():
+                path = self._path(partition, column)
+                with open(path, "ab") as f:
+                    f.truncate(count * array(typecode).itemsize)
+                    array(typecode, [row[column] for row in rows]).tofile(f)
+            return count + len(rows)
+
+    def row_count(self, cell: Tuple[int, int]) -> int:
+        partition = self._partition(cell)
+        return self._row_count(partition) if os.path.isdir(partition) else 0
+
+    def cells(self) -> List[Tuple[int, int]]:
+        """Cells with archived rows"""
+        cells = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith("cell="):
+                latitude, _, longitude = name[len("cell=") :].partition("_")
+                cells.append((int(latitude), int(longitude)))
+        return cells
+
+    def _read_column(self, partition: str, column: str, count: int) -> List[float]:
+        typecode = self.columns[column]
+        if count == 0:
+            return []
+        with open(self._path(partition, column), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            with memoryview(m) as whole, whole[: count * array(typecode).itemsize] as used, used.cast(typecode) as view:
+                return view.tolist()
+
+    def scan(
+        self,
+        cell: Tuple[int, int],
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, float]]:
+        """
+        Rows of a cell with start <= time < end, latest write per time value, ordered by time.
+
+        Args:
+            cell: Grid cell from quantize()
+            start: Inclusive lower bound on the time column, in epoch seconds
+            end: Exclusive upper bound on the time column, in epoch seconds
+            columns: Columns to read (default all); the time column is always included
+        """
+        partition = self._partition(cell)
+        if not os.path.isdir(partition):
+            return []
+        wanted = list(dict.fromkeys([self.time_column, *(columns or self.columns)]))
+        count = self._row_count(partition)
+        times = self._read_column(partition, self.time_column, count)
+        latest: Dict[int, int] = {}
+        for index, value in enumerate(times):
+            if (start is None or value >= start) and (end is None or value < end):
+                latest[value] = index
+        if not latest:
+            return []
+        data = {column: self._read_column(partition, column, count) for column in wanted}
+        return [{column: data[column][latest[value]] for column in wanted} for value in sorted(latest)]
+
+    def aggregate(
+        self,
+        cell: Tuple[int, int],
+        by: str,
+        columns: Sequence[str],
+        zone: tzinfo = timezone.utc,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+    ) -> Dict[int, Dict[str, float]]:
+        """
+        Mean of the given columns grouped by the "month" (1-12) or "hour" (0-23) of the time column.
+        Each group also reports its row count under "count".
+        """
+        if by not in ("month", "hour"):
+            raise ValueError(f"Cannot aggregate by {by!r}, expected 'month' or 'hour'")
+        sums: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for row in self.scan(cell, start, end, columns):
+            moment = datetime.fromtimestamp(row[self.time_column], zone)
+            group = sums[moment.month if by == "month" else moment.hour]
+            group["count"] += 1
+            for column in columns:
+                group[column] += row[column]
+        return {
+            key: {"count": group["count"], **{column: group[column] / group["count"] for column in columns}}
+            for key, group in sorted(sums.items())
+        }
+
+
+class ConditionsArchive:
+    """Every weather forecast and sun time observation the tools fetched, by grid cell and day"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.weather = ColumnarTable(os.path.join(directory, "weather"), WEATHER_COLUMNS)
+        self.sun = ColumnarTable(os.path.join(directory, "sun"), SUN_COLUMNS)
+
+    def record_weather(self, latitude: float, longitude: float, forecast: List[DailyWeather]) -> None:
+        observed_at = int(time.time())
+        rows = [
+            {
+                "time": _epoch(day["time"]),
+                "observed_at": observed_at,
+                "temperature_min": day["temperature_min"],
+                "temperature_max": day["temperature_max"],
+                "cloud_cover": day["cloud_cover"],
+                "precipitation_probability": day["precipitation_probability"],
+                "visibility": day["visibility"],
+                "wind_speed": day["wind_speed"],
+                "humidity": day["humidity"],
+                "sunrise": _epoch(day["sunrise_time"]) if day.get("sunrise_time") else 0,
+                "sunset": _epoch(day["sunset_time"]) if day.get("sunset_time") else 0,
+            }
+            for day in forecast
+        ]
+        self.weather.append(quantize(latitude, longitude), rows)
+
+    def record_sun_times(self, latitude: float, longitude: float, sun_times: SunTimes, day: str = "") -> None:
+        """
+        Args:
+            sun_times: Result of get_sunrise_sunset, as the dataclass or a dict
+            day: UTC date the times are for as YYYY-MM-DD, default today
+        """
+        values = asdict(sun_times) if is_dataclass(sun_times) else sun_times
+        observed_at = int(time.time())
+        midnight = _epoch(day) if day else observed_at - observed_at % 86400
+        sunrise = midnight + _clock_seconds(values["sunrise"])
+        sunset = midnight + _clock_seconds(values["sunset"])
+        if sunset < sunrise:
+            # West of Greenwich the sunset can fall on the next UTC day
+            sunset += 86400
+        row = {
+            "time": midnight,
+            "observed_at": observed_at,
+            "sunrise": sunrise,
+            "sunset": sunset,
+            "day_length": _clock_seconds(values["day_length"]),
+        }
+        self.sun.append(quantize(latitude, longitude), [row])
+
+    def seasonal_conditions(
+        self, latitude: float, longitude: float, timezone_name: str = ""
+    ) -> Optional[SeasonalConditions]:
+        """
+        Archived conditions for a location per month, with months ranked by expected light.
+        Returns None when nothing was archived for the location yet.
+
+        Args:
+            latitude: Location latitude
+            longitude: Location longitude
+            timezone_name: IANA timezone for the month boundaries and the reported sunrise/sunset times
+        """
+        cell = quantize(latitude, longitude)
+        weather = self.weather.scan(cell)
+        if not weather:
+            return None
+        zone = _zone(timezone_name)
+
+        # Sunrise and sunset per day: forecast values, overridden by sunrise-sunset.org observations
+        sun_by_day = {row["time"] // 86400: (row["sunrise"], row["sunset"]) for row in weather if row["sunrise"]}
+        sun_by_day.update({row["time"] // 86400: (row["sunrise"], row["sunset"]) for row in self.sun.scan(cell)})
+
+        months: Dict[int, List[Dict[str, float]]] = defaultdict(list)
+        for row in weather:
+            months[datetime.fromtimestamp(row["time"], zone).month].append(row)
+        sun_months: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for day, times in sun_by_day.items():
+            sun_months[datetime.fromtimestamp(day * 86400, zone).month].append(times)
+
+        by_month: List[MonthlyConditions] = []
+        for month, rows in sorted(months.items()):
+            count = len(rows)
+            sun_times = sun_months.get(month, [])
+            by_month.append(
+                {
+                    "month": month,
+                    "days": count,
+                    "cloud_cover": round(sum(r["cloud_cover"] for r in rows) / count, 1),
+                    "precipitation_probability": round(sum(r["precipitation_probability"] for r in rows) / count, 1),
+                    "visibility": round(sum(r["visibility"] for r in rows) / count, 1),
+                    "clear_day_ratio": round(sum(r["cloud_cover"] <= CLEAR_CLOUD_COVER for r in rows) / count, 2),
+                    "sunrise": _mean_clock([sunrise for sunrise, _ in sun_times], zone),
+                    "sunset": _mean_clock([sunset for _, sunset in sun_times], zone),
+                }
+            )
+
+        ranked = sorted(by_month, key=_light_score, reverse=True)
+        return {
+            "observations": len(weather),
+            "first_day": datetime.fromtimestamp(weather[0]["time"], zone).date().isoformat(),
+            "last_day": datetime.fromtimestamp(weather[-1]["time"], zone).date().isoformat(),
+            "by_month": by_month,
+            "best_months": [month["month"] for month in ranked[:3]],
+        }
+
+
+def _light_score(month: MonthlyConditions) -> float:
+    """Higher for clearer, drier months with better visibility"""
+    visibility = min(month["visibility"], 20.0) / 20.0 * 100.0
+    return 0.5 * (100.0 - month["cloud_cover"]) + 0.3 * (100.0 - month["precipitation_probability"]) + 0.2 * visibility
+
+
+def _zone(timezone_name: str) -> tzinfo:
+    if not timezone_name:
+        return timezone.utc
+    try:
+        return ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone {timezone_name!r}, reporting archived conditions in UTC")
+        return timezone.utc
+
+
+def _mean_clock(timestamps: List[int], zone: tzinfo) -> str:
+    """Average local time of day as HH:MM, or an empty string without data"""
+    if not timestamps:
+        return ""
+    seconds = [
+        moment.hour * 3600 + moment.minute * 60 + moment.second
+        for moment in (datetime.fromtimestamp(value, zone) for value in timestamps)
+    ]
+    mean = int(sum(seconds) / len(seconds))
+    return f"{mean // 3600:02d}:{mean % 3600 // 60:02d}"
+
+
+def archive_enabled() -> bool:
+    """Archiving is on unless SHUTTERSCOUT_ARCHIVE=0"""
+    return os.getenv("SHUTTERSCOUT_ARCHIVE", "1") != "0"
+
+
+_archive: Optional[ConditionsArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> ConditionsArchive:
+    """Shared archive in SHUTTERSCOUT_ARCHIVE_DIR, or the conditions directory under the data directory"""
+    global _archive
+    directory = os.getenv("SHUTTERSCOUT_ARCHIVE_DIR") or data_dir("conditions")
+    with _archive_lock:
+        if _archive is None or _archive.directory != directory:
+            _archive = ConditionsArchive(directory)
+        return _archive
@@ -4,6 +4,9 @@ import requests
 from loguru import logger
 from smolagents import tool
 
+from shutterscout_ai.utils.decoding import Projection, decode_json
+from shutterscout_ai.utils.http import fetch
+
 
 @dataclass
 class SunTimes:
@@ -14,6 +17,9 @@ class SunTimes:
     day_length: str
 
 
+SUN_TIMES_PROJECTION = Projection(("status", "results.sunrise", "results.sunset", "results.day_length"))
+
+
 @tool
 def get_sunrise_sunset(latitude: float, longitude: float) -> SunTimes:
     """
@@ -27,10 +33,10 @@ def get_sunrise_sunset(latitude: float, longitude: float) -> SunTimes:
     try:
         url = f"https://api.sunrise-sunset.org/json?lat={latitude}&lng={longitude}&date=today"
 
-        response = requests.get(url)
+        response = fetch("get_sunrise_sunset", url)
         response.raise_for_status()
 
-        data = response.json()
+        data = decode_json(response, SUN_TIMES_PROJECTION)
         if data.get("status") != "OK":
             logger.error(f"API returned error status: {data.get('status')}")
             raise ValueError(f"Sunrise-sunset API error: {data.get('status')}")
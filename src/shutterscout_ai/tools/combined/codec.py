@@ -0,0 +1,324 @@
+import re
+import struct
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from shutterscout_ai.tools.photos.photos import PhotoSize, get_photo_urls
+
+MAGIC = b"SSC"
+# Bump when the layout changes; decoding rejects versions it does not know
+VERSION = 1
+
+# Value tags
+NULL, FALSE, TRUE, INT, DECIMAL, FLOAT, STRING, LIST, RECORD, TIMESTAMP, PHOTO = range(11)
+
+# Timestamp layouts stored as seconds since the epoch: provider ISO times ("2025-02-12T05:00:00Z") and
+# Flickr's date taken ("2025-02-12 05:00:00")
+TIMESTAMP_SEPARATORS = ("T", " ")
+TIMESTAMP_SUFFIXES = ("Z", "")
+# Decimal places kept exactly for floats written as scaled integers; longer ones are stored as doubles
+MAX_DECIMAL_SCALE = 15
+PHOTO_SIZES = tuple(PhotoSize)
+PHOTO_KEYS = frozenset(("id", "title", "url", "views", "date_taken"))
+FLICKR_URL = re.compile(r"https://farm(\d+)\.staticflickr\.com/(\w+)/(\d+)_([0-9a-f]+)(?:_([a-z]))?\.jpg")
+
+_DOUBLE = struct.Struct("<d")
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+_POWERS = [10**scale for scale in range(MAX_DECIMAL_SCALE + 1)]
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _timestamp(text: str) -> Optional[Tuple[int, int]]:
+    """Layout index and epoch seconds when text is exactly one of the timestamp layouts"""
+    if len(text) == 20 and text[10] == "T" and text[19] == "Z":
+        layout = 0
+    elif len(text) == 19 and text[10] == " ":
+        layout = 1
+    else:
+        return None
+    try:
+        moment = datetime.fromisoformat(text[:19])
+    except ValueError:
+        return None
+    # fromisoformat also takes other layouts of the same length; only keep those that print back identically
+    if moment.isoformat(TIMESTAMP_SEPARATORS[layout]) != text[:19]:
+        return None
+    return layout, (moment - _EPOCH) // _SECOND
+
+
+def _format_timestamp(layout: int, seconds: int) -> str:
+    return (_EPOCH + timedelta(seconds=seconds)).isoformat(TIMESTAMP_SEPARATORS[layout]) + TIMESTAMP_SUFFIXES[layout]
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.body = bytearray()
+        self.strings: Dict[str, int] = {}
+        self.shapes: Dict[Tuple[str, ...], int] = {}
+
+    def string(self, text: str) -> None:
+        index = self.strings.get(text)
+        if index is None:
+            index = self.strings[text] = len(self.strings)
+        _write_varint(self.body, index)
+
+    def value(self, value: Any) -> None:
+        body = self.body
+        # Exact type checks for the common cases first; bool is an int subclass and must not take the int path
+        kind = type(value)
+        if kind is str:
+            self.text(value)
+        elif kind is float:
+            self.float(value)
+        elif kind is int:
+            body.append(INT)
+            _write_varint(body, _zigzag(value))
+        elif kind is dict:
+            if not (PHOTO_KEYS.issuperset(value) and self.photo(value)):
+                self.record(value)
+        elif kind is list or kind is tuple:
+            body.append(LIST)
+            _write_varint(body, len(value))
+            for item in value:
+                self.value(item)
+        elif value is None:
+            body.append(NULL)
+        elif value is True:
+            body.append(TRUE)
+        elif value is False:
+            body.append(FALSE)
+        # Subclasses such as str enums are stored as their base type, as json.dumps does
+        elif isinstance(value, str):
+            self.text(str.__str__(value))
+        elif isinstance(value, (int, float, dict, list)):
+            self.value(next(base for base in (int, float, dict, list) if isinstance(value, base))(value))
+        else:
+            raise TypeError(f"Cannot encode value of type {kind.__name__}")
+
+    def text(self, value: str) -> None:
+        stamp = _timestamp(value)
+        if stamp is None:
+            self.body.append(STRING)
+            self.string(value)
+        else:
+            self.body.append(TIMESTAMP)
+            self.body.append(stamp[0])
+            _write_varint(self.body, _zigzag(stamp[1]))
+
+    def float(self, value: float) -> None:
+        # Most values come from JSON with a few decimals, so their shortest repr is a small scaled integer
+        text = repr(value)
+        whole, _, fraction = text.partition(".")
+        if fraction and len(fraction) <= MAX_DECIMAL_SCALE and "e" not in fraction and whole != "-0":
+            scaled = int(whole + fraction)
+            if scaled / _POWERS[len(fraction)] == value:
+                self.body.append(DECIMAL)
+                self.body.append(len(fraction))
+                _write_varint(self.body, _zigzag(scaled))
+                return
+        self.body.append(FLOAT)
+        self.body += _DOUBLE.pack(value)
+
+    def record(self, value: Dict[str, Any]) -> None:
+        keys = tuple(value)
+        shape = self.shapes.get(keys)
+        if shape is None:
+            if not all(isinstance(key, str) for key in keys):
+                raise TypeError("Cannot encode a dict with non-string keys")
+            shape = self.shapes[keys] = len(self.shapes)
+        self.body.append(RECORD)
+        _write_varint(self.body, shape)
+        for item in value.values():
+            self.value(item)
+
+    def photo(self, photo: Dict[str, Any]) -> bool:
+        """A PhotoUrl as its Flickr farm/server/id/secret; False when the URL is not one get_photo_urls builds"""
+        url, photo_id, title = photo.get("url"), photo.get("id"), photo.get("title")
+        views, date_taken = photo.get("views"), photo.get("date_taken")
+        if not (isinstance(url, str) and isinstance(photo_id, str) and isinstance(title, str)):
+            return False
+        if ("views" in photo and type(views) is not int) or ("date_taken" in photo and not isinstance(date_taken, str)):
+            return False
+        match = FLICKR_URL.fullmatch(url)
+        if match is None:
+            return False
+        farm, server, url_id, secret, size = match.groups()
+        if url_id != photo_id or str(int(photo_id)) != photo_id or str(int(farm)) != farm or len(secret) % 2:
+            return False
+        if size is not None and size not in PhotoSize._value2member_map_:
+            return False
+
+        body = self.body
+        body.append(PHOTO)
+        body.append(PHOTO_SIZES.index(PhotoSize(size or "")) | ("views" in photo) << 4 | ("date_taken" in photo) << 5)
+        _write_varint(body, int(farm))
+        self.string(server)
+        _write_varint(body, int(photo_id))
+        _write_varint(body, len(secret) // 2)
+        body += bytes.fromhex(secret)
+        self.string(title)
+        if "views" in photo:
+            _write_varint(body, _zigzag(views))
+        if "date_taken" in photo:
+            self.text(date_taken)
+        return True
+
+    def finish(self) -> bytes:
+        # Record keys share the string table with values, so a key like "name" is stored once
+        for keys in self.shapes:
+            for key in keys:
+                if key not in self.strings:
+                    self.strings[key] = len(self.strings)
+
+        out = bytearray(MAGIC)
+        out.append(VERSION)
+        _write_varint(out, len(self.strings))
+        for text in self.strings:
+            data = text.encode("utf-8")
+            _write_varint(out, len(data))
+            out += data
+        _write_varint(out, len(self.shapes))
+        for keys in self.shapes:
+            _write_varint(out, len(keys))
+            for key in keys:
+                _write_varint(out, self.strings[key])
+        return bytes(out + self.body)
+
+
+class _Decoder:
+    def __init__(self, data: bytes) -> None:
+        if data[:3] != MAGIC:
+            raise ValueError("Not ShutterScout encoded data")
+        if len(data) < 4 or data[3] != VERSION:
+            raise ValueError(f"Unsupported encoding version {data[3] if len(data) > 3 else None}")
+        self.data = data
+        self.position = 4
+        self.strings: List[str] = [self.text() for _ in range(self.varint())]
+        self.shapes: List[Tuple[str, ...]] = [
+            tuple(self.strings[self.varint()] for _ in range(self.varint())) for _ in range(self.varint())
+        ]
+        self.readers: Dict[int, Callable[[], Any]] = {
+            NULL: lambda: None,
+            FALSE: lambda: False,
+            TRUE: lambda: True,
+            INT: lambda: _unzigzag(self.varint()),
+            DECIMAL: self.decimal,
+            FLOAT: self.double,
+            STRING: lambda: self.strings[self.varint()],
+            LIST: lambda: [self.value() for _ in range(self.varint())],
+            RECORD: self.record,
+            TIMESTAMP: self.timestamp,
+            PHOTO: self.photo,
+        }
+
+    def varint(self) -> int:
+        data, position = self.data, self.position
+        result = shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                self.position = position
+                return result
+            shift += 7
+
+    def take(self, length: int) -> bytes:
+        start = self.position
+        self.position += length
+        if self.position > len(self.data):
+            raise IndexError("data ends inside a value")
+        return self.data[start : self.position]
+
+    def text(self) -> str:
+        return self.take(self.varint()).decode("utf-8")
+
+    def value(self) -> Any:
+        tag = self.data[self.position]
+        self.position += 1
+        return self.readers[tag]()
+
+    def decimal(self) -> float:
+        scale = self.data[self.position]
+        self.position += 1
+        return _unzigzag(self.varint()) / _POWERS[scale]
+
+    def double(self) -> float:
+        return _DOUBLE.unpack(self.take(8))[0]
+
+    def record(self) -> Dict[str, Any]:
+        return {key: self.value() for key in self.shapes[self.varint()]}
+
+    def timestamp(self) -> str:
+        layout = self.data[self.position]
+        self.position += 1
+        return _format_timestamp(layout, _unzigzag(self.varint()))
+
+    def photo(self) -> Dict[str, Any]:
+        flags = self.data[self.position]
+        self.position += 1
+        flickr: Dict[str, Any] = {"farm": self.varint(), "server": self.strings[self.varint()]}
+        flickr["id"] = str(self.varint())
+        flickr["secret"] = self.take(self.varint()).hex()
+        flickr["title"] = self.strings[self.varint()]
+        if flags & 0x10:
+            flickr["views"] = _unzigzag(self.varint())
+        if flags & 0x20:
+            flickr["datetaken"] = self.value()
+        # The URL itself is not stored; it is rebuilt the same way the search built it
+        return get_photo_urls([flickr], PHOTO_SIZES[flags & 0x0F])[0]
+
+
+def encode(value: Any) -> bytes:
+    """
+    Encode combined data, or any part of it such as DailyWeather, Place, PhotoUrl or SunTimes, compactly.
+
+    Every string is stored once in a table and referenced by index, dicts with the same keys share one
+    record shape so keys are not repeated, numbers are varints or scaled decimals, ISO and Flickr
+    timestamps are epoch seconds, and Flickr photo URLs are reduced to farm/server/id/secret. Decoding
+    gives back an equal value; tuples come back as lists, as with JSON.
+
+    Args:
+        value: JSON-like value of dicts with string keys, lists, strings, numbers, booleans and None
+
+    Raises:
+        TypeError: If the value contains anything else
+    """
+    encoder = _Encoder()
+    encoder.value(value)
+    return encoder.finish()
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decode a value written by encode.
+
+    Args:
+        data: Encoded bytes
+
+    Raises:
+        ValueError: If the data is not encoded by encode, uses an unknown version or is truncated
+    """
+    try:
+        decoder = _Decoder(bytes(data))
+        value = decoder.value()
+    except (IndexError, KeyError, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt encoded data: {str(e)}") from e
+    if decoder.position != len(decoder.data):
+        raise ValueError("Corrupt encoded data: trailing bytes")
+    return value
@@ -1,15 +1,20 @@
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
-from typing import List, TypedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, NotRequired, Optional, TypedDict
 
 from loguru import logger
 from smolagents import tool
 
+from shutterscout_ai.tools.archive.archive import SeasonalConditions, archive_enabled, get_archive
 from shutterscout_ai.tools.astronomy.astronomy import SunTimes, get_sunrise_sunset
+from shutterscout_ai.tools.horizon.horizon import HorizonLight, get_dem, place_light
+from shutterscout_ai.tools.itinerary.itinerary import DayPlan, plan_day
 from shutterscout_ai.tools.location.location import LocationInfo, get_location
-from shutterscout_ai.tools.photos.photos import PhotoUrl, search_flickr_photos
+from shutterscout_ai.tools.photos.photos import PhotoUrl, deduplicate_photos, search_flickr_photos
 from shutterscout_ai.tools.places.places import Place, get_interesting_places
 from shutterscout_ai.tools.weather.weather import DailyWeather, get_weather_forecast
+from shutterscout_ai.utils.instrumentation import span, submit_traced
 
 
 class CombinedData(TypedDict):
@@ -53,6 +58,33 @@ class CombinedData(TypedDict):
                 - id (str): Photo identifier
                 - title (str): Photo title
                 - url (str): Direct URL to photo
+                - views (int): Flickr view count
+                - date_taken (str): When the photo was taken
+              Photos are ranked by views and date taken, and each photo only appears under one place.
+
+        seasonal_conditions (SeasonalConditions, optional): Conditions archived from earlier runs for this
+            location, only present once there is history:
+            - observations (int): Number of archived forecast days
+            - first_day, last_day (str): Archived date range
+            - by_month (List[MonthlyConditions]): Average cloud cover, precipitation probability, visibility,
+              share of clear days and local sunrise/sunset time per month
+            - best_months (List[int]): Up to three months with the best expected light, best first
+
+        itinerary (DayPlan, optional): Route for the first forecast day through the places, with every stop
+            timed inside a blue or golden hour window and the travel between stops accounted for:
+            - visits (List[PlannedVisit]): Place, light window, arrival/start/end local time, travel and score
+            - windows (List[LightWindow]): The day's light windows in local time
+            - unvisited (List[str]): Places that did not fit
+
+        horizon_light (dict[str, HorizonLight], optional): Direct sunlight per place name on the first forecast
+            day with the surrounding terrain taken into account, only present when elevation tiles cover the
+            location:
+            - lit (bool): Whether the sun clears the local skyline at all that day
+            - flat_sunrise, flat_sunset (str): UTC sunrise and sunset over a flat horizon
+            - sunrise, sunset (str): UTC times the sun actually clears the local skyline
+            - sunrise_delay_minutes, sunset_advance_minutes (float): Light lost to the terrain
+            - golden_morning_minutes, golden_evening_minutes (float): Direct golden-hour light left
+            - max_horizon_degrees (float): Highest point of the skyline
     """
 
     location: LocationInfo
@@ -60,10 +92,19 @@ class CombinedData(TypedDict):
     sun_times: SunTimes
     places: List[Place]
     photos_by_place: dict[str, List[PhotoUrl]]
+    seasonal_conditions: NotRequired[SeasonalConditions]
+    itinerary: NotRequired[DayPlan]
+    horizon_light: NotRequired[Dict[str, HorizonLight]]
 
 
 @tool
-def get_combined_data(max_places: int = 5, photo_radius_km: int = 5) -> CombinedData:
+def get_combined_data(
+    max_places: int = 5,
+    photo_radius_km: int = 5,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    place_name: str = "",
+) -> CombinedData:
     """
     Combines data from all ShutterScout AI tools into a single comprehensive response.
     Uses concurrent execution where possible to improve performance.
@@ -75,6 +116,9 @@ def get_combined_data(max_places: int = 5, photo_radius_km: int = 5) -> Combined
     Args:
         max_places: Maximum number of interesting places to fetch (default: 5)
         photo_radius_km: Radius in kilometers to search for photos around each place (default: 5)
+        latitude: Optional latitude to scout instead of the caller's IP location
+        longitude: Optional longitude to scout instead of the caller's IP location
+        place_name: Optional name of the location being scouted
 
     Returns:
         CombinedData: A TypedDict containing all aggregated information:
@@ -83,6 +127,9 @@ def get_combined_data(max_places: int = 5, photo_radius_km: int = 5) -> Combined
             - sun_times: Sunrise/sunset times
             - places: List of interesting locations nearby
             - photos_by_place: Dictionary of photos for each place
+            - seasonal_conditions: Monthly conditions archived from earlier runs, when available
+            - itinerary: Day plan visiting the places in good light, when there are places to visit
+            - horizon_light: Terrain-corrected sunrise and sunset per place, when elevation tiles are installed
 
     Raises:
         RuntimeError: If critical data (location, weather) cannot be fetched
@@ -102,64 +149,148 @@ def get_combined_data(max_places: int = 5, photo_radius_km: int = 5) -> Combined
         - Places are limited to avoid excessive API usage
         - All timestamps are in UTC unless otherwise specified
     """
-    # Get location data first as it's required for other calls
-    location = get_location()
-
-    # Prepare concurrent execution of weather and sun time fetching
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = {
-            "weather": executor.submit(get_weather_forecast, location["latitude"], location["longitude"]),
-            "sun_times": executor.submit(get_sunrise_sunset, location["latitude"], location["longitude"]),
-            "places": executor.submit(get_interesting_places, location["latitude"], location["longitude"]),
-        }
-
-        # Wait for all futures to complete
-        results = {}
-        for name, future in futures.items():
-            try:
-                result = future.result()
-                if result is None:
-                    raise RuntimeError(f"Failed to fetch {name} data")
-                results[name] = result
-            except Exception as e:
-                logger.error(f"Error fetching {name}: {str(e)}")
-                raise RuntimeError(f"Failed to fetch {name} data: {str(e)}") from e
-
-    # Limit places and fetch photos concurrently
-    places = results["places"][:max_places]
-    photos_by_place = {}
-
-    with ThreadPoolExecutor(max_workers=len(places)) as executor:
-        photo_futures = {
-            place["name"]: executor.submit(
-                search_flickr_photos,
-                place["name"],
-                place["latitude"],
-                place["longitude"],
-                photo_radius_km,
-            )
-            for place in places
-        }
-
-        # Collect photo results
-        for place_name, future in photo_futures.items():
-            try:
-                photos = future.result()
-                if photos:  # Only add if photos were found
-                    photos_by_place[place_name] = photos
-            except Exception as e:
-                logger.warning(f"Failed to fetch photos for {place_name}: {str(e)}")
-                continue
+    with span("combiner.get_combined_data", max_places=max_places, photo_radius_km=photo_radius_km):
+        # Get location data first as it's required for other calls
+        with span("combiner.location"):
+            location = get_location(latitude=latitude, longitude=longitude, place_name=place_name)
+
+        # Prepare concurrent execution of weather and sun time fetching
+        with span("combiner.conditions"), ThreadPoolExecutor(max_workers=3) as executor:
+            futures = {
+                "weather": submit_traced(
+                    executor,
+                    "tool.get_weather_forecast",
+                    get_weather_forecast,
+                    location["latitude"],
+                    location["longitude"],
+                ),
+                "sun_times": submit_traced(
+                    executor, "tool.get_sunrise_sunset", get_sunrise_sunset, location["latitude"], location["longitude"]
+                ),
+                "places": submit_traced(
+                    executor,
+                    "tool.get_interesting_places",
+                    get_interesting_places,
+                    location["latitude"],
+                    location["longitude"],
+                ),
+            }
+
+            # Wait for all futures to complete
+            results = {}
+            for name, future in futures.items():
+                try:
+                    result = future.result()
+                    if result is None:
+                        raise RuntimeError(f"Failed to fetch {name} data")
+                    results[name] = result
+                except Exception as e:
+                    logger.error(f"Error fetching {name}: {str(e)}")
+                    raise RuntimeError(f"Failed to fetch {name} data: {str(e)}") from e
+
+        # Limit places and fetch photos concurrently
+        places = results["places"][:max_places]
+        photos_by_place = {}
+
+        with span("combiner.photos", places=len(places)), ThreadPoolExecutor(max_workers=len(places)) as executor:
+            photo_futures = {
+                place["name"]: submit_traced(
+                    executor,
+                    "tool.search_flickr_photos",
+                    search_flickr_photos,
+                    place["name"],
+                    place["latitude"],
+                    place["longitude"],
+                    photo_radius_km,
+                )
+                for place in places
+            }
+
+            # Collect photo results
+            for place_name, future in photo_futures.items():
+                try:
+                    photos = future.result()
+                    if photos:  # Only add if photos were found
+                        photos_by_place[place_name] = photos
+                except Exception as e:
+                    logger.warning(f"Failed to fetch photos for {place_name}: {str(e)}")
+                    continue
+
+        photos_by_place = deduplicate_photos(photos_by_place)
 
     # Convert SunTimes dataclass to dict if necessary
     sun_times_dict = (
         asdict(results["sun_times"]) if hasattr(results["sun_times"], "__dataclass_fields__") else results["sun_times"]
     )
 
-    return {
+    combined: CombinedData = {
         "location": location,
         "weather": results["weather"],
         "sun_times": sun_times_dict,
         "places": places,
         "photos_by_place": photos_by_place,
     }
+    horizon_light = _horizon_light(location, results["weather"], places) if places and results["weather"] else None
+    if horizon_light:
+        combined["horizon_light"] = horizon_light
+    if places and results["weather"]:
+        itinerary = _plan_itinerary(location, results["weather"], places, photos_by_place, horizon_light or {})
+        if itinerary is not None:
+            combined["itinerary"] = itinerary
+    if archive_enabled():
+        seasonal = _archive_conditions(location, results["weather"], sun_times_dict)
+        if seasonal is not None:
+            combined["seasonal_conditions"] = seasonal
+    return combined
+
+
+def _archive_conditions(
+    location: LocationInfo, weather: List[DailyWeather], sun_times: SunTimes
+) -> Optional[SeasonalConditions]:
+    """Record this run's conditions and return the location's seasonal statistics; failures only log"""
+    with span("combiner.archive"):
+        try:
+            archive = get_archive()
+            archive.record_weather(location["latitude"], location["longitude"], weather)
+            archive.record_sun_times(location["latitude"], location["longitude"], sun_times)
+            return archive.seasonal_conditions(location["latitude"], location["longitude"], location["timezone"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to archive conditions: {str(e)}")
+            return None
+
+
+def _plan_itinerary(
+    location: LocationInfo,
+    weather: List[DailyWeather],
+    places: List[Place],
+    photos_by_place: dict[str, List[PhotoUrl]],
+    horizon_light: Dict[str, HorizonLight],
+) -> Optional[DayPlan]:
+    """Plan the first forecast day; failures only log, since the rest of the data is still useful"""
+    sun_by_place = {
+        name: (light["sunrise"], light["sunset"]) if light["lit"] else None for name, light in horizon_light.items()
+    }
+    with span("combiner.itinerary", places=len(places)):
+        try:
+            return plan_day(location, weather, places, photos_by_place, sun_by_place=sun_by_place)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to plan itinerary: {str(e)}")
+            return None
+
+
+def _horizon_light(
+    location: LocationInfo, weather: List[DailyWeather], places: List[Place]
+) -> Optional[Dict[str, HorizonLight]]:
+    """Terrain-corrected light for the first forecast day, when elevation tiles cover the location"""
+    with span("combiner.horizon", places=len(places)):
+        try:
+            dem = get_dem()
+            if not dem.covers(location["latitude"], location["longitude"]):
+                return None
+            sunrise = datetime.fromisoformat(weather[0]["sunrise_time"].replace("Z", "+00:00"))
+            # Sunrise in local solar time always falls on the local date
+            day = (sunrise + timedelta(minutes=4 * location["longitude"])).date()
+            return place_light(places, day, dem=dem)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Failed to compute horizon light: {str(e)}")
+            return None
@@ -0,0 +1,292 @@
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, NotRequired, Optional, Tuple, TypedDict
+
+from loguru import logger
+
+from shutterscout_ai.tools.combined import codec
+from shutterscout_ai.tools.combined.combiner import CombinedData, get_combined_data
+from shutterscout_ai.utils.cache import TTLCache
+from shutterscout_ai.utils.instrumentation import (
+    PREFETCH_BUDGET_REMAINING,
+    PREFETCH_REFRESHES_TOTAL,
+    increment,
+    observe,
+    span,
+)
+
+# Requests within about a kilometre share cached data
+PRECISION_DEGREES = 0.01
+# How long fetched combined data is served; forecasts are refreshed by the providers about hourly
+DEFAULT_TTL_SECONDS = 1800.0
+# Hot entries are refreshed once they are this close to expiring
+REFRESH_AHEAD_SECONDS = 300.0
+# Request counts halve every hour, so a location stays hot while it keeps being asked for
+HALF_LIFE_SECONDS = 3600.0
+# Decayed request count from which a location is kept warm
+HOT_THRESHOLD = 2.0
+# Locations whose count decayed below this are no longer tracked
+FORGOTTEN_SCORE = 0.01
+# Saved locations are refreshed this long before sunrise, so the data is fresh for the morning shoot
+SUNRISE_LEAD_SECONDS = 5400.0
+# Provider calls the prefetcher may spend per budget window, including those made for cache misses
+DEFAULT_BUDGET_CALLS = 500
+BUDGET_WINDOW_SECONDS = 3600.0
+BUDGET_BUCKETS = (0, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+LocationKey = Tuple[int, int]
+
+
+class SavedLocation(TypedDict):
+    latitude: float
+    longitude: float
+    place_name: NotRequired[str]
+
+
+def location_key(latitude: float, longitude: float) -> LocationKey:
+    """Grid cell a coordinate is cached under"""
+    return round(latitude / PRECISION_DEGREES), round(longitude / PRECISION_DEGREES)
+
+
+def estimate_calls(combined: CombinedData) -> int:
+    """Provider calls it took to build combined data: weather, sun times, places and one photo search per place"""
+    return 3 + len(combined["places"])
+
+
+def _epoch(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+
+class RequestTracker:
+    """Exponentially decayed request count per location"""
+
+    def __init__(self, half_life: float = HALF_LIFE_SECONDS) -> None:
+        self.half_life = half_life
+        self._counts: Dict[LocationKey, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, key: LocationKey, now: float) -> float:
+        count, last = self._counts.get(key, (0.0, now))
+        return count * 0.5 ** ((now - last) / self.half_life)
+
+    def record(self, key: LocationKey, now: float) -> float:
+        with self._lock:
+            count = self._decayed(key, now) + 1.0
+            self._counts[key] = (count, now)
+            return count
+
+    def score(self, key: LocationKey, now: float) -> float:
+        with self._lock:
+            return self._decayed(key, now)
+
+    def hottest(self, now: float, threshold: float) -> List[Tuple[LocationKey, float]]:
+        """Locations at or above threshold, most requested first; forgotten ones are dropped"""
+        with self._lock:
+            scores = {key: self._decayed(key, now) for key in self._counts}
+            for key, score in list(scores.items()):
+                if score < FORGOTTEN_SCORE:
+                    del self._counts[key], scores[key]
+        return sorted(((key, score) for key, score in scores.items() if score >= threshold), key=lambda x: -x[1])
+
+
+class QuotaBudget:
+    """Provider calls allowed within a sliding time window"""
+
+    def __init__(self, limit: int = DEFAULT_BUDGET_CALLS, window: float = BUDGET_WINDOW_SECONDS) -> None:
+        self.limit = limit
+        self.window = window
+        self._spent: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def remaining(self, now: float) -> int:
+        with self._lock:
+            while self._spent and self._spent[0][0] <= now - self.window:
+                self._spent.popleft()
+            return self.limit - sum(calls for _, calls in self._spent)
+
+    def spend(self, calls: int, now: float) -> None:
+        with self._lock:
+            self._spent.append((now, calls))
+
+
+class Prefetcher:
+    """
+    Serves combined data from a cache and keeps it warm in the background: locations that are requested
+    often are refreshed shortly before their entry expires, and saved locations are refreshed once ahead
+    of each sunrise. Background refreshes stop for the budget window once the provider call budget,
+    which also pays for cache misses, is used up, so user requests always get the quota first.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., CombinedData] = get_combined_data,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        budget: Optional[QuotaBudget] = None,
+        refresh_ahead: float = REFRESH_AHEAD_SECONDS,
+        hot_threshold: float = HOT_THRESHOLD,
+        sunrise_lead: float = SUNRISE_LEAD_SECONDS,
+        saved: Tuple[SavedLocation, ...] = (),
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.fetch = fetch
+        self.budget = budget or QuotaBudget()
+        self.refresh_ahead = refresh_ahead
+        self.hot_threshold = hot_threshold
+        self.sunrise_lead = sunrise_lead
+        self.clock = clock
+        self.tracker = RequestTracker()
+        # Entries are stored encoded, so callers can never change what the next caller gets
+        self.cache: TTLCache[bytes] = TTLCache("combined", ttl=ttl, maxsize=4096, clock=clock)
+        self._locations: Dict[LocationKey, SavedLocation] = {}
+        self._saved: Dict[LocationKey, SavedLocation] = {}
+        self._sunrises: Dict[LocationKey, List[float]] = {}
+        self._fetched: Dict[LocationKey, float] = {}
+        self._costs: Dict[LocationKey, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        for location in saved:
+            self.save(location)
+
+    def save(self, location: SavedLocation) -> None:
+        """Keep a location warm for its sunrises whether or not it is requested"""
+        key = location_key(location["latitude"], location["longitude"])
+        with self._lock:
+            self._saved[key] = location
+            self._locations.setdefault(key, location)
+
+    def get(self, latitude: float, longitude: float, place_name: str = "") -> CombinedData:
+        """
+        Combined data for a location, from the cache when it is warm.
+
+        Raises:
+            RuntimeError: If the data is not cached and cannot be fetched
+            ValueError: If the fetched data is invalid
+        """
+        key = location_key(latitude, longitude)
+        now = self.clock()
+        self.tracker.record(key, now)
+        with self._lock:
+            self._locations[key] = {"latitude": latitude, "longitude": longitude, "place_name": place_name}
+        cached = self.cache.get(key)
+        if cached is not None:
+            return codec.decode(cached)
+        return self._refresh(key, "miss")
+
+    def _refresh(self, key: LocationKey, reason: str) -> CombinedData:
+        with self._lock:
+            location = self._locations[key]
+        with span("prefetch.refresh", reason=reason):
+            try:
+                combined = self.fetch(
+                    latitude=location["latitude"],
+                    longitude=location["longitude"],
+                    place_name=location.get("place_name", ""),
+                )
+            except Exception:
+                increment(PREFETCH_REFRESHES_TOTAL, reason=reason, outcome="error")
+                # A failed attempt still spent quota; assume it cost as much as the last successful one
+                self.budget.spend(self._costs.get(key, 3), self.clock())
+                raise
+        now = self.clock()
+        calls = estimate_calls(combined)
+        self.budget.spend(calls, now)
+        sunrises = sorted(_epoch(day["sunrise_time"]) for day in combined["weather"])
+        ttl = self.cache.ttl
+        with self._lock:
+            self._costs[key] = calls
+            self._sunrises[key] = sunrises
+            self._fetched[key] = now
+            saved = key in self._saved
+        sunrise = next((sunrise for sunrise in sunrises if sunrise > now), None)
+        if saved and sunrise is not None and sunrise - now <= self.sunrise_lead:
+            # Fetched for the morning shoot: keep it through sunrise rather than only for the usual ttl
+            ttl = max(ttl, sunrise - now + self.cache.ttl)
+        self.cache.set(key, codec.encode(combined), ttl=ttl)
+        increment(PREFETCH_REFRESHES_TOTAL, reason=reason, outcome="ok")
+        return combined
+
+    def due(self) -> List[Tuple[LocationKey, str]]:
+        """Locations to refresh now and why, most urgent first: saved locations nearing sunrise, then hot ones"""
+        now = self.clock()
+        with self._lock:
+            upcoming = {
+                key: next((sunrise for sunrise in self._sunrises.get(key, []) if sunrise > now), None)
+                for key in self._saved
+            }
+            fetched = dict(self._fetched)
+        due: List[Tuple[LocationKey, str]] = []
+        for key, sunrise in sorted(upcoming.items(), key=lambda item: item[1] or 0.0):
+            expires = self.cache.expires_at(key)
+            if sunrise is None:
+                # Never fetched, or the forecast ran out: fetch to learn the next sunrises
+                if expires is None:
+                    due.append((key, "saved"))
+            elif sunrise - now <= self.sunrise_lead and fetched.get(key, 0.0) < sunrise - self.sunrise_lead:
+                # Once per sunrise: data fetched since the lead began is what the shoot will use
+                due.append((key, "sunrise"))
+        queued = {key for key, _ in due}
+        for key, _ in self.tracker.hottest(now, self.hot_threshold):
+            expires = self.cache.expires_at(key)
+            if key not in queued and (expires is None or expires - now <= self.refresh_ahead):
+                due.append((key, "hot"))
+        return due
+
+    def run_once(self) -> int:
+        """Refresh what is due while the budget allows; returns the number of locations refreshed"""
+        refreshed = 0
+        for key, reason in self.due():
+            remaining = self.budget.remaining(self.clock())
+            observe(PREFETCH_BUDGET_REMAINING, remaining, BUDGET_BUCKETS)
+            if remaining < self._costs.get(key, 3):
+                increment(PREFETCH_REFRESHES_TOTAL, reason=reason, outcome="over_budget")
+                logger.info(f"Prefetch budget of {self.budget.limit} calls used up, postponing refreshes")
+                break
+            try:
+                self._refresh(key, reason)
+                refreshed += 1
+            except Exception as e:
+                logger.warning(f"Failed to prefetch combined data for {key}: {str(e)}")
+        return refreshed
+
+    def start(self, interval: float = 30.0) -> None:
+        """Refresh in a background thread every interval seconds until stop is called"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                self.run_once()
+
+        self._thread = threading.Thread(target=loop, name="shutterscout-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_prefetcher: Optional[Prefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> Prefetcher:
+    """
+    Shared prefetcher, with SHUTTERSCOUT_COMBINED_TTL seconds of caching and a budget of
+    SHUTTERSCOUT_PREFETCH_BUDGET provider calls per hour
+    """
+    global _prefetcher
+    ttl = float(os.getenv("SHUTTERSCOUT_COMBINED_TTL", str(DEFAULT_TTL_SECONDS)))
+    limit = int(os.getenv("SHUTTERSCOUT_PREFETCH_BUDGET", str(DEFAULT_BUDGET_CALLS)))
+    with _prefetcher_lock:
+        if _prefetcher is None or _prefetcher.cache.ttl != ttl or _prefetcher.budget.limit != limit:
+            if _prefetcher is not None:
+                _prefetcher.stop()
+            _prefetcher = Prefetcher(ttl=ttl, budget=QuotaBudget(limit))
+        return _prefetcher
@@ -0,0 +1,422 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+import unicodedata
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from shutterscout_ai.config.paths import cache_dir
+from shutterscout_ai.tools.location.info import LocationInfo
+
+BUNDLED_GAZETTEER = os.path.join(os.path.dirname(__file__), "data", "cities.tsv")
+
+# Country names for the bundled gazetteer; other codes are reported as-is
+COUNTRY_NAMES = {
+    "AE": "United Arab Emirates",
+    "AR": "Argentina",
+    "AT": "Austria",
+    "AU": "Australia",
+    "BE": "Belgium",
+    "BR": "Brazil",
+    "CA": "Canada",
+    "CH": "Switzerland",
+    "CL": "Chile",
+    "CN": "China",
+    "CU": "Cuba",
+    "CZ": "Czechia",
+    "DE": "Germany",
+    "DK": "Denmark",
+    "EG": "Egypt",
+    "ES": "Spain",
+    "FI": "Finland",
+    "FR": "France",
+    "GB": "United Kingdom",
+    "GR": "Greece",
+    "HK": "Hong Kong",
+    "HU": "Hungary",
+    "IE": "Ireland",
+    "IN": "India",
+    "IS": "Iceland",
+    "IT": "Italy",
+    "JP": "Japan",
+    "KE": "Kenya",
+    "KR": "South Korea",
+    "MA": "Morocco",
+    "MX": "Mexico",
+    "NL": "Netherlands",
+    "NO": "Norway",
+    "NZ": "New Zealand",
+    "PE": "Peru",
+    "PL": "Poland",
+    "PT": "Portugal",
+    "RU": "Russia",
+    "SE": "Sweden",
+    "SG": "Singapore",
+    "TH": "Thailand",
+    "TR": "Turkey",
+    "US": "United States",
+    "ZA": "South Africa",
+}
+
+INDEX_MAGIC = b"SSGEO001"
+# count, records offset, name entries, names offset, cell entries, cells offset, strings offset
+HEADER = struct.Struct("<8sIIIIIII")
+# latitude, longitude, population, then string refs for name, region, country and timezone
+RECORD = struct.Struct("<ddIIIII")
+STRING_LENGTH = struct.Struct("<H")
+MAX_NAME_LENGTH = 64
+EARTH_RADIUS_KM = 6371.0088
+# Reverse geocoding searches a circle this wide first and doubles it until it holds a city
+REVERSE_START_KM = 50.0
+
+
+def normalize(name: str) -> str:
+    """Case-, accent- and punctuation-insensitive lookup key"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in stripped.casefold())
+    return " ".join(cleaned.split())
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _cell(latitude: float, longitude: float) -> Tuple[int, int]:
+    return min(179, int(math.floor(latitude + 90.0))), int(math.floor(longitude + 180.0)) % 360
+
+
+def _cell_key(lat_cell: int, lon_cell: int) -> int:
+    return lat_cell * 360 + lon_cell
+
+
+def _parse_gazetteer(path: str) -> Iterator[Tuple[List[str], float, float, int, str, str, str, str]]:
+    """Yield (names, latitude, longitude, population, display name, region, country code, timezone) per row"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            columns = line.rstrip("\n").split("\t")
+            if len(columns) < 18:
+                raise ValueError(f"{path}:{line_number}: expected GeoNames columns, got {len(columns)}")
+            names = [columns[1], columns[2]] + [alt for alt in columns[3].split(",") if alt]
+            population = int(columns[14]) if columns[14].isdigit() else 0
+            yield (
+                names,
+                float(columns[4]),
+                float(columns[5]),
+                population,
+                columns[1],
+                columns[10],
+                columns[8],
+                columns[17],
+            )
+
+
+def build_index(gazetteer_path: str, index_path: str) -> int:
+    """
+    Compile a GeoNames-format gazetteer into the binary index used by OfflineGeocoder.
+
+    Layout: header, fixed-size city records, (key, record) name entries sorted by key bytes,
+    (cell, record) entries sorted by 1-degree grid cell, and a length-prefixed UTF-8 string table.
+
+    Returns:
+        Number of cities indexed
+    """
+    strings = bytearray()
+    string_refs: Dict[str, int] = {}
+
+    def ref(value: str) -> int:
+        existing = string_refs.get(value)
+        if existing is not None:
+            return existing
+        encoded = value.encode("utf-8")[:65535]
+        offset = len(strings)
+        strings.extend(STRING_LENGTH.pack(len(encoded)))
+        strings.extend(encoded)
+        string_refs[value] = offset
+        return offset
+
+    records = bytearray()
+    names: List[Tuple[bytes, int, int]] = []
+    cells: List[Tuple[int, int]] = []
+    count = 0
+    for aliases, latitude, longitude, population, name, region, country, timezone in _parse_gazetteer(gazetteer_path):
+        records.extend(
+            RECORD.pack(latitude, longitude, population, ref(name), ref(region), ref(country), ref(timezone))
+        )
+        for key in {normalize(alias) for alias in aliases if len(alias) <= MAX_NAME_LENGTH}:
+            if key:
+                names.append((key.encode("utf-8"), ref(key), count))
+        cells.append((_cell_key(*_cell(latitude, longitude)), count))
+        count += 1
+
+    names.sort()
+    cells.sort()
+    name_table = struct.pack(
+        f"<{2 * len(names)}I", *[value for _, key_ref, record in names for value in (key_ref, record)]
+    )
+    cell_table = struct.pack(f"<{2 * len(cells)}I", *[value for pair in cells for value in pair])
+
+    records_offset = HEADER.size
+    names_offset = records_offset + len(records)
+    cells_offset = names_offset + len(name_table)
+    strings_offset = cells_offset + len(cell_table)
+    header = HEADER.pack(
+        INDEX_MAGIC, count, records_offset, len(names), names_offset, len(cells), cells_offset, strings_offset
+    )
+
+    temporary = f"{index_path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(header)
+        f.write(records)
+        f.write(name_table)
+        f.write(cell_table)
+        f.write(strings)
+    os.replace(temporary, index_path)
+    logger.info(f"Built geocoder index for {count} places at {index_path}")
+    return count
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up with limit + 1 as soon as it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, start=1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class OfflineGeocoder:
+    """
+    Name and reverse geocoding against a memory-mapped gazetteer index, without network I/O.
+    Lookups binary-search the mapped name and grid tables directly, so opening an index is
+    constant time and memory use stays flat regardless of gazetteer size.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        with open(index_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            self.count,
+            self._records_offset,
+            self._name_count,
+            names_offset,
+            self._cell_count,
+            cells_offset,
+            self._strings_offset,
+        ) = HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"Not a geocoder index: {index_path}")
+        view = memoryview(self._map)
+        self._names = view[names_offset : names_offset + 8 * self._name_count].cast("I")
+        self._cells = view[cells_offset : cells_offset + 8 * self._cell_count].cast("I")
+
+    def close(self) -> None:
+        self._names.release()
+        self._cells.release()
+        self._map.close()
+
+    def _string_bytes(self, ref: int) -> bytes:
+        start = self._strings_offset + ref
+        (length,) = STRING_LENGTH.unpack_from(self._map, start)
+        return self._map[start + 2 : start + 2 + length]
+
+    def _string(self, ref: int) -> str:
+        return self._string_bytes(ref).decode("utf-8")
+
+    def _record(self, index: int) -> Tuple[float, float, int, int, int, int, int]:
+        return RECORD.unpack_from(self._map, self._records_offset + index * RECORD.size)
+
+    def location(self, index: int) -> LocationInfo:
+        """The city at a record index as LocationInfo"""
+        latitude, longitude, _, name, region, country, timezone = self._record(index)
+        country_code = self._string(country)
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "city": self._string(name),
+            "region": self._string(region),
+            "country": COUNTRY_NAMES.get(country_code, country_code),
+            "timezone": self._string(timezone),
+        }
+
+    def _population(self, index: int) -> int:
+        return self._record(index)[2]
+
+    def _key(self, position: int) -> bytes:
+        return self._string_bytes(self._names[2 * position])
+
+    def _lower_bound(self, key: bytes) -> int:
+        low, high = 0, self._name_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _prefix_records(self, prefix: bytes, exact: bool) -> Iterator[Tuple[bytes, int]]:
+        position = self._lower_bound(prefix)
+        while position < self._name_count:
+            key = self._key(position)
+            if not key.startswith(prefix) or (exact and key != prefix):
+                break
+            yield key, self._names[2 * position + 1]
+            position += 1
+
+    def _matches_qualifier(self, index: int, qualifier: str) -> bool:
+        location = self.location(index)
+        _, _, _, _, _, country_ref, _ = self._record(index)
+        candidates = (location["country"], location["region"], self._string(country_ref))
+        return any(normalize(candidate) == qualifier for candidate in candidates)
+
+    def _ranked(self, records: List[int], qualifier: str, limit: int) -> List[LocationInfo]:
+        unique = list(dict.fromkeys(records))
+        if qualifier:
+            unique = [index for index in unique if self._matches_qualifier(index, qualifier)]
+        unique.sort(key=self._population, reverse=True)
+        return [self.location(index) for index in unique[:limit]]
+
+    @staticmethod
+    def _split_query(query: str) -> Tuple[str, str]:
+        name, _, qualifier = query.partition(",")
+        return normalize(name), normalize(qualifier)
+
+    def lookup(self, query: str, limit: int = 1) -> List[LocationInfo]:
+        """
+        Exact name lookup, most populous first. A ", Country" or ", Region" suffix narrows the results,
+        e.g. "Valencia, Spain".
+        """
+        name, qualifier = self._split_query(query)
+        if not name:
+            return []
+        records = [record for _, record in self._prefix_records(name.encode("utf-8"), exact=True)]
+        return self._ranked(records, qualifier, limit)
+
+    def prefix(self, query: str, limit: int = 10) -> List[LocationInfo]:
+        """Names starting with the query, most populous first; useful for autocompletion"""
+        name, qualifier = self._split_query(query)
+        if not name:
+            return []
+        records = [record for _, record in self._prefix_records(name.encode("utf-8"), exact=False)]
+        return self._ranked(records, qualifier, limit)
+
+    def fuzzy(self, query: str, max_distance: int = 2, limit: int = 5) -> List[LocationInfo]:
+        """
+        Names within max_distance edits of the query, closest then most populous first.
+        Only names sharing the query's first character are compared, which keeps typo lookups cheap.
+        """
+        name, qualifier = self._split_query(query)
+        if not name:
+            return []
+        scored: Dict[int, int] = {}
+        for key, record in self._prefix_records(name[0].encode("utf-8"), exact=False):
+            distance = _edit_distance(name, key.decode("utf-8"), max_distance)
+            if distance <= max_distance and distance < scored.get(record, max_distance + 1):
+                scored[record] = distance
+        ordered = sorted(scored, key=lambda index: (scored[index], -self._population(index)))
+        return self._ranked(ordered, qualifier, limit) if qualifier else [self.location(i) for i in ordered[:limit]]
+
+    def geocode(self, query: str) -> Optional[LocationInfo]:
+        """Best match for a place name: exact lookup first, then a fuzzy match"""
+        matches = self.lookup(query) or self.fuzzy(query, limit=1)
+        return matches[0] if matches else None
+
+    def _cell_records(self, first_key: int, last_key: int) -> Iterator[int]:
+        """Records in the cells from first_key to last_key; cells are sorted, so this is one contiguous run"""
+        low, high = 0, self._cell_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._cells[2 * middle] < first_key:
+                low = middle + 1
+            else:
+                high = middle
+        while low < self._cell_count and self._cells[2 * low] <= last_key:
+            yield self._cells[2 * low + 1]
+            low += 1
+
+    def _nearest_within(self, latitude: float, longitude: float, radius_km: float) -> Tuple[int, float]:
+        """Nearest record in the cells overlapping the bounding box of a circle around the coordinate"""
+        angle = math.degrees(radius_km / EARTH_RADIUS_KM)
+        first_row = _cell(max(-90.0, latitude - angle), longitude)[0]
+        last_row = _cell(min(90.0, latitude + angle), longitude)[0]
+        columns = [(0, 359)]
+        if abs(latitude) + angle < 90.0:
+            # Widest longitude span of a circle that does not reach a pole
+            half = math.degrees(math.asin(min(1.0, math.sin(math.radians(angle)) / math.cos(math.radians(latitude)))))
+            first = math.floor(longitude - half + 180.0)
+            last = math.floor(longitude + half + 180.0)
+            if last - first < 359:
+                first, last = first % 360, last % 360
+                columns = [(first, last)] if first <= last else [(first, 359), (0, last)]
+        best_index, best_distance = -1, math.inf
+        for row in range(first_row, last_row + 1):
+            for first, last in columns:
+                for index in self._cell_records(_cell_key(row, first), _cell_key(row, last)):
+                    record_lat, record_lon = self._record(index)[:2]
+                    distance = haversine_km(latitude, longitude, record_lat, record_lon)
+                    if distance < best_distance:
+                        best_index, best_distance = index, distance
+        return best_index, best_distance
+
+    def reverse(
+        self, latitude: float, longitude: float, max_distance_km: Optional[float] = None
+    ) -> Optional[LocationInfo]:
+        """Nearest city to a coordinate, or None when nothing lies within max_distance_km"""
+        if self.count == 0:
+            return None
+        limit = math.pi * EARTH_RADIUS_KM if max_distance_km is None else max_distance_km
+        radius = min(REVERSE_START_KM, limit)
+        while True:
+            # Every record within the radius was searched, so a match inside it is the nearest one
+            best_index, best_distance = self._nearest_within(latitude, longitude, radius)
+            if best_distance <= radius:
+                return self.location(best_index)
+            if radius >= limit:
+                return None
+            radius = min(radius * 2, limit)
+
+
+def _index_path_for(gazetteer_path: str) -> str:
+    stat = os.stat(gazetteer_path)
+    fingerprint = f"{os.path.abspath(gazetteer_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir("geocoder"), f"gazetteer-{digest}.idx")
+
+
+_geocoder: Optional[OfflineGeocoder] = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder(gazetteer_path: Optional[str] = None) -> OfflineGeocoder:
+    """
+    Shared geocoder for the configured gazetteer: the given path, SHUTTERSCOUT_GAZETTEER, or the bundled file.
+    The index is built once per gazetteer version and reused from the cache directory afterwards.
+    """
+    global _geocoder
+    path = gazetteer_path or os.getenv("SHUTTERSCOUT_GAZETTEER") or BUNDLED_GAZETTEER
+    index_path = _index_path_for(path)
+    with _geocoder_lock:
+        if _geocoder is None or _geocoder.index_path != index_path:
+            if not os.path.exists(index_path):
+                build_index(path, index_path)
+            _geocoder = OfflineGeocoder(index_path)
+        return _geocoder
@@ -0,0 +1,488 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple, TypedDict
+
+from loguru import logger
+
+from shutterscout_ai.config.paths import cache_dir, data_dir
+from shutterscout_ai.tools.geocoder.geocoder import EARTH_RADIUS_KM
+from shutterscout_ai.tools.places.places import Place
+
+# SRTM tiles hold big-endian 16-bit heights in metres on a square grid; voids are marked with this value
+VOID = -32768
+TILE_SIZES = (1201, 3601)
+# Light bends over the curved earth by roughly this fraction of the curvature drop
+REFRACTION_COEFFICIENT = 0.13
+# Apparent radius of the sun in degrees; first light is the upper limb clearing the horizon
+SUN_RADIUS_DEGREES = 0.2666
+GOLDEN_HOUR_ELEVATION = 6.0
+
+DEFAULT_AZIMUTH_STEP = 2.0
+DEFAULT_MAX_DISTANCE_KM = 20.0
+DEFAULT_OBSERVER_HEIGHT_M = 1.7
+# Rays are sampled from the first DEM cell out, each step this much longer than the one before
+RAY_GROWTH = 1.04
+MAX_CACHED_PROFILES = 4096
+# Sun positions are sampled this many minutes apart before crossings are refined
+SAMPLE_MINUTES = 2
+
+
+class HorizonLight(TypedDict):
+    """
+    Direct sunlight at a place on one day, with the terrain taken into account. Times are UTC ISO 8601;
+    empty when the sun does not cross the horizon that day, either because it stays up or because it never
+    rises, which lit tells apart.
+    """
+
+    lit: bool
+    flat_sunrise: str
+    flat_sunset: str
+    sunrise: str
+    sunset: str
+    sunrise_delay_minutes: float
+    sunset_advance_minutes: float
+    golden_morning_minutes: float
+    golden_evening_minutes: float
+    max_horizon_degrees: float
+
+
+def tile_name(latitude: int, longitude: int) -> str:
+    """SRTM file name of the tile whose south-west corner is at the given whole degrees, e.g. N51E004.hgt"""
+    return f"{'N' if latitude >= 0 else 'S'}{abs(latitude):02d}{'E' if longitude >= 0 else 'W'}{abs(longitude):03d}.hgt"
+
+
+class DemTile:
+    """One SRTM .hgt tile, memory-mapped so only the pages a horizon ray crosses are read"""
+
+    def __init__(self, path: str, latitude: int, longitude: int):
+        size = os.path.getsize(path)
+        self.samples = math.isqrt(size // 2)
+        if self.samples not in TILE_SIZES or self.samples * self.samples * 2 != size:
+            raise ValueError(f"{path} is not an SRTM tile ({size} bytes)")
+        self.path = path
+        self.latitude = latitude
+        self.longitude = longitude
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._unpack = struct.Struct(">h").unpack_from
+
+    def close(self) -> None:
+        self._map.close()
+
+    def _height(self, row: int, column: int) -> int:
+        return self._unpack(self._map, (row * self.samples + column) * 2)[0]
+
+    def elevation(self, latitude: float, longitude: float) -> Optional[float]:
+        """Bilinearly interpolated height in metres, or None over a void"""
+        last = self.samples - 1
+        # Row 0 is the northern edge of the tile
+        y = min(max((self.latitude + 1 - latitude) * last, 0.0), float(last))
+        x = min(max((longitude - self.longitude) * last, 0.0), float(last))
+        row, column = min(int(y), last - 1), min(int(x), last - 1)
+        fy, fx = y - row, x - column
+        corners = (
+            self._height(row, column),
+            self._height(row, column + 1),
+            self._height(row + 1, column),
+            self._height(row + 1, column + 1),
+        )
+        if VOID in corners:
+            return None
+        top = corners[0] + (corners[1] - corners[0]) * fx
+        bottom = corners[2] + (corners[3] - corners[2]) * fx
+        return top + (bottom - top) * fy
+
+
+class DemTiles:
+    """The SRTM tiles in a directory, opened on first use"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._tiles: Dict[Tuple[int, int], Optional[DemTile]] = {}
+        self._lock = threading.Lock()
+
+    def tile(self, latitude: int, longitude: int) -> Optional[DemTile]:
+        """The tile with its south-west corner at these whole degrees, or None when it is missing or unreadable"""
+        key = (latitude, longitude)
+        with self._lock:
+            if key not in self._tiles:
+                self._tiles[key] = None
+                name = tile_name(latitude, longitude)
+                for candidate in (name, name.lower()):
+                    path = os.path.join(self.directory, candidate)
+                    if os.path.exists(path):
+                        try:
+                            self._tiles[key] = DemTile(path, latitude, longitude)
+                        except (OSError, ValueError) as e:
+                            logger.warning(f"Ignoring unreadable elevation tile {path}: {str(e)}")
+                        break
+            return self._tiles[key]
+
+    def covers(self, latitude: float, longitude: float) -> bool:
+        return self.tile(math.floor(latitude), math.floor(longitude)) is not None
+
+    def elevation(self, latitude: float, longitude: float) -> Optional[float]:
+        tile = self.tile(math.floor(latitude), math.floor(longitude))
+        return tile.elevation(latitude, longitude) if tile is not None else None
+
+    def resolution_m(self, latitude: float, longitude: float) -> float:
+        tile = self.tile(math.floor(latitude), math.floor(longitude))
+        samples = tile.samples if tile is not None else TILE_SIZES[0]
+        return 111_320.0 / (samples - 1)
+
+    def signature(self, latitude: float, longitude: float, radius_km: float) -> str:
+        """Identity of the tiles within radius_km, so cached profiles are recomputed when tiles change"""
+        spread_lat = radius_km / 111.32
+        spread_lon = radius_km / max(1.0, 111.32 * math.cos(math.radians(latitude)))
+        parts = []
+        for tile_lat in range(math.floor(latitude - spread_lat), math.floor(latitude + spread_lat) + 1):
+            for tile_lon in range(math.floor(longitude - spread_lon), math.floor(longitude + spread_lon) + 1):
+                tile = self.tile(tile_lat, tile_lon)
+                if tile is not None:
+                    stat = os.stat(tile.path)
+                    parts.append(f"{os.path.basename(tile.path)}:{stat.st_size}:{stat.st_mtime_ns}")
+        return ";".join(parts)
+
+    def close(self) -> None:
+        with self._lock:
+            for tile in self._tiles.values():
+                if tile is not None:
+                    tile.close()
+            self._tiles.clear()
+
+
+def compute_horizon(
+    dem: DemTiles,
+    latitude: float,
+    longitude: float,
+    azimuth_step: float = DEFAULT_AZIMUTH_STEP,
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM,
+    observer_height_m: float = DEFAULT_OBSERVER_HEIGHT_M,
+) -> List[float]:
+    """
+    Elevation angle of the skyline in degrees for each azimuth bin, clockwise from north.
+    Each ray is walked outwards over the DEM, correcting heights for the earth's curvature and refraction.
+
+    Raises:
+        ValueError: If the DEM has no height for the observer's position
+    """
+    ground = dem.elevation(latitude, longitude)
+    if ground is None:
+        raise ValueError(f"No elevation data at {latitude}, {longitude}")
+    eye = ground + observer_height_m
+    radius_m = EARTH_RADIUS_KM * 1000.0
+    max_distance_m = max_distance_km * 1000.0
+    first_step = dem.resolution_m(latitude, longitude)
+
+    distances = []
+    distance, step = first_step, first_step
+    while distance <= max_distance_m:
+        distances.append(distance)
+        step *= RAY_GROWTH
+        distance += step
+    # Curvature drop and angular offsets per sample are the same for every ray
+    drops = [d * d / (2 * radius_m) * (1 - REFRACTION_COEFFICIENT) for d in distances]
+    metres_per_degree_lat = math.pi * radius_m / 180.0
+    metres_per_degree_lon = metres_per_degree_lat * math.cos(math.radians(latitude))
+
+    profile = []
+    bins = int(round(360.0 / azimuth_step))
+    for index in range(bins):
+        azimuth = math.radians(index * azimuth_step)
+        north, east = math.cos(azimuth), math.sin(azimuth)
+        best = -90.0
+        for d, drop in zip(distances, drops):
+            height = dem.elevation(
+                latitude + north * d / metres_per_degree_lat, longitude + east * d / metres_per_degree_lon
+            )
+            if height is None:
+                continue
+            angle = math.degrees(math.atan2(height - drop - eye, d))
+            if angle > best:
+                best = angle
+        profile.append(best if best > -90.0 else 0.0)
+    return profile
+
+
+class HorizonCache:
+    """
+    Horizon profiles on disk, one small float32 file per place and set of parameters, plus an in-memory copy.
+    Profiles only change when the terrain data does, so repeat runs never walk the DEM again.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or cache_dir("horizons")
+        self._memory: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: str, compute: Callable[[], List[float]]) -> List[float]:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        with self._lock:
+            cached = self._memory.get(digest)
+        if cached is not None:
+            return cached
+
+        path = os.path.join(self.directory, f"{digest}.f32")
+        profile: Optional[List[float]] = None
+        try:
+            with open(path, "rb") as f:
+                values = array("f")
+                values.frombytes(f.read())
+                profile = values.tolist()
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable horizon profile {path}: {str(e)}")
+
+        if profile is None:
+            profile = compute()
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as f:
+                array("f", profile).tofile(f)
+            os.replace(temporary, path)
+
+        with self._lock:
+            if len(self._memory) >= MAX_CACHED_PROFILES:
+                self._memory.pop(next(iter(self._memory)))
+            self._memory[digest] = profile
+        return profile
+
+
+def horizon_profile(
+    dem: DemTiles,
+    latitude: float,
+    longitude: float,
+    cache: Optional[HorizonCache] = None,
+    azimuth_step: float = DEFAULT_AZIMUTH_STEP,
+    max_distance_km: float = DEFAULT_MAX_DISTANCE_KM,
+    observer_height_m: float = DEFAULT_OBSERVER_HEIGHT_M,
+) -> List[float]:
+    """compute_horizon through the cache; places are keyed to about 10 m"""
+    cache = cache or get_horizon_cache()
+    key = (
+        f"{latitude:.4f},{longitude:.4f}|{azimuth_step}|{max_distance_km}|{observer_height_m}|"
+        f"{dem.signature(latitude, longitude, max_distance_km)}"
+    )
+    return cache.get_or_compute(
+        key,
+        lambda: compute_horizon(dem, latitude, longitude, azimuth_step, max_distance_km, observer_height_m),
+    )
+
+
+def horizon_angle(profile: List[float], azimuth: float) -> float:
+    """Skyline elevation at an azimuth, interpolated between profile bins"""
+    position = (azimuth % 360.0) / 360.0 * len(profile)
+    index = int(position) % len(profile)
+    fraction = position - int(position)
+    return profile[index] + (profile[(index + 1) % len(profile)] - profile[index]) * fraction
+
+
+def _julian_day(moment: datetime) -> float:
+    return moment.timestamp() / 86400.0 + 2440587.5
+
+
+def solar_position(moment: datetime, latitude: float, longitude: float) -> Tuple[float, float]:
+    """
+    Apparent elevation and azimuth of the sun's centre in degrees, after the NOAA solar calculator.
+    Elevation includes atmospheric refraction; azimuth is clockwise from north.
+    """
+    jc = (_julian_day(moment) - 2451545.0) / 36525.0
+    mean_longitude = (280.46646 + jc * (36000.76983 + jc * 0.0003032)) % 360.0
+    mean_anomaly = math.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))
+    eccentricity = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+    centre = (
+        math.sin(mean_anomaly) * (1.914602 - jc * (0.004817 + 0.000014 * jc))
+        + math.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * jc)
+        + math.sin(3 * mean_anomaly) * 0.000289
+    )
+    omega = math.radians(125.04 - 1934.136 * jc)
+    apparent_longitude = math.radians(mean_longitude + centre - 0.00569 - 0.00478 * math.sin(omega))
+    mean_obliquity = 23.0 + (26.0 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60.0) / 60.0
+    obliquity = math.radians(mean_obliquity + 0.00256 * math.cos(omega))
+    declination = math.asin(math.sin(obliquity) * math.sin(apparent_longitude))
+
+    y = math.tan(obliquity / 2) ** 2
+    l0 = math.radians(mean_longitude)
+    equation_of_time = 4 * math.degrees(
+        y * math.sin(2 * l0)
+        - 2 * eccentricity * math.sin(mean_anomaly)
+        + 4 * eccentricity * y * math.sin(mean_anomaly) * math.cos(2 * l0)
+        - 0.5 * y * y * math.sin(4 * l0)
+        - 1.25 * eccentricity * eccentricity * math.sin(2 * mean_anomaly)
+    )
+    utc = moment.astimezone(timezone.utc)
+    minutes = utc.hour * 60 + utc.minute + utc.second / 60 + utc.microsecond / 6e7
+    true_solar_time = (minutes + equation_of_time + 4 * longitude) % 1440.0
+    hour_angle = math.radians(true_solar_time / 4 - 180.0)
+
+    phi = math.radians(latitude)
+    cos_zenith = math.sin(phi) * math.sin(declination) + math.cos(phi) * math.cos(declination) * math.cos(hour_angle)
+    zenith = math.acos(max(-1.0, min(1.0, cos_zenith)))
+    elevation = 90.0 - math.degrees(zenith)
+
+    denominator = math.cos(phi) * math.sin(zenith)
+    if abs(denominator) < 1e-9:
+        azimuth = 180.0 if latitude > 0 else 0.0
+    else:
+        cos_azimuth = (math.sin(phi) * math.cos(zenith) - math.sin(declination)) / denominator
+        angle = math.degrees(math.acos(max(-1.0, min(1.0, cos_azimuth))))
+        azimuth = (angle + 180.0) % 360.0 if hour_angle > 0 else (540.0 - angle) % 360.0
+
+    return elevation + _refraction(elevation), azimuth
+
+
+def _refraction(elevation: float) -> float:
+    """NOAA's approximation of atmospheric refraction in degrees"""
+    if elevation > 85.0:
+        return 0.0
+    tangent = math.tan(math.radians(elevation))
+    if elevation > 5.0:
+        seconds = 58.1 / tangent - 0.07 / tangent**3 + 0.000086 / tangent**5
+    elif elevation > -0.575:
+        seconds = 1735.0 + elevation * (-518.2 + elevation * (103.4 + elevation * (-12.79 + elevation * 0.711)))
+    else:
+        seconds = -20.772 / tangent
+    return seconds / 3600.0
+
+
+SunTest = Callable[[float, float], bool]
+
+
+def _crossings(
+    samples: List[Tuple[datetime, float, float]], test: SunTest, latitude: float, longitude: float
+) -> List[Tuple[datetime, bool]]:
+    """Times where test(elevation, azimuth) changes over the sampled day, refined to a few seconds"""
+    crossings = []
+    for (low, *before), (high, *after) in zip(samples, samples[1:]):
+        previous, current = test(*before), test(*after)
+        if previous == current:
+            continue
+        while high - low > timedelta(seconds=5):
+            middle = low + (high - low) / 2
+            if test(*solar_position(middle, latitude, longitude)) == previous:
+                low = middle
+            else:
+                high = middle
+        crossings.append((high, current))
+    return crossings
+
+
+def _iso(moment: Optional[datetime]) -> str:
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if moment else ""
+
+
+def _minutes(later: Optional[datetime], earlier: Optional[datetime]) -> float:
+    return round((later - earlier).total_seconds() / 60.0, 1) if later and earlier else 0.0
+
+
+def light_windows(latitude: float, longitude: float, day: date, profile: List[float]) -> HorizonLight:
+    """
+    Sunrise, sunset and direct golden-hour light on a local day, against a flat horizon and against the
+    horizon profile. The sun counts as up once its upper limb clears the skyline.
+
+    Args:
+        latitude: Place latitude
+        longitude: Place longitude
+        day: Local date
+        profile: Horizon profile from horizon_profile
+    """
+    # Local solar noon on that day, give or take the equation of time; sample the 12 hours either side once
+    noon = datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc) - timedelta(minutes=4 * longitude)
+    moments = (noon + timedelta(minutes=offset) for offset in range(-720, 721, SAMPLE_MINUTES))
+    samples = [(moment, *solar_position(moment, latitude, longitude)) for moment in moments]
+
+    def flat(elevation: float, azimuth: float) -> bool:
+        return elevation + SUN_RADIUS_DEGREES > 0.0
+
+    def terrain(elevation: float, azimuth: float) -> bool:
+        return elevation + SUN_RADIUS_DEGREES > horizon_angle(profile, azimuth)
+
+    def low(elevation: float, azimuth: float) -> bool:
+        return elevation < GOLDEN_HOUR_ELEVATION
+
+    def first_rise(crossings: List[Tuple[datetime, bool]]) -> Optional[datetime]:
+        return next((moment for moment, up in crossings if up), None)
+
+    def last_set(crossings: List[Tuple[datetime, bool]]) -> Optional[datetime]:
+        return next((moment for moment, up in reversed(crossings) if not up), None)
+
+    flat_crossings = _crossings(samples, flat, latitude, longitude)
+    terrain_crossings = _crossings(samples, terrain, latitude, longitude)
+    low_crossings = _crossings(samples, low, latitude, longitude)
+    flat_sunrise, flat_sunset = first_rise(flat_crossings), last_set(flat_crossings)
+    sunrise, sunset = first_rise(terrain_crossings), last_set(terrain_crossings)
+    lit = bool(terrain_crossings) or terrain(*samples[0][1:])
+    # The sun climbs above golden-hour elevation in the morning and drops below it in the evening
+    golden_morning_end = next((moment for moment, is_low in low_crossings if not is_low), None)
+    golden_evening_start = next((moment for moment, is_low in reversed(low_crossings) if is_low), None)
+
+    return {
+        "lit": lit,
+        "flat_sunrise": _iso(flat_sunrise),
+        "flat_sunset": _iso(flat_sunset),
+        "sunrise": _iso(sunrise),
+        "sunset": _iso(sunset),
+        "sunrise_delay_minutes": _minutes(sunrise, flat_sunrise),
+        "sunset_advance_minutes": _minutes(flat_sunset, sunset),
+        "golden_morning_minutes": max(0.0, _minutes(golden_morning_end, sunrise)),
+        "golden_evening_minutes": max(0.0, _minutes(sunset, golden_evening_start)),
+        "max_horizon_degrees": round(max(profile), 2),
+    }
+
+
+def place_light(
+    places: List[Place], day: date, dem: Optional[DemTiles] = None, cache: Optional[HorizonCache] = None
+) -> Dict[str, HorizonLight]:
+    """
+    Terrain-corrected light for every place the DEM covers; places outside it are left out.
+
+    Args:
+        places: Places from get_interesting_places
+        day: Local date to compute the light for
+        dem: Terrain tiles (default: the shared tiles in SHUTTERSCOUT_DEM_DIR)
+        cache: Horizon profile cache (default: the shared one)
+    """
+    dem = dem or get_dem()
+    light: Dict[str, HorizonLight] = {}
+    for place in places:
+        if not dem.covers(place["latitude"], place["longitude"]):
+            continue
+        try:
+            profile = horizon_profile(dem, place["latitude"], place["longitude"], cache=cache)
+        except ValueError as e:
+            logger.warning(f"No horizon for {place['name']}: {str(e)}")
+            continue
+        light[place["name"]] = light_windows(place["latitude"], place["longitude"], day, profile)
+    return light
+
+
+_dem: Optional[DemTiles] = None
+_horizon_cache: Optional[HorizonCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_dem() -> DemTiles:
+    """Shared tiles in SHUTTERSCOUT_DEM_DIR, or the dem directory under the data directory"""
+    global _dem
+    # Only the user installs tiles, so a missing directory just means no terrain data
+    directory = os.getenv("SHUTTERSCOUT_DEM_DIR") or data_dir("dem", create=False)
+    with _shared_lock:
+        if _dem is None or _dem.directory != directory:
+            _dem = DemTiles(directory)
+        return _dem
+
+
+def get_horizon_cache() -> HorizonCache:
+    """Shared profile cache in the horizons directory under the cache directory"""
+    global _horizon_cache
+    directory = cache_dir("horizons")
+    with _shared_lock:
+        if _horizon_cache is None or _horizon_cache.directory != directory:
+            _horizon_cache = HorizonCache(directory)
+        return _horizon_cache
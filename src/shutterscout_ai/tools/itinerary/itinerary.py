@@ -0,0 +1,482 @@
+import math
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from loguru import logger
+
+from shutterscout_ai.tools.geocoder.geocoder import EARTH_RADIUS_KM
+from shutterscout_ai.tools.location.location import LocationInfo
+from shutterscout_ai.tools.photos.photos import PhotoUrl
+from shutterscout_ai.tools.places.places import Place
+from shutterscout_ai.tools.weather.weather import DailyWeather
+
+# Straight-line distance times this factor approximates the distance by road
+ROAD_DETOUR_FACTOR = 1.3
+# Average door-to-door speed, mixing city streets and country roads
+DEFAULT_SPEED_KMH = 40.0
+# Time spent shooting at each stop
+DEFAULT_SERVICE_MINUTES = 30.0
+# How long before the first light window the day starts at the location
+DEFAULT_LEAD_MINUTES = 60.0
+# Local search rounds after the greedy construction; each round that improves nothing ends the search
+MAX_SEARCH_ROUNDS = 50
+
+# Light windows relative to sunrise and sunset in minutes, with the quality of their light
+LIGHT_WINDOWS = (
+    ("blue_morning", "sunrise", -30.0, 0.0, 0.8),
+    ("golden_morning", "sunrise", 0.0, 60.0, 1.0),
+    ("golden_evening", "sunset", -60.0, 0.0, 1.0),
+    ("blue_evening", "sunset", 0.0, 30.0, 0.8),
+)
+
+
+class LightWindow(TypedDict):
+    """A period of good light, in the location's local time"""
+
+    name: str
+    start: str
+    end: str
+    quality: float
+
+
+class PlannedVisit(TypedDict):
+    """One stop of a day plan, in the location's local time"""
+
+    place: str
+    latitude: float
+    longitude: float
+    window: str
+    arrival: str
+    start: str
+    end: str
+    travel_minutes: float
+    distance_km: float
+    score: float
+
+
+class DayPlan(TypedDict):
+    """Route through the places that fits every stop into a light window"""
+
+    date: str
+    timezone: str
+    light_factor: float
+    windows: List[LightWindow]
+    visits: List[PlannedVisit]
+    total_score: float
+    total_distance_km: float
+    total_travel_minutes: float
+    unvisited: List[str]
+
+
+class TravelMatrix:
+    """
+    Distances and travel times between all points, the origin first. Built once per plan, so the
+    solver only does lookups. Pass travel_minutes to use times from a routing engine instead of the estimate.
+    """
+
+    def __init__(self, distance_km: List[List[float]], travel_minutes: List[List[float]]):
+        if len(distance_km) != len(travel_minutes):
+            raise ValueError("Distance and travel time matrices must have the same size")
+        self.distance_km = distance_km
+        self.travel_minutes = travel_minutes
+
+    @classmethod
+    def from_points(
+        cls,
+        points: Sequence[Tuple[float, float]],
+        speed_kmh: float = DEFAULT_SPEED_KMH,
+        detour_factor: float = ROAD_DETOUR_FACTOR,
+    ) -> "TravelMatrix":
+        """Estimate road distances and times from great-circle distances"""
+        if speed_kmh <= 0:
+            raise ValueError(f"Speed must be positive, got {speed_kmh}")
+        # Trigonometry per point once, so each of the n² pairs is a few multiplications
+        radians = [(math.radians(lat), math.radians(lon)) for lat, lon in points]
+        cosines = [math.cos(phi) for phi, _ in radians]
+        size = len(points)
+        distance = [[0.0] * size for _ in range(size)]
+        for i in range(size):
+            phi1, lambda1 = radians[i]
+            for j in range(i + 1, size):
+                phi2, lambda2 = radians[j]
+                a = math.sin((phi2 - phi1) / 2) ** 2 + cosines[i] * cosines[j] * math.sin((lambda2 - lambda1) / 2) ** 2
+                km = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a))) * detour_factor
+                distance[i][j] = distance[j][i] = km
+        minutes = [[km / speed_kmh * 60.0 for km in row] for row in distance]
+        return cls(distance, minutes)
+
+    def __len__(self) -> int:
+        return len(self.distance_km)
+
+
+@dataclass(frozen=True)
+class _Window:
+    name: str
+    start: float
+    end: float
+    quality: float
+
+
+@dataclass(frozen=True)
+class _Stop:
+    node: int
+    arrival: float
+    start: float
+    window: int
+
+
+def _parse_utc(timestamp: str) -> datetime:
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def _zone(timezone_name: str) -> tzinfo:
+    if not timezone_name:
+        return timezone.utc
+    try:
+        return ZoneInfo(timezone_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone {timezone_name!r}, planning in UTC")
+        return timezone.utc
+
+
+def light_factor(day: DailyWeather) -> float:
+    """
+    How good the day's light is expected to be, from 0 to 1. Some cloud catches the colour of low sun,
+    an overcast sky or rain flattens it, and haze mutes it.
+    """
+    cloud = day["cloud_cover"]
+    if cloud < 20:
+        cloud_term = 0.85
+    elif cloud <= 60:
+        cloud_term = 1.0
+    else:
+        cloud_term = max(0.3, 1.0 - (cloud - 60) / 40 * 0.7)
+    rain_term = 1.0 - 0.6 * day["precipitation_probability"] / 100.0
+    visibility_term = 0.7 + 0.3 * min(day["visibility"], 20.0) / 20.0
+    return round(cloud_term * rain_term * visibility_term, 3)
+
+
+def place_value(photos: Sequence[PhotoUrl]) -> float:
+    """Photographic interest of a place, growing with the log of its photos' views"""
+    views = sum(photo.get("views", 0) for photo in photos)
+    return 1.0 + math.log10(1 + views + len(photos))
+
+
+class _Timeline:
+    """A feasible route's schedule with running totals, so changes to it can be scored without rescheduling"""
+
+    def __init__(
+        self,
+        route: List[int],
+        stops: List[_Stop],
+        score: List[float],
+        travel: List[float],
+        slack: List[float],
+        latest: List[float],
+    ) -> None:
+        self.route = route
+        self.stops = stops
+        # Totals over the first k stops, and over the legs into them
+        self.score = score
+        self.travel = travel
+        # How far each stop can start later before it or any stop after it has to change window
+        self.slack = slack
+        # Latest arrival at each stop from which it and the stops after it can still make a window
+        self.latest = latest
+
+
+class _Solver:
+    """Orienteering with time windows: collect the most light-weighted value in one feasible route"""
+
+    def __init__(
+        self,
+        matrix: TravelMatrix,
+        values: List[float],
+        windows: List[List[_Window]],
+        service_minutes: float,
+        departure: float,
+    ) -> None:
+        self.matrix = matrix
+        self.values = values
+        self.windows = windows
+        self.service = service_minutes
+        self.departure = departure
+
+    def _fit(self, node: int, arrival: float) -> Optional[Tuple[float, int]]:
+        """Earliest start and the window it falls in for a stop reached at arrival, or None when it misses them all"""
+        for index, window in enumerate(self.windows[node]):
+            start = max(arrival, window.start)
+            if start + self.service <= window.end:
+                return start, index
+        return None
+
+    def schedule(self, route: Sequence[int]) -> Optional[List[_Stop]]:
+        """Earliest feasible timing of a route from the origin (node 0), or None when a stop misses every window"""
+        stops: List[_Stop] = []
+        previous, clock = 0, self.departure
+        for node in route:
+            arrival = clock + self.matrix.travel_minutes[previous][node]
+            fit = self._fit(node, arrival)
+            if fit is None:
+                return None
+            stops.append(_Stop(node, arrival, *fit))
+            previous, clock = node, fit[0] + self.service
+        return stops
+
+    def score(self, stops: Sequence[_Stop]) -> float:
+        return sum(self.values[stop.node] * self.windows[stop.node][stop.window].quality for stop in stops)
+
+    def travel(self, route: Sequence[int]) -> float:
+        return sum(self.matrix.travel_minutes[a][b] for a, b in zip((0, *route), route))
+
+    def _timeline(self, route: List[int]) -> Optional[_Timeline]:
+        stops = self.schedule(route)
+        if stops is None:
+            return None
+        score, travel, previous = [0.0], [0.0], 0
+        for stop in stops:
+            score.append(score[-1] + self.values[stop.node] * self.windows[stop.node][stop.window].quality)
+            travel.append(travel[-1] + self.matrix.travel_minutes[previous][stop.node])
+            previous = stop.node
+        slack, latest = [0.0] * len(stops), [0.0] * len(stops)
+        for index in reversed(range(len(stops))):
+            stop = stops[index]
+            slack[index] = self.windows[stop.node][stop.window].end - self.service - stop.start
+            last_start = math.inf
+            if index + 1 < len(stops):
+                # Waiting for the next stop's window absorbs part of a delay
+                waiting = stops[index + 1].start - stops[index + 1].arrival
+                slack[index] = min(slack[index], waiting + slack[index + 1])
+                last_start = latest[index + 1] - self.service - self.matrix.travel_minutes[stop.node][route[index + 1]]
+            latest[index] = max(
+                min(window.end - self.service, last_start)
+                for window in self.windows[stop.node]
+                if window.start <= min(window.end - self.service, last_start)
+            )
+        return _Timeline(route, stops, score, travel, slack, latest)
+
+    def _changed(self, timeline: _Timeline, position: int, inserted: int, resume: int) -> Optional[Tuple[float, float]]:
+        """
+        Score and travel of the timeline's route with the stops from position up to resume replaced by the
+        inserted node, or None when that is infeasible. Only the stops up to the first later one are rescheduled:
+        if that stop keeps its window and starts no later than its slack allows, the rest keep theirs too.
+        """
+        route, stops, travel_minutes = timeline.route, timeline.stops, self.matrix.travel_minutes
+        previous = route[position - 1] if position else 0
+        clock = stops[position - 1].start + self.service if position else self.departure
+        score, travel = timeline.score[position], timeline.travel[position]
+        for index in range(resume - 1, len(route)):
+            node = inserted if index < resume else route[index]
+            arrival = clock + travel_minutes[previous][node]
+            if index >= resume and arrival > timeline.latest[index]:
+                return None
+            fit = self._fit(node, arrival)
+            if fit is None:
+                return None
+            travel += travel_minutes[previous][node]
+            if (
+                index >= resume
+                and fit[1] == stops[index].window
+                and 0 <= fit[0] - stops[index].start <= timeline.slack[index]
+            ):
+                unchanged = timeline.travel[-1] - timeline.travel[index + 1]
+                return score + timeline.score[-1] - timeline.score[index], travel + unchanged
+            score += self.values[node] * self.windows[node][fit[1]].quality
+            previous, clock = node, fit[0] + self.service
+        return score, travel
+
+    def _best_insertion(self, route: List[int]) -> Optional[List[int]]:
+        """Cheapest insertion by value gained per minute of extra travel"""
+        timeline = self._timeline(route)
+        assert timeline is not None
+        current_score, current_travel = timeline.score[-1], timeline.travel[-1]
+        visited = set(route)
+        best: Optional[Tuple[float, int, int]] = None
+        for node in range(1, len(self.matrix)):
+            if node in visited:
+                continue
+            for position in range(len(route) + 1):
+                result = self._changed(timeline, position, node, position)
+                if result is None or result[0] <= current_score + 1e-9:
+                    continue
+                ratio = (result[0] - current_score) / (1.0 + max(0.0, result[1] - current_travel))
+                # Ties keep the first candidate, whatever the rounding of the running totals
+                if best is None or ratio > best[0] + 1e-12:
+                    best = (ratio, node, position)
+        if best is None:
+            return None
+        _, node, position = best
+        return route[:position] + [node] + route[position:]
+
+    def _improve(self, route: List[int]) -> Optional[List[int]]:
+        """First move that raises the score, or keeps it and shortens travel: relocating or swapping in a stop"""
+        timeline = self._timeline(route)
+        assert timeline is not None
+        current = (timeline.score[-1], timeline.travel[-1])
+        visited = set(route)
+
+        def better(result: Optional[Tuple[float, float]]) -> bool:
+            return result is not None and (
+                result[0] > current[0] + 1e-9 or (abs(result[0] - current[0]) <= 1e-9 and result[1] < current[1] - 1e-9)
+            )
+
+        for i in range(len(route)):
+            rest = route[:i] + route[i + 1 :]
+            rest_timeline = self._timeline(rest)
+            for position in range(len(route)):
+                if position != i:
+                    candidate = rest[:position] + [route[i]] + rest[position:]
+                    if rest_timeline is not None:
+                        result = self._changed(rest_timeline, position, route[i], position)
+                    else:
+                        # Dropping a stop can only delay the rest when travel times break the triangle inequality
+                        stops = self.schedule(candidate)
+                        result = None if stops is None else (self.score(stops), self.travel(candidate))
+                    if better(result):
+                        return candidate
+            for node in range(1, len(self.matrix)):
+                if node not in visited and better(self._changed(timeline, i, node, i + 1)):
+                    return route[:i] + [node] + route[i + 1 :]
+        return None
+
+    def solve(self) -> List[_Stop]:
+        route: List[int] = []
+        for _ in range(MAX_SEARCH_ROUNDS):
+            while (inserted := self._best_insertion(route)) is not None:
+                route = inserted
+            improved = self._improve(route) if route else None
+            if improved is None:
+                break
+            route = improved
+        return self.schedule(route) or []
+
+
+def plan_day(
+    location: LocationInfo,
+    weather: List[DailyWeather],
+    places: List[Place],
+    photos_by_place: Optional[Dict[str, List[PhotoUrl]]] = None,
+    day: int = 0,
+    service_minutes: float = DEFAULT_SERVICE_MINUTES,
+    speed_kmh: float = DEFAULT_SPEED_KMH,
+    lead_minutes: float = DEFAULT_LEAD_MINUTES,
+    matrix: Optional[TravelMatrix] = None,
+    sun_by_place: Optional[Dict[str, Optional[Tuple[str, str]]]] = None,
+) -> DayPlan:
+    """
+    Plan a day of shooting: the route from the location through the places that collects the most
+    photographic value in good light, with every stop starting inside a blue or golden hour window and
+    travel between stops taken into account. The day starts at the location lead_minutes before the
+    first window.
+
+    Args:
+        location: Where the day starts
+        weather: Daily forecast with sunrise and sunset times
+        places: Candidate places
+        photos_by_place: Photos per place name; places with more viewed photos are worth more
+        day: Index of the forecast day to plan
+        service_minutes: Time spent shooting at each stop
+        speed_kmh: Average travel speed for the estimated travel times
+        lead_minutes: How long before the first light window the day starts
+        matrix: Precomputed travel matrix over the location and places, in that order
+        sun_by_place: Terrain-corrected (sunrise, sunset) UTC times per place name, e.g. from the horizon
+            module; golden hour at such a place only starts once the sun clears its skyline. None for a
+            place the sun never reaches that day, which then has no golden hour at all
+
+    Raises:
+        ValueError: If the forecast has no such day or the matrix does not match the places
+    """
+    if not 0 <= day < len(weather):
+        raise ValueError(f"No forecast for day {day}, the forecast has {len(weather)} days")
+    forecast = weather[day]
+    photos_by_place = photos_by_place or {}
+    zone = _zone(location["timezone"])
+
+    sun = {"sunrise": _parse_utc(forecast["sunrise_time"]), "sunset": _parse_utc(forecast["sunset_time"])}
+    # Minutes are counted from sunrise; windows before it are negative
+    origin_time = sun["sunrise"]
+
+    def minutes(moment: datetime) -> float:
+        return (moment - origin_time).total_seconds() / 60.0
+
+    def local(offset: float) -> str:
+        return (origin_time + timedelta(minutes=offset)).astimezone(zone).isoformat(timespec="minutes")
+
+    factor = light_factor(forecast)
+    windows = sorted(
+        (
+            _Window(name, minutes(sun[anchor]) + begin, minutes(sun[anchor]) + end, quality)
+            for name, anchor, begin, end, quality in LIGHT_WINDOWS
+        ),
+        key=lambda window: window.start,
+    )
+
+    if matrix is None:
+        points = [(location["latitude"], location["longitude"])]
+        points.extend((place["latitude"], place["longitude"]) for place in places)
+        matrix = TravelMatrix.from_points(points, speed_kmh=speed_kmh)
+    elif len(matrix) != len(places) + 1:
+        raise ValueError(f"Travel matrix covers {len(matrix)} points, expected {len(places) + 1}")
+
+    def place_windows(place: Place) -> List[_Window]:
+        if place["name"] not in (sun_by_place or {}):
+            return windows
+        sun_times = (sun_by_place or {})[place["name"]]
+        if sun_times is None:
+            # In shadow all day: only the ambient blue hours are left
+            return [window for window in windows if not window.name.startswith("golden")]
+        sunrise, sunset = sun_times
+        adjusted = []
+        for window in windows:
+            if window.name == "golden_morning" and sunrise:
+                window = replace(window, start=max(window.start, minutes(_parse_utc(sunrise))))
+            elif window.name == "golden_evening" and sunset:
+                window = replace(window, end=min(window.end, minutes(_parse_utc(sunset))))
+            if window.end > window.start:
+                adjusted.append(window)
+        return adjusted
+
+    values = [0.0] + [place_value(photos_by_place.get(place["name"], [])) * factor for place in places]
+    windows_by_node = [windows] + [place_windows(place) for place in places]
+    departure = windows[0].start - lead_minutes
+    stops = _Solver(matrix, values, windows_by_node, service_minutes, departure).solve()
+
+    visits: List[PlannedVisit] = []
+    previous = 0
+    for stop in stops:
+        place = places[stop.node - 1]
+        window = windows_by_node[stop.node][stop.window]
+        visits.append(
+            {
+                "place": place["name"],
+                "latitude": place["latitude"],
+                "longitude": place["longitude"],
+                "window": window.name,
+                "arrival": local(stop.arrival),
+                "start": local(stop.start),
+                "end": local(stop.start + service_minutes),
+                "travel_minutes": round(matrix.travel_minutes[previous][stop.node], 1),
+                "distance_km": round(matrix.distance_km[previous][stop.node], 2),
+                "score": round(values[stop.node] * window.quality, 3),
+            }
+        )
+        previous = stop.node
+
+    visited = {stop.node for stop in stops}
+    return {
+        "date": sun["sunrise"].astimezone(zone).date().isoformat(),
+        "timezone": location["timezone"] or "UTC",
+        "light_factor": factor,
+        "windows": [
+            {"name": window.name, "start": local(window.start), "end": local(window.end), "quality": window.quality}
+            for window in windows
+        ],
+        "visits": visits,
+        "total_score": round(sum(visit["score"] for visit in visits), 3),
+        "total_distance_km": round(sum(visit["distance_km"] for visit in visits), 2),
+        "total_travel_minutes": round(sum(visit["travel_minutes"] for visit in visits), 1),
+        "unvisited": [place["name"] for node, place in enumerate(places, start=1) if node not in visited],
+    }
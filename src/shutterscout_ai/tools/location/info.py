@@ -0,0 +1,12 @@
+from typing import TypedDict
+
+
+class LocationInfo(TypedDict):
+    """Type definition for location information returned by the API"""
+
+    latitude: float
+    longitude: float
+    city: str
+    region: str
+    country: str
+    timezone: str
@@ -1,30 +1,209 @@
-from typing import TypedDict
+import os
+from typing import Optional, Protocol
 
 import requests
 from loguru import logger
 from smolagents import tool
 
+from shutterscout_ai.tools.geocoder.geocoder import get_geocoder
+from shutterscout_ai.tools.location.info import LocationInfo
+from shutterscout_ai.utils.cache import TTLCache
+from shutterscout_ai.utils.decoding import Projection, decode_json
+from shutterscout_ai.utils.http import fetch
+from shutterscout_ai.utils.providers import ProviderRegistry
 
-class LocationInfo(TypedDict):
-    """Type definition for location information returned by the API"""
+LOCATION_PROJECTION = Projection(("error", "latitude", "longitude", "city", "region", "country_name", "timezone"))
+IPWHOIS_PROJECTION = Projection(
+    ("success", "message", "latitude", "longitude", "city", "region", "country", "timezone.id")
+)
 
-    latitude: float
-    longitude: float
-    city: str
-    region: str
-    country: str
-    timezone: str
+DEFAULT_LOCATION_TTL_SECONDS = 3600.0
+
+
+def _location_ttl() -> float:
+    """SHUTTERSCOUT_LOCATION_TTL in seconds; a malformed value falls back to the default instead of failing imports"""
+    configured = os.getenv("SHUTTERSCOUT_LOCATION_TTL", "").strip()
+    if not configured:
+        return DEFAULT_LOCATION_TTL_SECONDS
+    try:
+        ttl = float(configured)
+    except ValueError:
+        ttl = -1.0
+    if not ttl >= 0:
+        logger.warning(
+            f"Ignoring SHUTTERSCOUT_LOCATION_TTL={configured!r}, expected seconds; "
+            f"using {DEFAULT_LOCATION_TTL_SECONDS:.0f}"
+        )
+        return DEFAULT_LOCATION_TTL_SECONDS
+    return ttl
+
+
+# IP geolocation rarely changes, so lookups are cached per IP (SHUTTERSCOUT_LOCATION_TTL seconds, 0 disables)
+_ip_location_cache: TTLCache[LocationInfo] = TTLCache("ip_location", ttl=_location_ttl(), maxsize=4096)
+
+
+def clear_location_cache() -> None:
+    """Forget all cached IP geolocation results"""
+    _ip_location_cache.clear()
+
+
+class LocationProvider(Protocol):
+    name: str
+
+    def lookup(self, ip_address: str) -> LocationInfo: ...
+
+
+class IpapiLocationProvider:
+    """IP geolocation from ipapi.co"""
+
+    name = "ipapi"
+
+    def lookup(self, ip_address: str) -> LocationInfo:
+        try:
+            headers = {
+                "User-Agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                    "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+                )
+            }
+            url = f"https://ipapi.co/{ip_address}/json/" if ip_address else "https://ipapi.co/json/"
+            response = fetch("get_location", url, headers=headers)
+            response.raise_for_status()
+            data = decode_json(response, LOCATION_PROJECTION)
+
+            if "error" in data:
+                logger.error(f"API returned error: {data['error']}")
+                raise ValueError(f"Location API error: {data['error']}")
+
+            return {
+                "latitude": data["latitude"],
+                "longitude": data["longitude"],
+                "city": data["city"],
+                "region": data["region"],
+                "country": data["country_name"],
+                "timezone": data["timezone"],
+            }
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch location data: {str(e)}")
+            raise RuntimeError(f"Failed to fetch location data: {str(e)}") from e
+        except (KeyError, TypeError) as e:
+            logger.error(f"Invalid location data received: {str(e)}")
+            raise ValueError(f"Invalid location data received: {str(e)}") from e
+
+
+class IpWhoIsLocationProvider:
+    """IP geolocation from ipwho.is"""
+
+    name = "ipwhois"
+
+    def lookup(self, ip_address: str) -> LocationInfo:
+        try:
+            response = fetch("get_location", f"https://ipwho.is/{ip_address}")
+            response.raise_for_status()
+            data = decode_json(response, IPWHOIS_PROJECTION)
+
+            if not data.get("success", False):
+                logger.error(f"API returned error: {data.get('message', 'unknown error')}")
+                raise ValueError(f"Location API error: {data.get('message', 'unknown error')}")
+
+            return {
+                "latitude": data["latitude"],
+                "longitude": data["longitude"],
+                "city": data["city"],
+                "region": data["region"],
+                "country": data["country"],
+                "timezone": data["timezone"]["id"],
+            }
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch location data: {str(e)}")
+            raise RuntimeError(f"Failed to fetch location data: {str(e)}") from e
+        except (KeyError, TypeError) as e:
+            logger.error(f"Invalid location data received: {str(e)}")
+            raise ValueError(f"Invalid location data received: {str(e)}") from e
+
+
+# Select with SHUTTERSCOUT_LOCATION_PROVIDERS and SHUTTERSCOUT_LOCATION_POLICY
+location_providers: ProviderRegistry[LocationProvider] = ProviderRegistry(
+    "location", [IpapiLocationProvider(), IpWhoIsLocationProvider()], defaults=("ipapi",)
+)
+
+
+# Overrides further than this from any gazetteer city keep an empty region, country and timezone
+NEAREST_CITY_KM = 100.0
+
+
+def resolve_location(
+    latitude: Optional[float] = None, longitude: Optional[float] = None, place_name: str = ""
+) -> Optional[LocationInfo]:
+    """
+    Build a LocationInfo from explicit overrides without any network I/O.
+    A place name on its own is resolved with the offline geocoder, and explicit coordinates
+    get their region, country and timezone from the nearest known city within NEAREST_CITY_KM.
+
+    Returns:
+        The override location, or None when no override was given
+
+    Raises:
+        ValueError: If only one coordinate is given, coordinates are out of range,
+            or a place name without coordinates cannot be resolved offline
+    """
+    if latitude is None and longitude is None:
+        if not place_name:
+            return None
+        try:
+            match = get_geocoder().geocode(place_name)
+        except (OSError, ValueError) as e:
+            logger.error(f"Offline geocoding unavailable: {str(e)}")
+            raise ValueError(f"Cannot resolve place '{place_name}': offline geocoding unavailable: {str(e)}") from e
+        if match is None:
+            raise ValueError(f"Cannot resolve place '{place_name}' without latitude and longitude")
+        logger.debug(f"Geocoded '{place_name}' offline to {match['city']}, {match['country']}")
+        return match
+    if latitude is None or longitude is None:
+        raise ValueError("latitude and longitude must be given together")
+    if not (-90.0 <= latitude <= 90.0) or not (-180.0 <= longitude <= 180.0):
+        raise ValueError(f"Invalid coordinates: {latitude}, {longitude}")
+
+    try:
+        nearest = get_geocoder().reverse(latitude, longitude, max_distance_km=NEAREST_CITY_KM)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Offline reverse geocoding unavailable: {str(e)}")
+        nearest = None
+    return {
+        "latitude": float(latitude),
+        "longitude": float(longitude),
+        "city": place_name or (nearest["city"] if nearest else ""),
+        "region": nearest["region"] if nearest else "",
+        "country": nearest["country"] if nearest else "",
+        "timezone": nearest["timezone"] if nearest else "",
+    }
 
 
 @tool
-def get_location(debug: bool = False) -> LocationInfo:
+def get_location(
+    debug: bool = False,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    place_name: str = "",
+    ip_address: str = "",
+) -> LocationInfo:
     """
-    Retrieves the user's location information based on their IP address using ipapi.co.
+    Retrieves the user's location information based on their IP address using ipapi.co
+    (or the providers configured with SHUTTERSCOUT_LOCATION_PROVIDERS).
     Returns a dictionary containing latitude, longitude, city, region, country and timezone.
+    Explicit coordinates or a known place name skip the lookup entirely, and IP lookups are cached.
 
     Args:
         debug: If True, returns hardcoded coordinates for Rotterdam for debugging purposes
+        latitude: Optional latitude override, must be given together with longitude
+        longitude: Optional longitude override, must be given together with latitude
+        place_name: Optional name for the overridden location, reported as the city; on its own it is geocoded offline
+        ip_address: Optional IP address to locate instead of the caller's own address
     """
+    override = resolve_location(latitude, longitude, place_name)
+    if override is not None:
+        return override
+
     if debug:
         return {
             "latitude": 51.9181,
@@ -34,32 +213,9 @@ def get_location(debug: bool = False) -> LocationInfo:
             "country": "Netherlands",
             "timezone": "Europe/Amsterdam",
         }
-    try:
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            )
-        }
-        response = requests.get("https://ipapi.co/json/", headers=headers)
-        response.raise_for_status()
-        data = response.json()
-
-        if "error" in data:
-            logger.error(f"API returned error: {data['error']}")
-            raise ValueError(f"Location API error: {data['error']}")
-
-        return {
-            "latitude": data["latitude"],
-            "longitude": data["longitude"],
-            "city": data["city"],
-            "region": data["region"],
-            "country": data["country_name"],
-            "timezone": data["timezone"],
-        }
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch location data: {str(e)}")
-        raise RuntimeError(f"Failed to fetch location data: {str(e)}") from e
-    except (KeyError, TypeError) as e:
-        logger.error(f"Invalid location data received: {str(e)}")
-        raise ValueError(f"Invalid location data received: {str(e)}") from e
+    # Copy so callers can't mutate the cached entry
+    return dict(
+        _ip_location_cache.get_or_set(
+            ip_address or "self", lambda: location_providers.call(lambda provider: provider.lookup(ip_address))
+        )
+    )
@@ -1,11 +1,14 @@
 import os
 from enum import Enum
-from typing import List, TypedDict
+from typing import Dict, List, NotRequired, TypedDict
 
 import requests
 from loguru import logger
 from smolagents import tool
 
+from shutterscout_ai.utils.decoding import Projection, decode_json
+from shutterscout_ai.utils.http import fetch
+
 
 class PhotoSize(str, Enum):
     SMALL_SQUARE = "s"  # 75x75
@@ -39,6 +42,15 @@ class PhotoUrl(TypedDict):
     id: str
     title: str
     url: str
+    views: NotRequired[int]
+    date_taken: NotRequired[str]
+
+
+# Status fields plus the photo fields needed to build static URLs and rank photos
+SEARCH_PROJECTION = Projection(
+    ("stat", "message")
+    + tuple(f"photos.photo[].{field}" for field in ("id", "secret", "server", "farm", "title", "views", "datetaken"))
+)
 
 
 @tool
@@ -73,9 +85,9 @@ def search_flickr_photos(text: str, latitude: float, longitude: float, radius: i
             "extras": "views,date_taken",  # Get additional metadata
         }
 
-        response = requests.get(url, params=params)
+        response = fetch("search_flickr_photos", url, params=params)
         response.raise_for_status()
-        data: FlickrResponse = response.json()
+        data: FlickrResponse = decode_json(response, SEARCH_PROJECTION)
 
         if data.get("stat") != "ok":
             error_msg = data.get("message", "Unknown Flickr API error")
@@ -111,9 +123,43 @@ def get_photo_urls(photos: List[FlickrPhoto], size: PhotoSize = PhotoSize.MEDIUM
                 f"{photo['id']}_{photo['secret']}"
                 f"{size_suffix}.jpg"
             )
-            urls.append({"id": photo["id"], "title": photo["title"], "url": url})
+            photo_url: PhotoUrl = {"id": photo["id"], "title": photo["title"], "url": url}
+            # Extras are only present when requested in the search
+            if "views" in photo:
+                photo_url["views"] = int(photo["views"])
+            if "datetaken" in photo:
+                photo_url["date_taken"] = photo["datetaken"]
+            urls.append(photo_url)
 
         return urls
-    except (KeyError, TypeError) as e:
+    except (KeyError, TypeError, ValueError) as e:
         logger.error(f"Invalid photo data format: {str(e)}")
         raise ValueError(f"Invalid photo data format: {str(e)}") from e
+
+
+def rank_photos(photos: List[PhotoUrl]) -> List[PhotoUrl]:
+    """Photos ordered by views, then date taken, most popular and recent first"""
+    # Two stable sorts; Flickr's "YYYY-MM-DD HH:MM:SS" dates sort chronologically as text
+    by_date = sorted(photos, key=lambda photo: photo.get("date_taken", ""), reverse=True)
+    return sorted(by_date, key=lambda photo: photo.get("views", 0), reverse=True)
+
+
+def deduplicate_photos(photos_by_place: Dict[str, List[PhotoUrl]]) -> Dict[str, List[PhotoUrl]]:
+    """
+    Rank each place's photos and keep every photo id only under the first place it was found for,
+    since searches around nearby places overlap. Places left without photos are dropped.
+
+    Args:
+        photos_by_place: Photos per place name, in place order
+    """
+    seen = set()
+    deduplicated: Dict[str, List[PhotoUrl]] = {}
+    for place_name, photos in photos_by_place.items():
+        unique = []
+        for photo in rank_photos(photos):
+            if photo["id"] not in seen:
+                seen.add(photo["id"])
+                unique.append(photo)
+        if unique:
+            deduplicated[place_name] = unique
+    return deduplicated
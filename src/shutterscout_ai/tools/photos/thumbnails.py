@@ -0,0 +1,343 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple, TypedDict
+
+import requests
+from loguru import logger
+from PIL import Image, UnidentifiedImageError
+
+from shutterscout_ai.config.paths import cache_dir
+from shutterscout_ai.tools.photos.photos import PhotoSize, PhotoUrl, rank_photos
+from shutterscout_ai.utils.http import fetch
+
+# Photos whose difference hashes differ in at most this many of 64 bits are treated as the same shot
+SIMILARITY_THRESHOLD = 6
+DEFAULT_MAX_BYTES = int(float(os.getenv("SHUTTERSCOUT_THUMBNAIL_CACHE_MB", "256")) * 1024 * 1024)
+# Eviction frees space down to this share of max_bytes, so the directory is walked once per batch of puts
+EVICTION_LOW_WATER = 0.9
+
+_STATIC_URL = re.compile(r"^(?P<base>.+/\d+_[0-9a-zA-Z]+)(?:_[a-z0-9])?\.jpg$")
+
+
+class PhotoAsset(TypedDict):
+    """A photo kept after deduplication, with its local thumbnail"""
+
+    id: str
+    title: str
+    url: str
+    views: int
+    date_taken: str
+    places: List[str]
+    thumbnail_path: str
+    phash: Optional[int]
+
+
+def thumbnail_url(photo: PhotoUrl, size: PhotoSize = PhotoSize.LARGE_SQUARE) -> str:
+    """
+    The static URL of a photo at another size.
+
+    Args:
+        photo: Photo returned by search_flickr_photos
+        size: Size to link to (default is the 150x150 square)
+    """
+    match = _STATIC_URL.match(photo["url"])
+    if match is None:
+        raise ValueError(f"Not a Flickr static photo URL: {photo['url']}")
+    suffix = f"_{size.value}" if size.value else ""
+    return f"{match.group('base')}{suffix}.jpg"
+
+
+class ThumbnailCache:
+    """
+    Content-addressed on-disk image cache. Files are stored under the SHA-256 of their bytes, so identical
+    images fetched from different URLs are kept once; a small index maps URLs to digests.
+    When the cache grows past max_bytes, the least recently used files are evicted until it is back under
+    EVICTION_LOW_WATER of that.
+
+    Index changes are kept in memory until flush, so a batch of downloads rewrites the index once.
+    Several processes may share the directory: flush merges with the index on disk.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or cache_dir("thumbnails")
+        self.max_bytes = max_bytes
+        self._index_path = os.path.join(self.directory, "index.json")
+        self._lock = threading.Lock()
+        self._index = self._read_index()
+        self._dirty = False
+        self._total_bytes = sum(size for _, size, _ in self._blobs())
+
+    def _read_index(self) -> Dict[str, str]:
+        if not os.path.exists(self._index_path):
+            return {}
+        try:
+            with open(self._index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable thumbnail index: {str(e)}")
+            return {}
+
+    def _write_atomically(self, path: str, write: Callable[[IO[Any]], None], mode: str = "w") -> None:
+        # A unique temporary name per write, so concurrent writers never share a half-written file
+        descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, mode) as f:
+                write(f)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def path_for(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.jpg")
+
+    def _blobs(self) -> List[Tuple[float, int, str]]:
+        blobs = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".jpg"):
+                    path = os.path.join(root, name)
+                    stat = os.stat(path)
+                    blobs.append((stat.st_mtime, stat.st_size, path))
+        return blobs
+
+    def get(self, url: str) -> Optional[str]:
+        """Local path of the cached image for a URL, or None"""
+        with self._lock:
+            digest = self._index.get(url)
+            if digest is None:
+                return None
+            path = self.path_for(digest)
+            try:
+                # Touch on use, so eviction sees the file as recently used. Explicit times, because the
+                # file system's own clock is too coarse to order uses milliseconds apart.
+                os.utime(path, ns=(time.time_ns(), time.time_ns()))
+            except FileNotFoundError:
+                del self._index[url]
+                return None
+            return path
+
+    def put(self, url: str, content: bytes) -> str:
+        """Store an image and return its local path"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self.path_for(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._write_atomically(path, lambda f: f.write(content), mode="wb")
+                os.utime(path, ns=(time.time_ns(), time.time_ns()))
+                self._total_bytes += len(content)
+            self._index[url] = digest
+            self._dirty = True
+            if self._total_bytes > self.max_bytes:
+                self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        removed = set()
+        blobs = sorted(self._blobs())
+        self._total_bytes = sum(size for _, size, _ in blobs)
+        target = int(self.max_bytes * EVICTION_LOW_WATER)
+        for _, size, path in blobs:
+            if self._total_bytes <= target:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            self._total_bytes -= size
+            removed.add(os.path.basename(path)[: -len(".jpg")])
+        self._index = {url: digest for url, digest in self._index.items() if digest not in removed}
+        logger.debug(f"Evicted {len(removed)} thumbnails, cache now {self._total_bytes} bytes")
+
+    def flush(self) -> None:
+        """Write index changes to disk, keeping entries other processes added meanwhile"""
+        with self._lock:
+            if not self._dirty:
+                return
+            merged = {
+                url: digest for url, digest in self._read_index().items() if os.path.exists(self.path_for(digest))
+            }
+            merged.update(self._index)
+            self._write_atomically(self._index_path, lambda f: json.dump(merged, f))
+            self._index = merged
+            self._dirty = False
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+_shared_cache: Optional[ThumbnailCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Shared cache in the default cache directory"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ThumbnailCache()
+        return _shared_cache
+
+
+def _download(cache: ThumbnailCache, url: str) -> Optional[str]:
+    path = cache.get(url)
+    if path is not None:
+        return path
+    try:
+        response = fetch("download_thumbnail", url, timeout=10)
+        response.raise_for_status()
+        return cache.put(url, response.content)
+    except requests.RequestException as e:
+        logger.warning(f"Failed to download thumbnail {url}: {str(e)}")
+        return None
+    except OSError as e:
+        # A full disk or read-only cache only costs this thumbnail
+        logger.warning(f"Failed to cache thumbnail {url}: {str(e)}")
+        return None
+
+
+def download_thumbnails(
+    photos: List[PhotoUrl],
+    size: PhotoSize = PhotoSize.LARGE_SQUARE,
+    cache: Optional[ThumbnailCache] = None,
+    max_workers: int = 8,
+) -> Dict[str, str]:
+    """
+    Download photo thumbnails concurrently into the local cache. Cached thumbnails are not fetched again,
+    and failed downloads are skipped.
+
+    Args:
+        photos: Photos returned by search_flickr_photos
+        size: Thumbnail size (default is the 150x150 square)
+        cache: Cache to use instead of the shared one
+        max_workers: Maximum number of concurrent downloads
+
+    Returns:
+        Local thumbnail path per photo id
+    """
+    cache = cache or get_thumbnail_cache()
+    urls = {photo["id"]: thumbnail_url(photo, size) for photo in photos}
+    if not urls:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(urls))) as executor:
+        paths = dict(zip(urls, executor.map(lambda url: _download(cache, url), urls.values())))
+    cache.flush()
+    return {photo_id: path for photo_id, path in paths.items() if path is not None}
+
+
+def difference_hash(path: str, hash_size: int = 8) -> Optional[int]:
+    """
+    64-bit difference hash (dHash) of an image: whether each pixel of a shrunken grayscale copy is brighter
+    than its right neighbour. Resized, recompressed or slightly edited copies hash within a few bits.
+    Returns None when the file is not a readable image.
+    """
+    try:
+        with Image.open(path) as image:
+            pixels = image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS).tobytes()
+    except (OSError, UnidentifiedImageError) as e:
+        logger.warning(f"Cannot hash {path}: {str(e)}")
+        return None
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def compute_hashes(paths: Dict[str, str], processes: Optional[int] = None) -> Dict[str, int]:
+    """
+    Perceptual hashes for local images, computed in a process pool since decoding and resizing is CPU bound.
+
+    Args:
+        paths: Local image path per photo id
+        processes: Worker processes (default one per CPU); 0 hashes in the calling process
+
+    Returns:
+        Hash per photo id, leaving out unreadable images
+    """
+    if processes == 0 or len(paths) < 2:
+        hashes = [difference_hash(path) for path in paths.values()]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            hashes = list(executor.map(difference_hash, paths.values()))
+    return {photo_id: value for photo_id, value in zip(paths, hashes) if value is not None}
+
+
+def collect_photo_assets(
+    photos_by_place: Dict[str, List[PhotoUrl]],
+    size: PhotoSize = PhotoSize.LARGE_SQUARE,
+    threshold: int = SIMILARITY_THRESHOLD,
+    cache: Optional[ThumbnailCache] = None,
+    processes: Optional[int] = None,
+) -> List[PhotoAsset]:
+    """
+    Turn per-place search results into a ranked, deduplicated list of photos with local thumbnails.
+    Photos are merged by id and then by visual similarity across places, keeping the most viewed and
+    most recent copy and recording every place it was found for.
+
+    Args:
+        photos_by_place: Photos per place name, as in CombinedData
+        size: Thumbnail size to download
+        threshold: Maximum Hamming distance between hashes of near-identical photos
+        cache: Cache to use instead of the shared one
+        processes: Worker processes for hashing; 0 hashes in the calling process
+    """
+    places_by_id: Dict[str, List[str]] = {}
+    unique: Dict[str, PhotoUrl] = {}
+    for place_name, photos in photos_by_place.items():
+        for photo in photos:
+            places_by_id.setdefault(photo["id"], [])
+            if place_name not in places_by_id[photo["id"]]:
+                places_by_id[photo["id"]].append(place_name)
+            unique.setdefault(photo["id"], photo)
+
+    ranked = rank_photos(list(unique.values()))
+    thumbnails = download_thumbnails(ranked, size=size, cache=cache)
+    hashes = compute_hashes(thumbnails, processes=processes)
+
+    assets: List[PhotoAsset] = []
+    for photo in ranked:
+        phash = hashes.get(photo["id"])
+        duplicate_of = None
+        if phash is not None:
+            duplicate_of = next(
+                (
+                    asset
+                    for asset in assets
+                    if asset["phash"] is not None and hamming_distance(asset["phash"], phash) <= threshold
+                ),
+                None,
+            )
+        if duplicate_of is not None:
+            # Ranked order means the copy already kept is the more popular one
+            for place_name in places_by_id[photo["id"]]:
+                if place_name not in duplicate_of["places"]:
+                    duplicate_of["places"].append(place_name)
+            continue
+        assets.append(
+            {
+                "id": photo["id"],
+                "title": photo["title"],
+                "url": photo["url"],
+                "views": photo.get("views", 0),
+                "date_taken": photo.get("date_taken", ""),
+                "places": list(places_by_id[photo["id"]]),
+                "thumbnail_path": thumbnails.get(photo["id"], ""),
+                "phash": phash,
+            }
+        )
+
+    logger.debug(f"Kept {len(assets)} of {len(unique)} unique photo ids after visual deduplication")
+    return assets
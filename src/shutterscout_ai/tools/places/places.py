@@ -1,10 +1,14 @@
 import os
-from typing import List, TypedDict
+from typing import List, Protocol, TypedDict
 
 import requests
 from loguru import logger
 from smolagents import tool
 
+from shutterscout_ai.utils.decoding import Projection, decode_json
+from shutterscout_ai.utils.http import fetch
+from shutterscout_ai.utils.providers import ProviderRegistry
+
 
 class Place(TypedDict):
     """Represents a simplified place with basic location information"""
@@ -14,10 +18,118 @@ class Place(TypedDict):
     longitude: float
 
 
+# Only the name and main geocode of each Foursquare result are used
+PLACES_PROJECTION = Projection(
+    ("results[].name", "results[].geocodes.main.latitude", "results[].geocodes.main.longitude")
+)
+
+
+# Only the name and coordinates of each OpenStreetMap element are used; ways and relations carry a center
+OVERPASS_PROJECTION = Projection(
+    (
+        "elements[].tags.name",
+        "elements[].lat",
+        "elements[].lon",
+        "elements[].center.lat",
+        "elements[].center.lon",
+    )
+)
+
+
+class PlacesProvider(Protocol):
+    name: str
+
+    def search(self, latitude: float, longitude: float, radius: int) -> List[Place]: ...
+
+
+class FoursquarePlacesProvider:
+    """Foursquare Places search; needs FOURSQUARE_API_KEY"""
+
+    name = "foursquare"
+
+    def search(self, latitude: float, longitude: float, radius: int) -> List[Place]:
+        api_key = os.getenv("FOURSQUARE_API_KEY")
+        if not api_key:
+            logger.error("FOURSQUARE_API_KEY environment variable not set")
+            raise ValueError("FOURSQUARE_API_KEY environment variable not set")
+
+        try:
+            # Categories: landmarks, cultural spots, museums, entertainment, scenic lookouts
+            categories = "16032,16015,16019,13003,10027"
+
+            url = "https://api.foursquare.com/v3/places/search"
+            headers = {"Authorization": api_key, "accept": "application/json"}
+            params = {"ll": f"{latitude},{longitude}", "radius": radius, "categories": categories}
+
+            response = fetch("get_interesting_places", url, headers=headers, params=params, stream=True)
+            response.raise_for_status()
+            data = decode_json(response, PLACES_PROJECTION)
+
+            results = []
+            for place in data.get("results", []):
+                try:
+                    location = {
+                        "name": place["name"],
+                        "latitude": place["geocodes"]["main"]["latitude"],
+                        "longitude": place["geocodes"]["main"]["longitude"],
+                    }
+                    results.append(location)
+                except (KeyError, TypeError) as e:
+                    logger.warning(f"Skipping place due to missing data: {str(e)}")
+                    continue
+            return results
+        except (requests.RequestException, Exception) as e:
+            logger.error(f"Failed to fetch places from Foursquare: {str(e)}")
+            raise RuntimeError(f"Failed to fetch places from Foursquare: {str(e)}") from e
+        except (KeyError, TypeError) as e:
+            logger.error(f"Invalid place data received from Foursquare: {str(e)}")
+            raise ValueError(f"Invalid place data received from Foursquare: {str(e)}") from e
+
+
+class OverpassPlacesProvider:
+    """OpenStreetMap attractions, viewpoints and museums from the public Overpass API; keyless"""
+
+    name = "overpass"
+
+    def search(self, latitude: float, longitude: float, radius: int) -> List[Place]:
+        around = f"(around:{radius},{latitude},{longitude})"
+        query = (
+            f'[out:json][timeout:25];nwr["tourism"~"^(attraction|viewpoint|museum)$"]["name"]{around};out center 50;'
+        )
+        try:
+            response = fetch(
+                "get_interesting_places", "https://overpass-api.de/api/interpreter", params={"data": query}, stream=True
+            )
+            response.raise_for_status()
+            data = decode_json(response, OVERPASS_PROJECTION)
+
+            results = []
+            for element in data.get("elements", []):
+                try:
+                    point = element["center"] if "center" in element else element
+                    results.append(
+                        {"name": element["tags"]["name"], "latitude": point["lat"], "longitude": point["lon"]}
+                    )
+                except (KeyError, TypeError) as e:
+                    logger.warning(f"Skipping place due to missing data: {str(e)}")
+                    continue
+            return results
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch places from Overpass: {str(e)}")
+            raise RuntimeError(f"Failed to fetch places from Overpass: {str(e)}") from e
+
+
+# Select with SHUTTERSCOUT_PLACES_PROVIDERS and SHUTTERSCOUT_PLACES_POLICY
+places_providers: ProviderRegistry[PlacesProvider] = ProviderRegistry(
+    "places", [FoursquarePlacesProvider(), OverpassPlacesProvider()], defaults=("foursquare",)
+)
+
+
 @tool
 def get_interesting_places(latitude: float, longitude: float, radius: int = 10000) -> List[Place]:
     """
     Get interesting places around a location using Foursquare API, returning simplified location data.
+    Other sources can be configured with SHUTTERSCOUT_PLACES_PROVIDERS.
 
     Args:
         latitude: Location latitude
@@ -27,39 +139,4 @@ def get_interesting_places(latitude: float, longitude: float, radius: int = 1000
     Returns:
         List of places with name and coordinates
     """
-    api_key = os.getenv("FOURSQUARE_API_KEY")
-    if not api_key:
-        logger.error("FOURSQUARE_API_KEY environment variable not set")
-        raise ValueError("FOURSQUARE_API_KEY environment variable not set")
-
-    try:
-        # Categories: landmarks, cultural spots, museums, entertainment, scenic lookouts
-        categories = "16032,16015,16019,13003,10027"
-
-        url = "https://api.foursquare.com/v3/places/search"
-        headers = {"Authorization": api_key, "accept": "application/json"}
-        params = {"ll": f"{latitude},{longitude}", "radius": radius, "categories": categories}
-
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        results = []
-        for place in data.get("results", []):
-            try:
-                location = {
-                    "name": place["name"],
-                    "latitude": place["geocodes"]["main"]["latitude"],
-                    "longitude": place["geocodes"]["main"]["longitude"],
-                }
-                results.append(location)
-            except (KeyError, TypeError) as e:
-                logger.warning(f"Skipping place due to missing data: {str(e)}")
-                continue
-        return results
-    except (requests.RequestException, Exception) as e:
-        logger.error(f"Failed to fetch places from Foursquare: {str(e)}")
-        raise RuntimeError(f"Failed to fetch places from Foursquare: {str(e)}") from e
-    except (KeyError, TypeError) as e:
-        logger.error(f"Invalid place data received from Foursquare: {str(e)}")
-        raise ValueError(f"Invalid place data received from Foursquare: {str(e)}") from e
+    return places_providers.call(lambda provider: provider.search(latitude, longitude, radius))
@@ -1,10 +1,14 @@
 import os
-from typing import List, TypedDict
+from typing import Any, List, Protocol, TypedDict
 
 import requests
 from loguru import logger
 from smolagents import tool
 
+from shutterscout_ai.utils.decoding import Projection, decode_json
+from shutterscout_ai.utils.http import fetch
+from shutterscout_ai.utils.providers import ProviderRegistry
+
 
 class DailyWeather(TypedDict):
     """Type definition for daily weather information"""
@@ -21,10 +25,162 @@ class DailyWeather(TypedDict):
     humidity: int
 
 
+# Only the fields turned into DailyWeather are kept from the Tomorrow.io response
+FORECAST_PROJECTION = Projection(
+    f"timelines.daily[].{field}"
+    for field in (
+        "time",
+        "values.temperatureMin",
+        "values.temperatureMax",
+        "values.cloudCoverAvg",
+        "values.precipitationProbabilityAvg",
+        "values.visibilityAvg",
+        "values.sunriseTime",
+        "values.sunsetTime",
+        "values.windSpeedAvg",
+        "values.humidityAvg",
+    )
+)
+
+
+# Open-Meteo daily variables, in the order they map onto DailyWeather
+OPEN_METEO_DAILY = (
+    "temperature_2m_min",
+    "temperature_2m_max",
+    "cloud_cover_mean",
+    "precipitation_probability_mean",
+    "visibility_mean",
+    "sunrise",
+    "sunset",
+    "wind_speed_10m_mean",
+    "relative_humidity_2m_mean",
+)
+OPEN_METEO_PROJECTION = Projection(("daily.time", *(f"daily.{variable}" for variable in OPEN_METEO_DAILY)))
+
+
+class WeatherProvider(Protocol):
+    name: str
+
+    def forecast(self, latitude: float, longitude: float) -> List[DailyWeather]: ...
+
+
+class TomorrowWeatherProvider:
+    """Tomorrow.io daily forecast; needs TOMORROW_API_KEY"""
+
+    name = "tomorrow"
+
+    def forecast(self, latitude: float, longitude: float) -> List[DailyWeather]:
+        api_key = os.getenv("TOMORROW_API_KEY")
+        if not api_key:
+            raise ValueError("TOMORROW_API_KEY environment variable not set")
+
+        url = "https://api.tomorrow.io/v4/weather/forecast"
+        params = {"location": f"{latitude},{longitude}", "timesteps": "1d", "apikey": api_key}
+
+        try:
+            response = fetch("get_weather_forecast", url, params=params, stream=True)
+            response.raise_for_status()
+            data = decode_json(response, FORECAST_PROJECTION)
+
+            if "timelines" not in data or "daily" not in data["timelines"]:
+                raise ValueError("Invalid API response format")
+
+            forecasts = []
+            for day in data["timelines"]["daily"]:
+                forecast = DailyWeather(
+                    time=day["time"],
+                    temperature_min=day["values"]["temperatureMin"],
+                    temperature_max=day["values"]["temperatureMax"],
+                    cloud_cover=day["values"]["cloudCoverAvg"],
+                    precipitation_probability=day["values"]["precipitationProbabilityAvg"],
+                    visibility=day["values"]["visibilityAvg"],
+                    sunrise_time=day["values"]["sunriseTime"],
+                    sunset_time=day["values"]["sunsetTime"],
+                    wind_speed=day["values"]["windSpeedAvg"],
+                    humidity=day["values"]["humidityAvg"],
+                )
+                forecasts.append(forecast)
+
+            return forecasts
+
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch weather forecast: {str(e)}")
+            raise RuntimeError(f"Failed to fetch weather forecast: {str(e)}") from e
+        except (KeyError, TypeError) as e:
+            logger.error(f"Invalid weather data received: {str(e)}")
+            raise ValueError(f"Invalid weather data received: {str(e)}") from e
+
+
+def _utc_timestamp(value: str) -> str:
+    """Open-Meteo's "2025-02-12" or "2025-02-12T06:59" in UTC, formatted like Tomorrow.io's timestamps"""
+    if "T" not in value:
+        value = f"{value}T00:00"
+    return f"{value}:00Z" if value.count(":") == 1 else f"{value}Z"
+
+
+class OpenMeteoWeatherProvider:
+    """Open-Meteo daily forecast; free and keyless"""
+
+    name = "open-meteo"
+
+    def forecast(self, latitude: float, longitude: float) -> List[DailyWeather]:
+        url = "https://api.open-meteo.com/v1/forecast"
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily": ",".join(OPEN_METEO_DAILY),
+            "wind_speed_unit": "ms",
+            "timezone": "UTC",
+            "forecast_days": 6,
+        }
+
+        try:
+            response = fetch("get_weather_forecast", url, params=params, stream=True)
+            response.raise_for_status()
+            data = decode_json(response, OPEN_METEO_PROJECTION)
+
+            if "daily" not in data:
+                raise ValueError("Invalid API response format")
+
+            daily: Any = data["daily"]
+            forecasts = []
+            for index, day in enumerate(daily["time"]):
+                forecast = DailyWeather(
+                    time=_utc_timestamp(day),
+                    temperature_min=daily["temperature_2m_min"][index],
+                    temperature_max=daily["temperature_2m_max"][index],
+                    cloud_cover=daily["cloud_cover_mean"][index],
+                    precipitation_probability=daily["precipitation_probability_mean"][index],
+                    # Open-Meteo reports visibility in metres, Tomorrow.io in kilometres
+                    visibility=daily["visibility_mean"][index] / 1000.0,
+                    sunrise_time=_utc_timestamp(daily["sunrise"][index]),
+                    sunset_time=_utc_timestamp(daily["sunset"][index]),
+                    wind_speed=daily["wind_speed_10m_mean"][index],
+                    humidity=daily["relative_humidity_2m_mean"][index],
+                )
+                forecasts.append(forecast)
+
+            return forecasts
+
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch weather forecast: {str(e)}")
+            raise RuntimeError(f"Failed to fetch weather forecast: {str(e)}") from e
+        except (KeyError, TypeError, IndexError) as e:
+            logger.error(f"Invalid weather data received: {str(e)}")
+            raise ValueError(f"Invalid weather data received: {str(e)}") from e
+
+
+# Select with SHUTTERSCOUT_WEATHER_PROVIDERS and SHUTTERSCOUT_WEATHER_POLICY
+weather_providers: ProviderRegistry[WeatherProvider] = ProviderRegistry(
+    "weather", [TomorrowWeatherProvider(), OpenMeteoWeatherProvider()], defaults=("tomorrow",)
+)
+
+
 @tool
 def get_weather_forecast(latitude: float, longitude: float) -> List[DailyWeather]:
     """
-    Retrieves a 2-day weather forecast for the specified location using Tomorrow.io API.
+    Retrieves a 2-day weather forecast for the specified location using Tomorrow.io API,
+    or the weather providers configured with SHUTTERSCOUT_WEATHER_PROVIDERS.
 
     Args:
         latitude: The latitude coordinate
@@ -38,42 +194,4 @@ def get_weather_forecast(latitude: float, longitude: float) -> List[DailyWeather
         RuntimeError: If the API request fails
         ValueError: If the API response is invalid or missing required data
     """
-    api_key = os.getenv("TOMORROW_API_KEY")
-    if not api_key:
-        raise ValueError("TOMORROW_API_KEY environment variable not set")
-
-    url = "https://api.tomorrow.io/v4/weather/forecast"
-    params = {"location": f"{latitude},{longitude}", "timesteps": "1d", "apikey": api_key}
-
-    try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-
-        if "timelines" not in data or "daily" not in data["timelines"]:
-            raise ValueError("Invalid API response format")
-
-        forecasts = []
-        for day in data["timelines"]["daily"]:
-            forecast = DailyWeather(
-                time=day["time"],
-                temperature_min=day["values"]["temperatureMin"],
-                temperature_max=day["values"]["temperatureMax"],
-                cloud_cover=day["values"]["cloudCoverAvg"],
-                precipitation_probability=day["values"]["precipitationProbabilityAvg"],
-                visibility=day["values"]["visibilityAvg"],
-                sunrise_time=day["values"]["sunriseTime"],
-                sunset_time=day["values"]["sunsetTime"],
-                wind_speed=day["values"]["windSpeedAvg"],
-                humidity=day["values"]["humidityAvg"],
-            )
-            forecasts.append(forecast)
-
-        return forecasts
-
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch weather forecast: {str(e)}")
-        raise RuntimeError(f"Failed to fetch weather forecast: {str(e)}") from e
-    except (KeyError, TypeError) as e:
-        logger.error(f"Invalid weather data received: {str(e)}")
-        raise ValueError(f"Invalid weather data received: {str(e)}") from e
+    return weather_providers.call(lambda provider: provider.forecast(latitude, longitude))
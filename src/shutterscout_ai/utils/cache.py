@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from shutterscout_ai.utils.instrumentation import CACHE_HITS_TOTAL, CACHE_MISSES_TOTAL, increment
+
+T = TypeVar("T")
+
+
+class TTLCache(Generic[T]):
+    """
+    Thread-safe in-memory cache with a per-entry time to live and least-recently-used eviction.
+    Hits and misses are counted in the cache metrics under the cache's name.
+    """
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 1024, clock: Callable[[], float] = time.monotonic) -> None:
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[T]:
+        """Return the cached value, or None when it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                increment(CACHE_HITS_TOTAL, cache=self.name)
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        increment(CACHE_MISSES_TOTAL, cache=self.name)
+        return None
+
+    def set(self, key: Hashable, value: T, ttl: Optional[float] = None) -> None:
+        """Store a value; a ttl of zero or less is not cached at all"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self.clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Return the cached value or compute, store and return it. Failures are not cached."""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def expires_at(self, key: Hashable) -> Optional[float]:
+        """Clock time at which the entry expires, or None when it is not cached"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
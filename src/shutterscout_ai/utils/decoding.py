@@ -0,0 +1,165 @@
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import requests
+from loguru import logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ijson
+
+    # The pure-python ijson backend is slower than a full json.loads, so only stream with a C backend
+    if ijson.backend not in ("yajl2_c", "yajl2_cffi"):
+        ijson = None
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+ITEMS = "[]"
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def compile_tree(tree: Dict[str, Any]) -> Callable[[Any], Any]:
+    """Turn a projection tree into a function, so the tree is walked once instead of per document"""
+    if not tree:
+        return _identity
+    if ITEMS in tree:
+        project_item = compile_tree(tree[ITEMS])
+
+        def project_list(value: Any) -> Any:
+            return [project_item(item) for item in value] if type(value) is list else value
+
+        return project_list
+
+    leaves = tuple(key for key, subtree in tree.items() if not subtree)
+    branches = tuple((key, compile_tree(subtree)) for key, subtree in tree.items() if subtree)
+
+    def project_dict(value: Any) -> Any:
+        if type(value) is not dict:
+            return value
+        result = {key: value[key] for key in leaves if key in value}
+        for key, project_child in branches:
+            if key in value:
+                result[key] = project_child(value[key])
+        return result
+
+    return project_dict
+
+
+class Projection:
+    """
+    The subset of a JSON document a caller needs, given as dotted paths.
+    A "[]" segment descends into every element of an array, e.g. "timelines.daily[].values.temperatureMin".
+
+    Projected documents keep the original nesting but only the requested keys, so code that indexes
+    the full document keeps working, and a missing key is still missing after projection.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths: Tuple[str, ...] = tuple(paths)
+        self.tree: Dict[str, Any] = {}
+        for path in self.paths:
+            node = self.tree
+            for segment in path.replace(ITEMS, "." + ITEMS).split("."):
+                node = node.setdefault(segment, {})
+        self.apply = compile_tree(self.tree)
+
+    def stream_prefix(self) -> Optional[str]:
+        """
+        The ijson prefix of the single array this projection reads from, if every path goes through it.
+        Only such projections can be decoded incrementally item by item.
+        """
+        prefix, node = [], self.tree
+        while len(node) == 1:
+            segment, child = next(iter(node.items()))
+            if segment == ITEMS:
+                return ".".join(prefix) if prefix else None
+            prefix.append(segment)
+            node = child
+        return None
+
+    def item_projector(self, array_path: str) -> Callable[[Any], Any]:
+        """Projection applied to each element of the array at array_path"""
+        node = self.tree
+        for segment in array_path.split("."):
+            node = node[segment]
+        return compile_tree(node[ITEMS])
+
+
+def project(value: Any, tree: Dict[str, Any]) -> Any:
+    """Apply a projection tree to a parsed JSON value"""
+    return compile_tree(tree)(value)
+
+
+def json_backend() -> str:
+    """Name of the JSON parser in use; SHUTTERSCOUT_JSON_BACKEND=json forces the standard library"""
+    requested = os.getenv("SHUTTERSCOUT_JSON_BACKEND", "").lower()
+    if requested == "json" or orjson is None:
+        return "json"
+    return "orjson"
+
+
+def loads(data: bytes) -> Any:
+    """Parse a JSON body with the fastest available backend"""
+    if json_backend() == "orjson":
+        return orjson.loads(data)
+    # json.loads on bytes decodes with surrogatepass, which is markedly slower than a plain utf-8 decode
+    return json.loads(data.decode("utf-8"))
+
+
+def _stream_items(raw, array_path: str, project_item: Callable[[Any], Any]) -> list:
+    """Incrementally parse only the elements of one array, projecting each as soon as it completes"""
+    return [project_item(item) for item in ijson.items(raw, f"{array_path}.item", use_float=True)]
+
+
+def _nest(path: str, value: Any) -> Dict[str, Any]:
+    document = value
+    for segment in reversed(path.split(".")):
+        document = {segment: document}
+    return document
+
+
+def decode_json(response: requests.Response, projection: Optional[Projection] = None) -> Any:
+    """
+    Decode a provider response, keeping only the fields named by the projection.
+
+    Streamed responses (requests.get(..., stream=True)) whose projection reads a single array are parsed
+    incrementally when ijson with a C backend is installed, so the full document is never held in memory.
+    Otherwise the body is parsed in one go with orjson when installed (or the json module) and projected.
+    Responses without a byte body, such as test doubles, fall back to response.json().
+
+    Raises:
+        ValueError: If the body is not valid JSON
+    """
+    if projection is not None and ijson is not None and getattr(response, "_content_consumed", True) is False:
+        prefix = projection.stream_prefix()
+        if prefix is not None:
+            raw = response.raw
+            raw.decode_content = True
+            try:
+                items = _stream_items(raw, prefix, projection.item_projector(prefix))
+            except ijson.JSONError as e:
+                raise ValueError(f"Invalid JSON in response: {str(e)}") from e
+            finally:
+                response.close()
+            # An empty array cannot be told apart from a missing one while streaming; both decode as missing
+            return _nest(prefix, items) if items else {}
+
+    content = response.content
+    if isinstance(content, (bytes, bytearray)):
+        try:
+            document = loads(content)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON in response: {str(e)}") from e
+    else:
+        logger.debug("Response has no byte body, falling back to response.json()")
+        document = response.json()
+
+    return projection.apply(document) if projection is not None else document
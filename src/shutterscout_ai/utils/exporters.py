@@ -0,0 +1,212 @@
+import json
+import math
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from shutterscout_ai.utils.instrumentation import Labels, MetricsRegistry, Span, metrics
+
+SERVICE_NAME = "shutterscout-ai"
+
+
+def _format_labels(labels: Labels, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(labels) + sorted((extra or {}).items())
+    if not pairs:
+        return ""
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for key, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_prometheus(registry: MetricsRegistry = metrics) -> str:
+    """Render all counters and histograms in the Prometheus text exposition format"""
+    counters, histograms = registry.snapshot()
+    lines: List[str] = []
+
+    for name in sorted(counters):
+        if name in registry.descriptions:
+            lines.append(f"# HELP {name} {registry.descriptions[name]}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in sorted(counters[name].items()):
+            lines.append(f"{name}{_format_labels(labels)} {_format_number(value)}")
+
+    for name in sorted(histograms):
+        if name in registry.descriptions:
+            lines.append(f"# HELP {name} {registry.descriptions[name]}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in sorted(histograms[name].items()):
+            bounds = list(histogram.buckets) + [math.inf]
+            for bound, cumulative in zip(bounds, histogram.cumulative()):
+                bucket_labels = _format_labels(labels, {"le": _format_number(bound)})
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_number(histogram.total)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _otel_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otel_attributes(items: Any) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otel_value(value)} for key, value in items]
+
+
+def _nanos(seconds: float) -> str:
+    return str(int(seconds * 1_000_000_000))
+
+
+class OTelExporter:
+    """
+    Collects finished spans and renders spans and metrics as OTLP/JSON documents,
+    which any OpenTelemetry collector with the otlphttp/json receiver accepts.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans: Deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export_span(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def drain(self) -> List[Span]:
+        with self._lock:
+            spans = list(self._spans)
+            self._spans.clear()
+        return spans
+
+    def render_spans(self, spans: Optional[List[Span]] = None) -> Dict[str, Any]:
+        spans = self.drain() if spans is None else spans
+        otlp_spans = []
+        for span in spans:
+            entry = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": _nanos(span.start_time),
+                "endTimeUnixNano": _nanos(span.end_time or span.start_time),
+                "attributes": _otel_attributes(span.attributes.items()),
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            }
+            if span.parent_id:
+                entry["parentSpanId"] = span.parent_id
+            otlp_spans.append(entry)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otel_attributes([("service.name", SERVICE_NAME)])},
+                    "scopeSpans": [{"scope": {"name": "shutterscout_ai"}, "spans": otlp_spans}],
+                }
+            ]
+        }
+
+    def render_metrics(self, registry: MetricsRegistry = metrics, timestamp: float = 0.0) -> Dict[str, Any]:
+        counters, histograms = registry.snapshot()
+        time_nanos = _nanos(timestamp)
+        otlp_metrics = []
+        for name, series in sorted(counters.items()):
+            otlp_metrics.append(
+                {
+                    "name": name,
+                    "description": registry.descriptions.get(name, ""),
+                    "sum": {
+                        "aggregationTemporality": 2,
+                        "isMonotonic": True,
+                        "dataPoints": [
+                            {"attributes": _otel_attributes(labels), "asDouble": value, "timeUnixNano": time_nanos}
+                            for labels, value in sorted(series.items())
+                        ],
+                    },
+                }
+            )
+        for name, series in sorted(histograms.items()):
+            otlp_metrics.append(
+                {
+                    "name": name,
+                    "description": registry.descriptions.get(name, ""),
+                    "histogram": {
+                        "aggregationTemporality": 2,
+                        "dataPoints": [
+                            {
+                                "attributes": _otel_attributes(labels),
+                                "count": str(histogram.count),
+                                "sum": histogram.total,
+                                "bucketCounts": [str(count) for count in histogram.counts],
+                                "explicitBounds": list(histogram.buckets),
+                                "timeUnixNano": time_nanos,
+                            }
+                            for labels, histogram in sorted(series.items())
+                        ],
+                    },
+                }
+            )
+        return {
+            "resourceMetrics": [
+                {
+                    "resource": {"attributes": _otel_attributes([("service.name", SERVICE_NAME)])},
+                    "scopeMetrics": [{"scope": {"name": "shutterscout_ai"}, "metrics": otlp_metrics}],
+                }
+            ]
+        }
+
+
+class JsonLogExporter:
+    """Logs every finished span as a single JSON line through loguru"""
+
+    def __init__(self, level: str = "DEBUG"):
+        self.level = level
+
+    def export_span(self, span: Span) -> None:
+        record = {
+            "span": span.name,
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "duration_ms": round(span.duration_ms, 3),
+            "attributes": span.attributes,
+        }
+        if span.error:
+            record["error"] = span.error
+        logger.log(self.level, json.dumps(record, default=str))
+
+
+def render_json(registry: MetricsRegistry = metrics) -> Dict[str, Any]:
+    """Plain JSON snapshot of all metrics, convenient for logs and ad-hoc inspection"""
+    counters, histograms = registry.snapshot()
+    return {
+        "counters": {
+            name: [{"labels": dict(labels), "value": value} for labels, value in sorted(series.items())]
+            for name, series in sorted(counters.items())
+        },
+        "histograms": {
+            name: [
+                {
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.total,
+                    "buckets": dict(zip([str(b) for b in histogram.buckets] + ["+Inf"], histogram.cumulative())),
+                }
+                for labels, histogram in sorted(series.items())
+            ]
+            for name, series in sorted(histograms.items())
+        },
+    }
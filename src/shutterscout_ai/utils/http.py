@@ -0,0 +1,52 @@
+import time
+from typing import Any
+
+import requests
+
+from shutterscout_ai.utils.instrumentation import (
+    BYTES_BUCKETS,
+    HTTP_REQUEST_DURATION_MS,
+    HTTP_REQUESTS_TOTAL,
+    HTTP_RESPONSE_BYTES,
+    increment,
+    observe,
+    span,
+)
+
+
+def _payload_size(response: requests.Response) -> int:
+    # Never read the body here, so streamed responses are left untouched for the decoder
+    content = getattr(response, "_content", None)
+    if isinstance(content, (bytes, bytearray)):
+        return len(content)
+    length = response.headers.get("Content-Length") if hasattr(response, "headers") else None
+    return int(length) if isinstance(length, str) and length.isdigit() else 0
+
+
+def fetch(tool: str, url: str, **kwargs: Any) -> requests.Response:
+    """
+    Perform an outbound GET for a tool, recording latency, payload size and outcome per tool.
+    Arguments are passed to requests.get unchanged.
+
+    Args:
+        tool: Name of the tool making the request, used as the metric label
+        url: Request URL
+    """
+    with span("http.get", tool=tool) as current:
+        start = time.perf_counter()
+        try:
+            response = requests.get(url, **kwargs)
+        except Exception:
+            increment(HTTP_REQUESTS_TOTAL, tool=tool, outcome="error")
+            raise
+        finally:
+            observe(HTTP_REQUEST_DURATION_MS, (time.perf_counter() - start) * 1000.0, tool=tool)
+
+        status = getattr(response, "status_code", None)
+        size = _payload_size(response)
+        increment(HTTP_REQUESTS_TOTAL, tool=tool, outcome=str(status) if isinstance(status, int) else "unknown")
+        observe(HTTP_RESPONSE_BYTES, size, BYTES_BUCKETS, tool=tool)
+        if current is not None:
+            current.attributes["http.status_code"] = status if isinstance(status, int) else 0
+            current.attributes["http.response_bytes"] = size
+        return response
@@ -0,0 +1,281 @@
+import bisect
+import contextvars
+import os
+import random
+import threading
+import time
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Tuple
+
+# Default histogram bucket upper bounds
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+BYTES_BUCKETS: Tuple[float, ...] = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Metric names shared across modules
+SPAN_DURATION_MS = "shutterscout_span_duration_ms"
+HTTP_REQUESTS_TOTAL = "shutterscout_http_requests_total"
+HTTP_REQUEST_DURATION_MS = "shutterscout_http_request_duration_ms"
+HTTP_RESPONSE_BYTES = "shutterscout_http_response_bytes"
+CACHE_HITS_TOTAL = "shutterscout_cache_hits_total"
+CACHE_MISSES_TOTAL = "shutterscout_cache_misses_total"
+PROVIDER_CALLS_TOTAL = "shutterscout_provider_calls_total"
+PROVIDER_LATENCY_MS = "shutterscout_provider_latency_ms"
+PROVIDER_RETRIES_TOTAL = "shutterscout_provider_retries_total"
+REPORT_SECTION_LATENCY_MS = "shutterscout_report_section_latency_ms"
+REPORT_SECTION_TOKENS_TOTAL = "shutterscout_report_section_tokens_total"
+BATCH_JOBS_TOTAL = "shutterscout_batch_jobs_total"
+BATCH_JOB_DURATION_MS = "shutterscout_batch_job_duration_ms"
+BATCH_IN_FLIGHT = "shutterscout_batch_in_flight"
+PREFETCH_REFRESHES_TOTAL = "shutterscout_prefetch_refreshes_total"
+PREFETCH_BUDGET_REMAINING = "shutterscout_prefetch_budget_remaining"
+WATCH_LOCATIONS_TOTAL = "shutterscout_watch_locations_total"
+WATCH_ALERTS_TOTAL = "shutterscout_watch_alerts_total"
+WATCH_CYCLE_DURATION_MS = "shutterscout_watch_cycle_duration_ms"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+@dataclass
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense"""
+
+    buckets: Tuple[float, ...]
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            # One slot per bound plus the +Inf overflow slot
+            self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self) -> List[int]:
+        running, result = 0, []
+        for bucket_count in self.counts:
+            running += bucket_count
+            result.append(running)
+        return result
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters and histograms"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.descriptions: Dict[str, str] = {}
+
+    def describe(self, name: str, description: str) -> None:
+        self.descriptions[name] = description
+
+    def increment(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets=buckets)
+            histogram.observe(value)
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        with self._lock:
+            return self.counters.get(name, {}).get(_labels(labels), 0.0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        with self._lock:
+            return self.histograms.get(name, {}).get(_labels(labels))
+
+    def snapshot(self) -> Tuple[Dict[str, Dict[Labels, float]], Dict[str, Dict[Labels, Histogram]]]:
+        """Copy of all series, safe to read while other threads keep recording"""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self.counters.items()}
+            histograms = {
+                name: {
+                    key: Histogram(buckets=h.buckets, counts=list(h.counts), total=h.total, count=h.count)
+                    for key, h in series.items()
+                }
+                for name, series in self.histograms.items()
+            }
+        return counters, histograms
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+@dataclass
+class Span:
+    """A finished or in-flight unit of work"""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time if self.end_time is not None else time.time()
+        return (end - self.start_time) * 1000.0
+
+
+class SpanExporter(Protocol):
+    """Receives every finished span"""
+
+    def export_span(self, span: Span) -> None: ...
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("shutterscout_span", default=None)
+
+metrics = MetricsRegistry()
+_span_exporters: List[SpanExporter] = []
+_enabled = os.getenv("SHUTTERSCOUT_INSTRUMENTATION", "1").lower() not in ("0", "false", "off")
+
+metrics.describe(SPAN_DURATION_MS, "Duration of traced spans in milliseconds")
+metrics.describe(HTTP_REQUESTS_TOTAL, "Outbound provider HTTP requests")
+metrics.describe(HTTP_REQUEST_DURATION_MS, "Outbound provider HTTP request latency in milliseconds")
+metrics.describe(HTTP_RESPONSE_BYTES, "Outbound provider HTTP response payload size in bytes")
+metrics.describe(CACHE_HITS_TOTAL, "Cache lookups answered from the cache")
+metrics.describe(CACHE_MISSES_TOTAL, "Cache lookups that had to fetch")
+metrics.describe(PROVIDER_CALLS_TOTAL, "Data provider calls by kind, provider and outcome (ok, invalid, error)")
+metrics.describe(PROVIDER_LATENCY_MS, "Data provider call latency in milliseconds, including decoding")
+metrics.describe(
+    PROVIDER_RETRIES_TOTAL, "Requests retried with the next providers after a provider failed or gave no usable answer"
+)
+metrics.describe(REPORT_SECTION_LATENCY_MS, "Generation time of one report section in milliseconds")
+metrics.describe(REPORT_SECTION_TOKENS_TOTAL, "Model tokens per report section and direction (input, output)")
+metrics.describe(BATCH_JOBS_TOTAL, "Finished batch scouting jobs by outcome")
+metrics.describe(BATCH_JOB_DURATION_MS, "Batch scouting job run time in milliseconds, measured in the worker")
+metrics.describe(BATCH_IN_FLIGHT, "Batch jobs handed to workers and not yet finished, sampled at every dispatch")
+metrics.describe(PREFETCH_REFRESHES_TOTAL, "Combined data refreshes by reason (miss, hot, sunrise, saved) and outcome")
+metrics.describe(PREFETCH_BUDGET_REMAINING, "Provider calls left in the prefetch budget, sampled before each refresh")
+metrics.describe(WATCH_LOCATIONS_TOTAL, "Watched locations per cycle by outcome (added, changed, unchanged, failed)")
+metrics.describe(WATCH_ALERTS_TOTAL, "Good-conditions alerts emitted by watch mode")
+metrics.describe(WATCH_CYCLE_DURATION_MS, "Duration of one watch cycle in milliseconds")
+
+
+def _new_id(bits: int) -> str:
+    # Non-cryptographic ids are fine for tracing and far cheaper than os.urandom per span
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turn span and metric recording on or off process-wide"""
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def add_span_exporter(exporter: SpanExporter) -> None:
+    _span_exporters.append(exporter)
+
+
+def remove_span_exporter(exporter: SpanExporter) -> None:
+    if exporter in _span_exporters:
+        _span_exporters.remove(exporter)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _finish(span: Span) -> None:
+    metrics.observe(SPAN_DURATION_MS, span.duration_ms, span=span.name)
+    for exporter in list(_span_exporters):
+        exporter.export_span(span)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Trace a block of work. Nested spans share a trace id and record their parent.
+    Yields None when instrumentation is disabled, so callers must not rely on the span object.
+    """
+    if not _enabled:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else _new_id(128),
+        span_id=_new_id(64),
+        parent_id=parent.span_id if parent else None,
+        start_time=time.time(),
+        attributes=attributes,
+    )
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_time = time.time()
+        _finish(current)
+
+
+def record_span(name: str, start_time: float, end_time: float, error: Optional[str] = None, **attributes: Any) -> None:
+    """Record a span for work that was timed elsewhere, e.g. an agent step reported by a callback"""
+    if not _enabled:
+        return
+    parent = _current_span.get()
+    _finish(
+        Span(
+            name=name,
+            trace_id=parent.trace_id if parent else _new_id(128),
+            span_id=_new_id(64),
+            parent_id=parent.span_id if parent else None,
+            start_time=start_time,
+            end_time=end_time,
+            attributes=attributes,
+            error=error,
+        )
+    )
+
+
+def increment(name: str, amount: float = 1.0, **labels: Any) -> None:
+    if _enabled:
+        metrics.increment(name, amount, **labels)
+
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS, **labels: Any) -> None:
+    if _enabled:
+        metrics.observe(name, value, buckets, **labels)
+
+
+def _call_in_span(name: str, fn: Callable[..., Any], args: Tuple, kwargs: Dict[str, Any]) -> Any:
+    with span(name):
+        return fn(*args, **kwargs)
+
+
+def submit_traced(executor: Executor, name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Submit fn to an executor inside a span that is parented to the caller's current span"""
+    context = contextvars.copy_context()
+    return executor.submit(context.run, _call_in_span, name, fn, args, kwargs)
@@ -0,0 +1,212 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
+
+from loguru import logger
+
+from shutterscout_ai.utils.instrumentation import (
+    HTTP_REQUEST_DURATION_MS,
+    HTTP_RESPONSE_BYTES,
+    metrics,
+)
+
+PROFILE_MODES = ("cprofile", "sampling", "memory")
+
+
+class RequestAttribution(TypedDict):
+    """Outbound requests made by one tool during a profiled run"""
+
+    tool: str
+    requests: int
+    total_ms: float
+    bytes: int
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler. A background thread snapshots the stacks of all other threads
+    at a fixed interval, so time spent waiting on the network shows up just like CPU time.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="shutterscout-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        """Collapsed stacks, one 'frame;frame;frame count' line each, for flamegraph.pl, speedscope or inferno"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def hotspots(self, limit: int = 15) -> List[Tuple[str, int]]:
+        """Leaf frames ranked by the number of samples they were on top of the stack"""
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+
+def _request_totals() -> Dict[str, Tuple[int, float, int]]:
+    _, histograms = metrics.snapshot()
+    totals: Dict[str, Tuple[int, float, int]] = {}
+    for labels, histogram in histograms.get(HTTP_REQUEST_DURATION_MS, {}).items():
+        tool = dict(labels).get("tool", "unknown")
+        totals[tool] = (histogram.count, histogram.total, 0)
+    for labels, histogram in histograms.get(HTTP_RESPONSE_BYTES, {}).items():
+        tool = dict(labels).get("tool", "unknown")
+        count, total_ms, _ = totals.get(tool, (0, 0.0, 0))
+        totals[tool] = (count, total_ms, int(histogram.total))
+    return totals
+
+
+class ProfileSession:
+    """
+    Context manager that runs any combination of cProfile, the sampling profiler and tracemalloc
+    around a block, then writes the raw profiles plus a hotspot summary to an output directory.
+    cProfile only sees the calling thread; use sampling mode to cover the combiner's worker threads.
+
+    Files written (depending on modes):
+        cprofile.prof     - pstats dump, loadable by snakeviz or `python -m pstats`
+        sampling.folded   - collapsed stacks for flame graph tools
+        memory.txt        - top allocation sites by size
+        summary.txt       - hotspots from every mode and per-tool request attribution
+    """
+
+    def __init__(self, modes: Sequence[str], output_dir: str = "profile", interval: float = 0.005, top: int = 15):
+        unknown = set(modes) - set(PROFILE_MODES)
+        if unknown:
+            raise ValueError(f"Unknown profile modes: {', '.join(sorted(unknown))}")
+        self.modes = list(dict.fromkeys(modes))
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top = top
+        self.wall_seconds = 0.0
+        self.summary = ""
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[SamplingProfiler] = None
+        self._requests_before: Dict[str, Tuple[int, float, int]] = {}
+        self._started_tracemalloc = False
+        self._start = 0.0
+
+    def __enter__(self) -> "ProfileSession":
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._requests_before = _request_totals()
+        if "memory" in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+            self._started_tracemalloc = True
+        if "sampling" in self.modes:
+            self._sampler = SamplingProfiler(interval=self.interval)
+            self._sampler.start()
+        if "cprofile" in self.modes:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall_seconds = time.perf_counter() - self._start
+        sections = [f"Profiled wall time: {self.wall_seconds:.3f}s (modes: {', '.join(self.modes)})"]
+
+        if self._profiler is not None:
+            self._profiler.disable()
+            sections.append(self._write_cprofile())
+        if self._sampler is not None:
+            self._sampler.stop()
+            sections.append(self._write_sampling())
+        if "memory" in self.modes and tracemalloc.is_tracing():
+            sections.append(self._write_memory())
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+
+        sections.append(self._format_requests())
+        self.summary = "\n\n".join(sections) + "\n"
+        with open(os.path.join(self.output_dir, "summary.txt"), "w") as f:
+            f.write(self.summary)
+        logger.info(f"Profile written to {self.output_dir}\n{self.summary}")
+
+    def _write_cprofile(self) -> str:
+        self._profiler.dump_stats(os.path.join(self.output_dir, "cprofile.prof"))
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+        return "== cProfile (cumulative) ==\n" + stream.getvalue().strip()
+
+    def _write_sampling(self) -> str:
+        with open(os.path.join(self.output_dir, "sampling.folded"), "w") as f:
+            f.write(self._sampler.folded())
+        lines = [f"== Sampling ({self._sampler.samples} samples every {self.interval * 1000:.1f}ms) =="]
+        total = max(1, sum(self._sampler.stacks.values()))
+        for frame, count in self._sampler.hotspots(self.top):
+            lines.append(f"{count / total * 100:6.1f}%  {frame}")
+        return "\n".join(lines)
+
+    def _write_memory(self) -> str:
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        top_stats = snapshot.statistics("lineno")[: self.top]
+        lines = [f"== Memory (peak {peak / 1024:.1f} KiB) =="]
+        lines.extend(str(stat) for stat in top_stats)
+        with open(os.path.join(self.output_dir, "memory.txt"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return "\n".join(lines)
+
+    def request_attribution(self) -> List[RequestAttribution]:
+        """Requests made per tool since the session started"""
+        attribution: List[RequestAttribution] = []
+        for tool, (count, total_ms, size) in sorted(_request_totals().items()):
+            before_count, before_ms, before_size = self._requests_before.get(tool, (0, 0.0, 0))
+            if count - before_count > 0:
+                attribution.append(
+                    {
+                        "tool": tool,
+                        "requests": count - before_count,
+                        "total_ms": total_ms - before_ms,
+                        "bytes": size - before_size,
+                    }
+                )
+        return attribution
+
+    def _format_requests(self) -> str:
+        lines = ["== Outbound requests by tool =="]
+        attribution = self.request_attribution()
+        if not attribution:
+            lines.append("(none recorded)")
+        for entry in sorted(attribution, key=lambda item: item["total_ms"], reverse=True):
+            lines.append(
+                f"{entry['tool']:<28} {entry['requests']:>4} req  {entry['total_ms']:>10.1f} ms  {entry['bytes']:>10} B"
+            )
+        return "\n".join(lines)
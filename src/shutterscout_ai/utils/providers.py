@@ -0,0 +1,206 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Generic, List, Optional, Protocol, Sequence, Tuple, TypeVar
+
+from loguru import logger
+
+from shutterscout_ai.utils.instrumentation import (
+    PROVIDER_CALLS_TOTAL,
+    PROVIDER_LATENCY_MS,
+    PROVIDER_RETRIES_TOTAL,
+    increment,
+    observe,
+    span,
+)
+
+POLICIES = ("failover", "race")
+# Weight of the newest sample in the moving latency average
+EWMA_ALPHA = 0.3
+# Expected cost of a failed call in milliseconds, so providers that fail fast (e.g. a missing API key) still sink
+FAILURE_PENALTY_MS = 2000.0
+
+
+class Provider(Protocol):
+    """Anything with a unique name; each data kind adds its own fetch method on top"""
+
+    name: str
+
+
+P = TypeVar("P", bound=Provider)
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Exponentially weighted latency and failure rate per provider"""
+
+    def __init__(self, alpha: float = EWMA_ALPHA):
+        self.alpha = alpha
+        self._latency_ms: Dict[str, float] = {}
+        self._failure_rate: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            failure = 0.0 if ok else 1.0
+            if provider not in self._latency_ms:
+                self._latency_ms[provider] = latency_ms
+                self._failure_rate[provider] = failure
+                return
+            if ok:
+                self._latency_ms[provider] += self.alpha * (latency_ms - self._latency_ms[provider])
+            self._failure_rate[provider] += self.alpha * (failure - self._failure_rate[provider])
+
+    def score(self, provider: str) -> float:
+        """Expected cost of calling a provider; providers never measured score 0 so they get tried"""
+        with self._lock:
+            return self._latency_ms.get(provider, 0.0) + FAILURE_PENALTY_MS * self._failure_rate.get(provider, 0.0)
+
+    def snapshot(self) -> Dict[str, Tuple[float, float]]:
+        """(average latency in ms, failure rate) per measured provider"""
+        with self._lock:
+            return {name: (self._latency_ms[name], self._failure_rate[name]) for name in self._latency_ms}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency_ms.clear()
+            self._failure_rate.clear()
+
+
+# Shared by all registries; losing racers keep running here after the winner has returned
+_race_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="shutterscout-race")
+
+
+class ProviderRegistry(Generic[P]):
+    """
+    The providers for one kind of data and the policy for choosing between them.
+
+    Enabled providers and their configured order come from SHUTTERSCOUT_<KIND>_PROVIDERS (comma separated
+    names, default: the registry's defaults); SHUTTERSCOUT_<KIND>_POLICY picks the policy:
+
+        failover - call providers one at a time, fastest first, until one gives a valid answer
+        race     - call the two fastest at once and take the first valid answer, then fail over to the rest
+
+    "Fastest" is learned from the latency and failure rate of earlier calls; providers not measured yet
+    come first in their configured order.
+    """
+
+    def __init__(self, kind: str, providers: Sequence[P] = (), defaults: Sequence[str] = (), race_width: int = 2):
+        self.kind = kind
+        self.race_width = race_width
+        self.tracker = LatencyTracker()
+        self._providers: Dict[str, P] = {}
+        self._defaults = tuple(defaults)
+        for provider in providers:
+            self.register(provider)
+
+    def register(self, provider: P) -> None:
+        if provider.name in self._providers:
+            raise ValueError(f"{self.kind} provider {provider.name!r} is already registered")
+        self._providers[provider.name] = provider
+
+    def unregister(self, name: str) -> None:
+        self._providers.pop(name, None)
+
+    def names(self) -> List[str]:
+        return list(self._providers)
+
+    def _env(self, setting: str) -> str:
+        return os.getenv(f"SHUTTERSCOUT_{self.kind.upper()}_{setting}", "").strip()
+
+    def enabled(self) -> List[P]:
+        """Enabled providers in configured order"""
+        configured = self._env("PROVIDERS")
+        names = [name.strip() for name in configured.split(",") if name.strip()] if configured else self._defaults
+        if not names:
+            names = tuple(self._providers)
+        unknown = [name for name in names if name not in self._providers]
+        if unknown:
+            raise ValueError(f"Unknown {self.kind} providers: {', '.join(unknown)}")
+        return [self._providers[name] for name in names]
+
+    def policy(self) -> str:
+        policy = self._env("POLICY") or "failover"
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown {self.kind} provider policy {policy!r}, expected one of {', '.join(POLICIES)}")
+        return policy
+
+    def ordered(self) -> List[P]:
+        """Enabled providers, best expected latency first; sorting is stable so ties keep configured order"""
+        return sorted(self.enabled(), key=lambda provider: self.tracker.score(provider.name))
+
+    def _timed(self, provider: P, call: Callable[[P], T], valid: Callable[[T], bool]) -> T:
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            with span("provider.call", kind=self.kind, provider=provider.name):
+                result = call(provider)
+            outcome = "ok" if valid(result) else "invalid"
+            return result
+        finally:
+            latency_ms = (time.perf_counter() - start) * 1000.0
+            self.tracker.record(provider.name, latency_ms, outcome == "ok")
+            observe(PROVIDER_LATENCY_MS, latency_ms, kind=self.kind, provider=provider.name)
+            increment(PROVIDER_CALLS_TOTAL, kind=self.kind, provider=provider.name, outcome=outcome)
+
+    def call(self, call: Callable[[P], T], valid: Callable[[T], bool] = bool) -> T:
+        """
+        Get an answer from the providers according to the policy.
+
+        Args:
+            call: Fetches the data from one provider
+            valid: Whether an answer is usable; when no answer is, the first answer received is returned
+
+        Raises:
+            Exception: The last provider's exception, unchanged, when every provider failed
+        """
+        providers = self.ordered()
+        width = self.race_width if self.policy() == "race" else 1
+        invalid: List[T] = []
+        last_error: Optional[BaseException] = None
+
+        for offset in range(0, len(providers), width):
+            group = providers[offset : offset + width]
+            if offset:
+                # Only reached when every provider before this group failed or gave no usable answer
+                increment(PROVIDER_RETRIES_TOTAL, kind=self.kind)
+            if len(group) == 1:
+                try:
+                    result = self._timed(group[0], call, valid)
+                except Exception as e:
+                    logger.warning(f"{self.kind} provider {group[0].name} failed: {str(e)}")
+                    last_error = e
+                    continue
+                if valid(result):
+                    return result
+                invalid.append(result)
+                continue
+
+            pending: Dict[Future, P] = {
+                # Copy the context so provider spans nest under the caller's span
+                _race_executor.submit(contextvars.copy_context().run, self._timed, provider, call, valid): provider
+                for provider in group
+            }
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning(f"{self.kind} provider {provider.name} failed: {str(e)}")
+                        last_error = e
+                        continue
+                    if valid(result):
+                        if pending:
+                            logger.debug(f"{self.kind} provider {provider.name} won the race")
+                        return result
+                    invalid.append(result)
+
+        if invalid:
+            return invalid[0]
+        if last_error is None:
+            raise RuntimeError(f"No {self.kind} providers enabled")
+        raise last_error
@@ -0,0 +1,297 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Literal, NotRequired, Optional, Sequence, TypedDict
+
+from loguru import logger
+from smolagents import Model
+
+from shutterscout_ai.batch.jobs import JobSpec, job_key
+from shutterscout_ai.core.shutterscout_agent import get_location_recommendations
+from shutterscout_ai.tools.combined import codec
+from shutterscout_ai.tools.combined.combiner import CombinedData, get_combined_data
+from shutterscout_ai.tools.itinerary.itinerary import DayPlan, light_factor, plan_day
+from shutterscout_ai.tools.weather.weather import DailyWeather, get_weather_forecast
+from shutterscout_ai.utils.instrumentation import (
+    WATCH_ALERTS_TOTAL,
+    WATCH_CYCLE_DURATION_MS,
+    WATCH_LOCATIONS_TOTAL,
+    increment,
+    observe,
+    span,
+    submit_traced,
+)
+
+# Index of tomorrow in the daily forecast, the day watched for good conditions
+WATCH_DAY = 1
+# Light score (see light_factor) from which tomorrow counts as good
+DEFAULT_THRESHOLD = 0.75
+# Forecast changes within these margins are noise and do not trigger a rescore
+TOLERANCES = {
+    "temperature_min": 1.0,
+    "temperature_max": 1.0,
+    "cloud_cover": 5.0,
+    "precipitation_probability": 5.0,
+    "visibility": 1.0,
+    "wind_speed": 1.0,
+    "humidity": 5.0,
+}
+
+
+class WatchedLocation(TypedDict):
+    """What is kept between cycles for one location"""
+
+    spec: JobSpec
+    combined: CombinedData
+    score: float
+
+
+class WatchAlert(TypedDict):
+    time: str
+    place_name: str
+    latitude: float
+    longitude: float
+    date: str
+    score: float
+    previous_score: Optional[float]
+    conditions: DailyWeather
+    itinerary: NotRequired[DayPlan]
+    recommendations: NotRequired[str]
+
+
+class CycleStats(TypedDict):
+    """Summary of one watch cycle"""
+
+    polled: int
+    added: int
+    changed: int
+    alerts: int
+    failed: int
+    elapsed_ms: float
+
+
+def watch_score(weather: List[DailyWeather]) -> float:
+    """How good tomorrow's light looks, from 0 to 1"""
+    return light_factor(weather[WATCH_DAY])
+
+
+def weather_changed(previous: List[DailyWeather], current: List[DailyWeather]) -> bool:
+    """Whether tomorrow's forecast moved beyond the tolerances, or tomorrow is a different day by now"""
+    if len(previous) <= WATCH_DAY or len(current) <= WATCH_DAY:
+        return len(previous) != len(current)
+    before, after = previous[WATCH_DAY], current[WATCH_DAY]
+    if any(before[key] != after[key] for key in ("time", "sunrise_time", "sunset_time")):
+        return True
+    return any(abs(after[key] - before[key]) > tolerance for key, tolerance in TOLERANCES.items())
+
+
+class JsonlAlertSink:
+    """Appends every alert as one JSON line to a local file"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, alert: WatchAlert) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + "\n")
+
+
+class Watcher:
+    """
+    Watches saved locations for good conditions tomorrow. The first cycle collects the full combined data
+    for every location; after that only the weather is polled. Locations whose forecast for tomorrow changed
+    are rescored, and an alert goes to the sink when a location's score reaches the threshold, with the day's
+    itinerary and, when asked for, the model's recommendations. Everything else is left alone, so the work
+    beyond polling grows with the number of changes rather than the number of locations.
+
+    State is kept per location in state_dir, so a restarted watch continues from the forecasts it saw last
+    and does not repeat alerts.
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[JobSpec],
+        state_dir: str,
+        sink: Callable[[WatchAlert], None],
+        threshold: float = DEFAULT_THRESHOLD,
+        recommend: bool = False,
+        model_factory: Optional[Callable[[], Model]] = None,
+        max_workers: int = 8,
+    ) -> None:
+        self.specs = {job_key(spec): spec for spec in specs}
+        self.state_dir = state_dir
+        self.sink = sink
+        self.threshold = threshold
+        self.recommend = recommend
+        self.model_factory = model_factory
+        self.max_workers = max_workers
+        os.makedirs(state_dir, exist_ok=True)
+        self.locations: Dict[str, WatchedLocation] = {}
+        for key in self.specs:
+            state = self._load(key)
+            if state is not None:
+                self.locations[key] = state
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.state_dir, hashlib.sha256(key.encode("utf-8")).hexdigest()[:32] + ".bin")
+
+    def _load(self, key: str) -> Optional[WatchedLocation]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return codec.decode(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable watch state for {key}: {str(e)}")
+            return None
+
+    def _store(self, key: str, state: WatchedLocation) -> None:
+        path = self._path(key)
+        with open(path + ".tmp", "wb") as f:
+            f.write(codec.encode(state))
+        os.replace(path + ".tmp", path)
+
+    def _poll(self, key: str) -> Any:
+        """Fresh data for a location: everything the first time, only the weather after that"""
+        spec = self.specs[key]
+        if key not in self.locations:
+            return get_combined_data(
+                latitude=spec.get("latitude"), longitude=spec.get("longitude"), place_name=spec.get("place_name", "")
+            )
+        location = self.locations[key]["combined"]["location"]
+        return get_weather_forecast(location["latitude"], location["longitude"])
+
+    def run_cycle(self) -> CycleStats:
+        start = time.perf_counter()
+        stats: CycleStats = {"polled": 0, "added": 0, "changed": 0, "alerts": 0, "failed": 0, "elapsed_ms": 0.0}
+        with span("watch.cycle", locations=len(self.specs)):
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(self.specs)))) as executor:
+                futures = {key: submit_traced(executor, "watch.poll", self._poll, key) for key in self.specs}
+                for key, future in futures.items():
+                    stats["polled"] += 1
+                    try:
+                        polled = future.result()
+                    except Exception as e:
+                        stats["failed"] += 1
+                        increment(WATCH_LOCATIONS_TOTAL, outcome="failed")
+                        logger.warning(f"Failed to poll watched location {key}: {str(e)}")
+                        continue
+                    try:
+                        outcome = self._update(key, polled, stats)
+                    except Exception as e:
+                        # Bad forecast values, a full disk or a failing sink only cost this location its cycle
+                        stats["failed"] += 1
+                        increment(WATCH_LOCATIONS_TOTAL, outcome="failed")
+                        logger.warning(f"Failed to evaluate watched location {key}: {str(e)}")
+                        continue
+                    if outcome != "unchanged":
+                        stats[outcome] += 1
+                    increment(WATCH_LOCATIONS_TOTAL, outcome=outcome)
+
+        stats["elapsed_ms"] = (time.perf_counter() - start) * 1000.0
+        observe(WATCH_CYCLE_DURATION_MS, stats["elapsed_ms"])
+        logger.info(
+            f"Watch cycle: {stats['polled']} polled, {stats['added']} added, {stats['changed']} changed, "
+            f"{stats['alerts']} alerts, {stats['failed']} failed in {stats['elapsed_ms']:.0f} ms"
+        )
+        return stats
+
+    def _update(self, key: str, polled: Any, stats: CycleStats) -> Literal["added", "changed", "unchanged"]:
+        """Take in what was polled for a location; returns whether it was new, changed or unchanged"""
+        previous = self.locations.get(key)
+        if previous is None:
+            self._evaluate(key, polled, None, stats)
+            return "added"
+        if weather_changed(previous["combined"]["weather"], polled):
+            self._evaluate(key, {**previous["combined"], "weather": polled}, previous, stats)
+            return "changed"
+        return "unchanged"
+
+    def _evaluate(
+        self, key: str, combined: CombinedData, previous: Optional[WatchedLocation], stats: CycleStats
+    ) -> None:
+        """Rescore a new or changed location, alert when it became good, and store its state"""
+        if len(combined["weather"]) <= WATCH_DAY:
+            logger.warning(f"No forecast for tomorrow for watched location {key}")
+            return
+        combined = self._plan_tomorrow(key, combined)
+        score = watch_score(combined["weather"])
+        previous_score = previous["score"] if previous is not None else None
+        before = previous["combined"]["weather"] if previous is not None else []
+        new_day = len(before) <= WATCH_DAY or before[WATCH_DAY]["time"] != combined["weather"][WATCH_DAY]["time"]
+        if score >= self.threshold and (new_day or previous_score is None or previous_score < self.threshold):
+            self.sink(self._alert(key, combined, score, previous_score))
+            stats["alerts"] += 1
+            increment(WATCH_ALERTS_TOTAL)
+        state: WatchedLocation = {"spec": self.specs[key], "combined": combined, "score": score}
+        self.locations[key] = state
+        self._store(key, state)
+
+    def _plan_tomorrow(self, key: str, combined: CombinedData) -> CombinedData:
+        """
+        The combined data with its itinerary planned for tomorrow instead of the first forecast day. Terrain
+        light is dropped: it was computed for the first day of the forecast it came with.
+        """
+        planned: CombinedData = {**combined}
+        planned.pop("itinerary", None)
+        planned.pop("horizon_light", None)
+        if combined["places"]:
+            try:
+                planned["itinerary"] = plan_day(
+                    combined["location"],
+                    combined["weather"],
+                    combined["places"],
+                    combined["photos_by_place"],
+                    day=WATCH_DAY,
+                )
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Failed to plan tomorrow for watched location {key}: {str(e)}")
+        return planned
+
+    def _alert(self, key: str, combined: CombinedData, score: float, previous_score: Optional[float]) -> WatchAlert:
+        spec, location, day = self.specs[key], combined["location"], combined["weather"][WATCH_DAY]
+        alert: WatchAlert = {
+            "time": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "place_name": spec.get("place_name") or location["city"],
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
+            "date": day["time"][:10],
+            "score": score,
+            "previous_score": previous_score,
+            "conditions": day,
+        }
+        if "itinerary" in combined:
+            alert["itinerary"] = combined["itinerary"]
+        if self.recommend:
+            try:
+                alert["recommendations"] = get_location_recommendations(
+                    custom_prompt=spec.get("custom_prompt", "") or "Focus on tomorrow's conditions.",
+                    model=self.model_factory() if self.model_factory is not None else None,
+                    latitude=location["latitude"],
+                    longitude=location["longitude"],
+                    place_name=alert["place_name"],
+                    combined_data=combined,
+                )
+            except Exception as e:
+                logger.warning(f"Failed to generate recommendations for {alert['place_name']}: {str(e)}")
+        logger.info(f"Good conditions tomorrow at {alert['place_name']} (score {score:.2f})")
+        return alert
+
+    def run(self, interval: float, cycles: Optional[int] = None) -> None:
+        """Run a cycle every interval seconds, cycles times or until interrupted"""
+        count = 0
+        while cycles is None or count < cycles:
+            started = time.monotonic()
+            try:
+                self.run_cycle()
+            except Exception as e:
+                # Keep watching; the next cycle starts over from the stored state
+                logger.error(f"Watch cycle failed: {str(e)}")
+            count += 1
+            if cycles is None or count < cycles:
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,160 @@
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from shutterscout_ai.batch.jobs import JobQueue, load_specs
+from shutterscout_ai.batch.workers import is_quota_error, run_batch
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.benchmarks.stub_model import StubModel
+
+LOCATIONS = [
+    {"latitude": 51.9181, "longitude": 4.4739, "place_name": "Rotterdam"},
+    {"latitude": 52.3676, "longitude": 4.9041, "place_name": "Amsterdam"},
+    {"latitude": 48.8566, "longitude": 2.3522, "place_name": "Paris"},
+]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    job_queue = JobQueue(str(tmp_path / "jobs.sqlite"))
+    yield job_queue
+    job_queue.close()
+
+
+def test_enqueue_is_idempotent_and_claims_lease_each_job_once(queue):
+    assert queue.enqueue(LOCATIONS) == 3
+    assert queue.enqueue(LOCATIONS[:1] + [{"place_name": "Delft"}]) == 1
+
+    first, second = queue.claim("a", 2), queue.claim("b", 5)
+    assert [job["spec"]["place_name"] for job in first] == ["Rotterdam", "Amsterdam"]
+    assert [job["spec"]["place_name"] for job in second] == ["Paris", "Delft"]
+    assert queue.claim("c", 1) == []
+    assert queue.counts() == {"pending": 0, "running": 4, "done": 0, "failed": 0}
+
+
+def test_failed_jobs_are_retried_until_max_attempts(queue):
+    queue.enqueue(LOCATIONS[:1])
+
+    (job,) = queue.claim("a")
+    assert queue.fail(job["id"], "boom", max_attempts=2) == "pending"
+    (job,) = queue.claim("a")
+    assert job["attempts"] == 2
+    assert queue.fail(job["id"], "boom again", max_attempts=2) == "failed"
+
+    (record,) = queue.results(include_failed=True)
+    assert (record["state"], record["error"]) == ("failed", "boom again")
+    assert queue.retry_failed() == 1
+    assert queue.claim("a")[0]["attempts"] == 1
+
+
+def test_expired_leases_are_claimed_again(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), lease_seconds=-1)
+    queue.enqueue(LOCATIONS[:1])
+
+    assert queue.claim("crashed")[0]["attempts"] == 1
+    assert queue.claim("next")[0]["attempts"] == 2
+    queue.close()
+
+
+def test_run_batch_checkpoints_results_and_resumes(queue):
+    queue.enqueue(LOCATIONS)
+
+    with replay_providers(latency_scale=0):
+        stats = run_batch(queue, workers=2, limit=2, model_factory=StubModel)
+    assert (stats["stopped"], stats["succeeded"]) == ("limit", 2)
+    assert queue.counts()["pending"] == 1
+
+    # A new run against the same database only picks up what is left
+    with replay_providers(latency_scale=0):
+        stats = run_batch(queue, workers=2, model_factory=StubModel)
+    assert (stats["stopped"], stats["succeeded"]) == ("drained", 1)
+
+    results = list(queue.results())
+    assert [record["spec"]["place_name"] for record in results] == ["Rotterdam", "Amsterdam", "Paris"]
+    assert results[2]["result"]["combined"]["location"]["city"] == "Paris"
+    assert results[2]["result"]["recommendations"].startswith("# 📍 ShutterScout.AI Location Overview")
+
+
+def test_jobs_leased_by_another_run_are_left_alone_unless_resuming(queue):
+    queue.enqueue(LOCATIONS[:1])
+    queue.claim("other-run")
+
+    with patch("shutterscout_ai.batch.workers.get_combined_data", return_value={}) as fetch:
+        assert run_batch(queue, workers=0, combined_only=True)["processed"] == 0
+        assert queue.counts()["running"] == 1
+        assert run_batch(queue, workers=0, combined_only=True, recover=True)["succeeded"] == 1
+    assert fetch.call_count == 1
+
+
+def test_results_stored_as_json_text_still_load(queue):
+    queue.enqueue(LOCATIONS[:2])
+    old, new = queue.claim("a", 2)
+    queue.complete(new["id"], {"combined": {"location": {"city": "Amsterdam"}}})
+    # Queues from before results were encoded hold JSON text
+    queue._connection.execute("UPDATE jobs SET state = 'done', result = ? WHERE id = ?", ('{"ok": 1}', old["id"]))
+
+    assert [record["result"] for record in queue.results()] == [
+        {"ok": 1},
+        {"combined": {"location": {"city": "Amsterdam"}}},
+    ]
+
+
+def test_recommendations_reuse_the_fetched_combined_data(queue):
+    queue.enqueue(LOCATIONS[:1])
+
+    with replay_providers(latency_scale=0) as transport:
+        stats = run_batch(queue, workers=0, model_factory=StubModel)
+
+    assert stats["succeeded"] == 1
+    assert transport.calls["api.tomorrow.io"] == 1
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} Client Error", response=response)
+
+
+def wrapped(error):
+    try:
+        try:
+            raise error
+        except requests.RequestException as e:
+            raise RuntimeError(f"Failed to fetch weather forecast: {str(e)}") from e
+    except RuntimeError as e:
+        return e
+
+
+def test_quota_errors_are_recognised_by_status_code():
+    assert is_quota_error(wrapped(http_error(429)))
+    assert not is_quota_error(wrapped(http_error(503)))
+    # Coordinates and URLs in the message are not a quota signal
+    assert not is_quota_error(
+        wrapped(requests.ReadTimeout("Read timed out. (url: /v4/weather/forecast?location=52.1429,4.4900)"))
+    )
+
+
+def test_quota_exhaustion_stops_without_spending_attempts(queue):
+    queue.enqueue(LOCATIONS)
+
+    with patch("shutterscout_ai.batch.workers.get_combined_data", side_effect=wrapped(http_error(429))):
+        stats = run_batch(queue, workers=0, max_in_flight=1)
+
+    assert (stats["stopped"], stats["requeued"], stats["failed"]) == ("quota", 1, 0)
+    assert queue.counts()["pending"] == 3
+    assert queue.claim("a")[0]["attempts"] == 1
+
+
+def test_load_specs_from_csv(tmp_path):
+    path = tmp_path / "locations.csv"
+    path.write_text("latitude,longitude,place\n51.9181,4.4739,Rotterdam\n,,Barcelona\n")
+
+    assert load_specs(str(path)) == [
+        {"latitude": 51.9181, "longitude": 4.4739, "place_name": "Rotterdam"},
+        {"place_name": "Barcelona"},
+    ]
+
+    path.write_text("latitude,longitude,place\n,,\n")
+    with pytest.raises(ValueError, match="row 1 has no coordinates or place name"):
+        load_specs(str(path))
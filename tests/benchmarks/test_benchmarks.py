@@ -0,0 +1,66 @@
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.benchmarks.results import compare_results
+from shutterscout_ai.benchmarks.runner import percentile, run_case
+from shutterscout_ai.tools.combined.combiner import get_combined_data
+
+
+def _result(name, p50, throughput):
+    return {
+        "name": name,
+        "iterations": 10,
+        "concurrency": 1,
+        "mean_ms": p50,
+        "min_ms": p50,
+        "p50_ms": p50,
+        "p90_ms": p50,
+        "p99_ms": p50,
+        "max_ms": p50,
+        "throughput_per_s": throughput,
+        "peak_memory_kb": 100.0,
+        "peak_threads": 1,
+        "errors": 0,
+    }
+
+
+def test_percentile_nearest_rank():
+    samples = [float(value) for value in range(1, 101)]
+    assert percentile(samples, 0.50) == 50.0
+    assert percentile(samples, 0.90) == 90.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_run_case_counts_iterations_and_errors():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) % 2 == 0:
+            raise RuntimeError("boom")
+
+    result = run_case("flaky", flaky, iterations=10, concurrency=2, warmup=0)
+
+    assert result["iterations"] == 10
+    assert result["errors"] == 5
+    assert result["p50_ms"] >= 0
+    assert result["peak_threads"] >= 1
+
+
+def test_compare_results_flags_regressions():
+    baseline = {"case": _result("case", p50=100.0, throughput=10.0)}
+    current = [_result("case", p50=125.0, throughput=7.0), _result("new-case", p50=1.0, throughput=1.0)]
+
+    regressions = compare_results(baseline, current, threshold_pct=10.0)
+
+    metrics = {regression["metric"] for regression in regressions}
+    assert metrics == {"p50_ms", "p90_ms", "throughput_per_s"}
+    assert all(regression["case"] == "case" for regression in regressions)
+
+
+def test_replay_providers_serves_combined_data():
+    with replay_providers(latency_scale=0) as transport:
+        data = get_combined_data(max_places=3)
+
+    assert data["location"]["city"] == "Rotterdam"
+    assert len(data["places"]) == 3
+    assert transport.calls["www.flickr.com"] == 3
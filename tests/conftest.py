@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_directories(tmp_path_factory):
+    """Keep caches and the conditions archive out of the real home directory, module fixtures included"""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("SHUTTERSCOUT_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        monkeypatch.setenv("SHUTTERSCOUT_DATA_DIR", str(tmp_path_factory.mktemp("data")))
+        yield
@@ -0,0 +1,10 @@
+from shutterscout_ai.core.shutterscout_agent import location_instruction
+
+
+def test_location_instruction_without_override():
+    assert location_instruction() == ""
+
+
+def test_location_instruction_with_coordinates_and_name():
+    instruction = location_instruction(48.8584, 2.2945, "Paris")
+    assert "get_combined_data(latitude=48.8584, longitude=2.2945, place_name='Paris')" in instruction
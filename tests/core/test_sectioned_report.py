@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+from smolagents import ChatMessage, Model
+
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.core.sectioned_report import build_sections, generate_sectioned_report, section_messages
+from shutterscout_ai.core.shutterscout_agent import get_location_recommendations
+from shutterscout_ai.tools.combined.combiner import get_combined_data
+
+
+class SectionModel(Model):
+    """Answers with the section name from the prompt after a fixed delay, counting tokens like a real client"""
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, delay=0.05, fail_on="", always_fail=False):
+        super().__init__()
+        self.delay = delay
+        self.fail_on = fail_on
+        self.always_fail = always_fail
+
+    def __call__(self, messages, stop_sequences=None, grammar=None, **kwargs):
+        prompt = messages[-1]["content"][0]["text"]
+        section = prompt.splitlines()[0].removeprefix("Section: ")
+        with SectionModel.lock:
+            SectionModel.active += 1
+            SectionModel.peak = max(SectionModel.peak, SectionModel.active)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with SectionModel.lock:
+                SectionModel.active -= 1
+        if self.always_fail or (self.fail_on and self.fail_on in section):
+            raise RuntimeError("model overloaded")
+        self.last_input_token_count = len(prompt) // 4
+        self.last_output_token_count = 5
+        return ChatMessage(role="assistant", content=f"Text for {section}")
+
+
+@pytest.fixture(scope="module")
+def combined():
+    with replay_providers(latency_scale=0):
+        return get_combined_data(max_places=5)
+
+
+def test_sections_follow_the_report_layout(combined):
+    keys = [section.key for section in build_sections(combined)]
+
+    assert keys == [
+        "overview",
+        "conditions",
+        "best_times",
+        "location_1",
+        "location_2",
+        "location_3",
+        "photos",
+        "equipment",
+        "access",
+        "safety",
+    ]
+
+
+def test_sections_only_get_their_slice_of_the_data(combined):
+    sections = {section.key: section for section in build_sections(combined)}
+    conditions = section_messages(sections["conditions"], combined)[-1]["content"][0]["text"]
+    location = section_messages(sections["location_1"], combined)[-1]["content"][0]["text"]
+
+    assert "temperature_min" in conditions and "photo_titles" not in conditions
+    first_place = sections["location_1"].heading.split(": ", 1)[1]
+    assert first_place in location
+    assert "seasonal" not in location
+
+
+def test_sections_run_concurrently_and_assemble_in_order(combined):
+    SectionModel.peak = 0
+    start = time.perf_counter()
+    report = generate_sectioned_report(combined, lambda: SectionModel(delay=0.1))
+    elapsed = time.perf_counter() - start
+
+    assert SectionModel.peak == len(report["sections"])
+    assert elapsed < 0.1 * len(report["sections"]) / 2
+    markdown = report["markdown"]
+    headings = [
+        "# 📍 ShutterScout.AI Location Overview",
+        "## 🌤️ Photography Conditions",
+        "## ⏰ Best Shooting Times",
+        "## 📸 Location Recommendations",
+        "### Location 1:",
+        "## 🎯 Sample Photos & Shot Ideas",
+        "### Available Photos",
+        "## ⚠️ Photographer's Notes",
+        "### Safety Considerations",
+    ]
+    positions = [markdown.index(heading) for heading in headings]
+    assert positions == sorted(positions)
+    assert "Text for 🌤️ Photography Conditions" in markdown
+    assert report["output_tokens"] == 5 * len(report["sections"])
+    assert all(section["input_tokens"] > 0 for section in report["sections"])
+
+
+def test_failed_section_is_marked_and_the_rest_kept(combined):
+    report = generate_sectioned_report(combined, lambda: SectionModel(delay=0, fail_on="Safety"))
+
+    failed = [section for section in report["sections"] if section["error"]]
+    assert [section["key"] for section in failed] == ["safety"]
+    assert "_This section could not be generated._" in report["markdown"]
+
+    with pytest.raises(RuntimeError, match="Failed to generate any report section"):
+        generate_sectioned_report(combined, lambda: SectionModel(delay=0, always_fail=True))
+
+
+def test_recommendations_in_sectioned_mode(combined):
+    markdown = get_location_recommendations(combined_data=combined, sectioned=True, model=SectionModel(delay=0))
+
+    assert markdown.startswith("# 📍 ShutterScout.AI Location Overview")
@@ -0,0 +1,87 @@
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+import requests
+from PIL import Image
+
+from shutterscout_ai.benchmarks.site import synthetic_records
+from shutterscout_ai.publish.site import build_site, markdown_to_html, records_from_results
+
+
+@pytest.fixture(scope="module")
+def records():
+    return synthetic_records(130)
+
+
+def page_files(directory):
+    return sorted(os.listdir(directory / "locations"))
+
+
+def test_rebuild_only_renders_changed_pages(records, tmp_path):
+    first = build_site(records, str(tmp_path), workers=0)
+    assert (first["pages"], first["rendered"]) == (132, 132)
+    assert len(page_files(tmp_path)) == 130
+    assert "Spot 0" in (tmp_path / "index.html").read_text()
+
+    assert build_site(records, str(tmp_path), workers=0)["rendered"] == 0
+
+    # A new report only touches that location's page; new conditions also change the index and map
+    changed = [dict(record) for record in records]
+    changed[3]["recommendations"] = "# Updated"
+    weather = changed[4]["combined"]["weather"]
+    changed[4]["combined"] = {**changed[4]["combined"], "weather": [{**weather[0], "cloud_cover": 101}] + weather[1:]}
+    stats = build_site(changed, str(tmp_path), workers=0)
+    assert (stats["rendered"], stats["skipped"]) == (4, 128)
+
+    stats = build_site(changed[:-1], str(tmp_path), workers=0)
+    assert (stats["removed"], stats["rendered"]) == (1, 2)
+    assert len(page_files(tmp_path)) == 129
+
+
+def test_parallel_build_matches_serial_build(records, tmp_path):
+    build_site(records, str(tmp_path / "serial"), workers=0)
+    stats = build_site(records, str(tmp_path / "parallel"), workers=2)
+
+    assert stats["rendered"] == 132
+    name = page_files(tmp_path / "serial")[7]
+    assert (tmp_path / "parallel" / "locations" / name).read_text() == (
+        tmp_path / "serial" / "locations" / name
+    ).read_text()
+
+
+def test_records_come_from_finished_jobs_with_combined_data(records):
+    results = [
+        {"spec": records[0]["spec"], "result": {"combined": records[0]["combined"], "recommendations": "# Report"}},
+        {"spec": {"place_name": "Failed"}, "result": None},
+    ]
+
+    (record,) = records_from_results(results)
+    assert record["recommendations"] == "# Report"
+
+
+def test_markdown_is_escaped_and_converted():
+    converted = markdown_to_html("## Tips\n\n- **Tripod** <script>\n- [Photo](https://x.test/a?b=1&c=2)\n\nText")
+
+    assert converted == (
+        "<h2>Tips</h2>\n<ul>\n<li><strong>Tripod</strong> &lt;script&gt;</li>\n"
+        '<li><a href="https://x.test/a?b=1&amp;c=2">Photo</a></li>\n</ul>\n<p>Text</p>'
+    )
+
+
+def test_thumbnails_are_copied_into_the_site(records, tmp_path, monkeypatch):
+    monkeypatch.setenv("SHUTTERSCOUT_CACHE_DIR", str(tmp_path / "cache"))
+    buffer = io.BytesIO()
+    Image.new("RGB", (150, 150), "teal").save(buffer, format="JPEG")
+    thumbnail = requests.Response()
+    thumbnail.status_code, thumbnail._content = 200, buffer.getvalue()
+
+    with patch("requests.get", return_value=thumbnail) as get:
+        stats = build_site(records[:2], str(tmp_path / "site"), workers=0, thumbnails=True)
+    assert stats["rendered"] == 4
+    # Every photo looks the same, so each page shows it once from the site's own copy
+    assert len(os.listdir(tmp_path / "site" / "thumbnails")) == 1
+    page = (tmp_path / "site" / "locations" / page_files(tmp_path / "site")[0]).read_text()
+    assert page.count('src="../thumbnails/') == 1
+    assert get.call_count == 5
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.tools.archive.archive import ColumnarTable, ConditionsArchive, quantize
+from shutterscout_ai.tools.astronomy.astronomy import SunTimes
+from shutterscout_ai.tools.combined.combiner import get_combined_data
+
+CELL = quantize(51.9181, 4.4739)
+
+
+def forecast_day(day: str, cloud_cover: float, precipitation: float = 5.0):
+    return {
+        "time": f"{day}T05:00:00Z",
+        "temperature_min": 1.0,
+        "temperature_max": 8.0,
+        "cloud_cover": cloud_cover,
+        "precipitation_probability": precipitation,
+        "visibility": 15.0,
+        "sunrise_time": f"{day}T06:59:00Z",
+        "sunset_time": f"{day}T16:54:00Z",
+        "wind_speed": 3.0,
+        "humidity": 80,
+    }
+
+
+@pytest.fixture
+def table(tmp_path):
+    return ColumnarTable(str(tmp_path), (("time", "q"), ("value", "d")))
+
+
+def test_scan_keeps_latest_write_within_range(table):
+    table.append(CELL, [{"time": 300, "value": 1.0}, {"time": 100, "value": 2.0}])
+    table.append(CELL, [{"time": 300, "value": 3.0}, {"time": 200, "value": 4.0}])
+
+    assert table.scan(CELL) == [
+        {"time": 100, "value": 2.0},
+        {"time": 200, "value": 4.0},
+        {"time": 300, "value": 3.0},
+    ]
+    assert [row["time"] for row in table.scan(CELL, start=150, end=300)] == [200]
+    assert table.scan(quantize(0.0, 0.0)) == []
+    assert table.cells() == [CELL]
+
+
+def test_append_repairs_partially_written_columns(table):
+    table.append(CELL, [{"time": 100, "value": 1.0}])
+    with open(os.path.join(table.directory, f"cell={CELL[0]}_{CELL[1]}", "time.q"), "ab") as f:
+        f.write(b"\0" * 8)  # an append interrupted after the first column
+
+    assert table.row_count(CELL) == 1
+    assert table.append(CELL, [{"time": 200, "value": 2.0}]) == 2
+    assert table.scan(CELL) == [{"time": 100, "value": 1.0}, {"time": 200, "value": 2.0}]
+
+
+def test_aggregate_by_month_and_hour(table):
+    january, july = 1704103200, 1719828000  # 2024-01-01 10:00 and 2024-07-01 10:00 UTC
+    table.append(CELL, [{"time": january, "value": 10.0}, {"time": january + 3600, "value": 20.0}])
+    table.append(CELL, [{"time": july, "value": 50.0}])
+
+    assert table.aggregate(CELL, "month", ["value"]) == {1: {"count": 2, "value": 15.0}, 7: {"count": 1, "value": 50.0}}
+    assert table.aggregate(CELL, "hour", ["value"]) == {
+        10: {"count": 2, "value": 30.0},
+        11: {"count": 1, "value": 20.0},
+    }
+    with pytest.raises(ValueError, match="Cannot aggregate by 'week'"):
+        table.aggregate(CELL, "week", ["value"])
+
+
+def test_seasonal_conditions_rank_months_by_light(tmp_path):
+    archive = ConditionsArchive(str(tmp_path))
+    archive.record_weather(51.9181, 4.4739, [forecast_day("2024-11-01", 95.0, 60.0), forecast_day("2024-11-02", 85.0)])
+    archive.record_weather(51.92, 4.47, [forecast_day("2024-06-01", 10.0), forecast_day("2024-06-02", 40.0)])
+    archive.record_sun_times(51.9181, 4.4739, SunTimes("3:47:00 AM", "8:01:00 PM", "16:14:00"), day="2024-06-01")
+
+    seasonal = archive.seasonal_conditions(51.9181, 4.4739, "Europe/Amsterdam")
+
+    assert seasonal["observations"] == 4
+    assert (seasonal["first_day"], seasonal["last_day"]) == ("2024-06-01", "2024-11-02")
+    assert seasonal["best_months"] == [6, 11]
+    june = seasonal["by_month"][0]
+    assert (june["month"], june["days"], june["cloud_cover"], june["clear_day_ratio"]) == (6, 2, 25.0, 0.5)
+    # Mean of the observed 05:47 and the forecast 08:59 local sunrise
+    assert june["sunrise"] == "07:23"
+    assert archive.seasonal_conditions(40.0, -3.7) is None
+
+
+def test_record_sun_times_handles_sunset_after_utc_midnight(tmp_path):
+    archive = ConditionsArchive(str(tmp_path))
+    archive.record_sun_times(
+        37.77, -122.42, {"sunrise": "1:50:00 PM", "sunset": "3:30:00 AM", "day_length": "13:40:00"}, day="2024-06-01"
+    )
+
+    (row,) = archive.sun.scan(quantize(37.77, -122.42))
+    assert row["sunset"] - row["sunrise"] == 13 * 3600 + 40 * 60
+
+
+def test_combined_data_includes_seasonal_conditions():
+    with replay_providers(latency_scale=0):
+        data = get_combined_data(max_places=1)
+
+    assert data["seasonal_conditions"]["observations"] == len(data["weather"])
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.tools.combined import codec
+from shutterscout_ai.tools.combined.combiner import get_combined_data
+from shutterscout_ai.tools.photos.photos import PhotoSize, get_photo_urls
+
+DAY = {
+    "time": "2025-02-12T05:00:00Z",
+    "temperature_min": -1.7,
+    "temperature_max": 6.25,
+    "cloud_cover": 93,
+    "precipitation_probability": 0,
+    "visibility": 20.0,
+    "sunrise_time": "2025-02-12T06:59:00Z",
+    "sunset_time": "2025-02-12T16:54:00Z",
+    "wind_speed": 1.6,
+    "humidity": 92,
+}
+PLACE = {"name": "Erasmusbrug", "latitude": 51.909, "longitude": 4.4868}
+SUN_TIMES = {"sunrise": "2025-02-12T06:59:01+00:00", "sunset": "2025-02-12T16:53:40+00:00", "day_length": "9:54:39"}
+FLICKR = {"id": "53210000", "secret": "a1b2c3d0", "server": "65535", "farm": 66, "title": "Bridge at dusk"}
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        DAY,
+        PLACE,
+        SUN_TIMES,
+        get_photo_urls([{**FLICKR, "views": "1200", "datetaken": "2024-01-15 18:00:00"}])[0],
+        get_photo_urls([FLICKR], PhotoSize.LARGE_SQUARE)[0],
+        {"id": "1", "title": "Elsewhere", "url": "https://live.staticflickr.com/65535/1_abc_z.jpg"},
+        [0.1 + 0.2, 1e-9, 1e300, -0.0, float("inf"), -(2**70), True, False, None, "", "2025-2-12T05:00:00Z"],
+    ],
+)
+def test_round_trips_records_and_edge_values(value):
+    assert codec.decode(codec.encode(value)) == value
+
+
+def test_combined_data_round_trips_smaller_than_json():
+    with replay_providers(latency_scale=0):
+        combined = get_combined_data(latitude=51.9181, longitude=4.4739, place_name="Rotterdam")
+
+    encoded = codec.encode(combined)
+
+    assert codec.decode(encoded) == combined
+    assert len(encoded) < len(json.dumps(combined)) / 2
+
+
+def test_flickr_urls_are_stored_as_their_parts():
+    photos = get_photo_urls([{**FLICKR, "id": str(53210000 + i), "title": "Same title"} for i in range(20)])
+    encoded = codec.encode(photos)
+
+    assert b"staticflickr" not in encoded
+    assert codec.decode(encoded) == photos
+
+
+def test_rejects_foreign_versions_and_corrupt_data():
+    encoded = codec.encode(PLACE)
+
+    with pytest.raises(ValueError, match="Not ShutterScout"):
+        codec.decode(json.dumps(PLACE).encode("utf-8"))
+    with pytest.raises(ValueError, match="Unsupported encoding version 9"):
+        codec.decode(codec.MAGIC + b"\x09" + encoded[4:])
+    with pytest.raises(ValueError, match="Corrupt"):
+        codec.decode(encoded[:-3])
+    with pytest.raises(TypeError, match="set"):
+        codec.encode({"tags": {"bridge"}})
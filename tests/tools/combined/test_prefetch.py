@@ -0,0 +1,131 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from shutterscout_ai.tools.combined.prefetch import Prefetcher, QuotaBudget, RequestTracker, location_key
+
+# 2025-02-12 06:00 UTC, an hour before the first sunrise in the fake forecast
+START = datetime(2025, 2, 12, 6, 0, tzinfo=timezone.utc).timestamp()
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFetch:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, latitude, longitude, place_name=""):
+        self.calls.append((latitude, longitude))
+        return {
+            "location": {"latitude": latitude, "longitude": longitude, "city": place_name},
+            "weather": [
+                {"time": "2025-02-12T05:00:00Z", "sunrise_time": "2025-02-12T06:59:00Z"},
+                {"time": "2025-02-13T05:00:00Z", "sunrise_time": "2025-02-13T06:57:00Z"},
+            ],
+            "sun_times": {},
+            "places": [{"name": "Erasmusbrug", "latitude": 51.909, "longitude": 4.4868}],
+            "photos_by_place": {},
+        }
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def fetch():
+    return FakeFetch()
+
+
+def test_nearby_requests_share_one_cached_copy(clock, fetch):
+    prefetcher = Prefetcher(fetch=fetch, clock=clock)
+
+    first = prefetcher.get(51.9181, 4.4739, "Rotterdam")
+    first["places"].clear()
+    second = prefetcher.get(51.9183, 4.4741)
+
+    assert len(fetch.calls) == 1
+    assert second["places"][0]["name"] == "Erasmusbrug"
+    assert location_key(51.9181, 4.4739) == location_key(51.9183, 4.4741)
+
+
+def test_hot_locations_are_refreshed_before_they_expire(clock, fetch):
+    prefetcher = Prefetcher(fetch=fetch, ttl=1800, refresh_ahead=300, hot_threshold=2, clock=clock)
+    for _ in range(3):
+        prefetcher.get(51.9181, 4.4739)
+    prefetcher.get(52.3676, 4.9041)
+
+    clock.now += 1200
+    assert prefetcher.run_once() == 0
+    clock.now += 400
+    assert prefetcher.due() == [(location_key(51.9181, 4.4739), "hot")]
+    assert prefetcher.run_once() == 1
+
+    # Served warm after the original entry would have expired
+    clock.now += 400
+    prefetcher.get(51.9181, 4.4739)
+    assert len(fetch.calls) == 3
+
+
+def test_saved_locations_are_warmed_ahead_of_sunrise(clock, fetch):
+    prefetcher = Prefetcher(fetch=fetch, ttl=1800, sunrise_lead=1800, clock=clock)
+    prefetcher.save({"latitude": 46.02, "longitude": 7.75, "place_name": "Zermatt"})
+
+    # First run learns the upcoming sunrises
+    assert prefetcher.due() == [(location_key(46.02, 7.75), "saved")]
+    assert prefetcher.run_once() == 1
+    # 06:00 data expires 06:30, before the 06:59 sunrise; refreshed once sunrise is within the lead
+    clock.now += 600
+    assert prefetcher.run_once() == 0
+    clock.now += 1200
+    assert prefetcher.due() == [(location_key(46.02, 7.75), "sunrise")]
+    assert prefetcher.run_once() == 1
+    assert prefetcher.run_once() == 0
+
+
+def test_saved_locations_are_refreshed_once_per_sunrise(clock, fetch):
+    clock.now -= 3 * 3600
+    prefetcher = Prefetcher(fetch=fetch, ttl=1800, sunrise_lead=5400, clock=clock)
+    prefetcher.save({"latitude": 46.02, "longitude": 7.75, "place_name": "Zermatt"})
+
+    # Ticks every 30 seconds from 03:00 until just before the 06:59 sunrise
+    while clock.now < START + 3540:
+        prefetcher.run_once()
+        clock.now += 30
+
+    # Once to learn the sunrises, once when sunrise came within the lead, then served warm at sunrise
+    assert len(fetch.calls) == 2
+    prefetcher.get(46.02, 7.75)
+    assert len(fetch.calls) == 2
+
+
+def test_refreshes_stop_when_the_budget_is_spent(clock, fetch):
+    budget = QuotaBudget(limit=10, window=3600)
+    prefetcher = Prefetcher(fetch=fetch, ttl=600, refresh_ahead=600, hot_threshold=0.4, budget=budget, clock=clock)
+    prefetcher.get(51.9181, 4.4739)
+    prefetcher.get(52.3676, 4.9041)
+
+    # Each fetch costs four calls, and the two misses already spent eight
+    assert budget.remaining(clock()) == 2
+    assert prefetcher.run_once() == 0
+    clock.now += 3601
+    assert prefetcher.run_once() == 2
+    assert budget.remaining(clock()) == 2
+
+
+def test_request_counts_decay():
+    tracker = RequestTracker(half_life=60)
+    tracker.record((1, 1), 0)
+    tracker.record((1, 1), 0)
+    tracker.record((2, 2), 0)
+
+    assert tracker.score((1, 1), 60) == pytest.approx(1.0)
+    assert tracker.hottest(60, threshold=0.75) == [((1, 1), pytest.approx(1.0))]
+    assert tracker.hottest(6000, threshold=0.0) == []
@@ -0,0 +1,140 @@
+import random
+from unittest.mock import patch
+
+import pytest
+
+from shutterscout_ai.tools.geocoder.geocoder import (
+    BUNDLED_GAZETTEER,
+    OfflineGeocoder,
+    build_index,
+    get_geocoder,
+    haversine_km,
+    normalize,
+)
+from shutterscout_ai.tools.location.location import get_location
+
+ROW = "{}\t{}\t{}\t{}\t{}\t{}\tP\tPPL\t{}\t\t{}\t\t\t\t{}\t\t0\t{}\t2024-01-01\n"
+
+
+@pytest.fixture
+def geocoder(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHUTTERSCOUT_CACHE_DIR", str(tmp_path))
+    return get_geocoder(BUNDLED_GAZETTEER)
+
+
+@pytest.fixture
+def custom_geocoder(tmp_path):
+    gazetteer = tmp_path / "towns.tsv"
+    gazetteer.write_text(
+        "# custom gazetteer\n"
+        + ROW.format(
+            1, "Valencia", "Valencia", "València,Valence", 39.47, -0.38, "ES", "Valencia", 800000, "Europe/Madrid"
+        )
+        + ROW.format(2, "Valencia", "Valencia", "", 10.16, -68.0, "VE", "Carabobo", 1500000, "America/Caracas")
+        + ROW.format(3, "Ålesund", "Alesund", "", 62.47, 6.15, "NO", "More og Romsdal", 50000, "Europe/Oslo"),
+        encoding="utf-8",
+    )
+    index = tmp_path / "towns.idx"
+    build_index(str(gazetteer), str(index))
+    return OfflineGeocoder(str(index))
+
+
+def test_normalize_ignores_case_accents_and_punctuation():
+    assert normalize("  Saint-Étienne ") == "saint etienne"
+
+
+def test_lookup_returns_location_info(geocoder):
+    result = geocoder.lookup("rotterdam")
+
+    assert result == [
+        {
+            "latitude": 51.9225,
+            "longitude": 4.47917,
+            "city": "Rotterdam",
+            "region": "South Holland",
+            "country": "Netherlands",
+            "timezone": "Europe/Amsterdam",
+        }
+    ]
+
+
+def test_lookup_ranks_by_population_and_honours_qualifier(custom_geocoder):
+    assert [r["country"] for r in custom_geocoder.lookup("Valencia", limit=5)] == ["VE", "Spain"]
+    assert custom_geocoder.lookup("Valencia, Spain")[0]["timezone"] == "Europe/Madrid"
+    assert custom_geocoder.lookup("Valence")[0]["country"] == "Spain"
+    assert custom_geocoder.lookup("alesund")[0]["city"] == "Ålesund"
+
+
+def test_prefix_and_fuzzy_lookup(geocoder):
+    assert "Rotterdam" in [r["city"] for r in geocoder.prefix("rott")]
+    assert geocoder.fuzzy("Barcelnoa")[0]["city"] == "Barcelona"
+    assert geocoder.fuzzy("Xyzzyville") == []
+    assert geocoder.geocode("Amsterdm")["city"] == "Amsterdam"
+
+
+def test_reverse_matches_brute_force_nearest(geocoder):
+    rng = random.Random(7)
+    cities = [geocoder.location(i) for i in range(geocoder.count)]
+    for _ in range(200):
+        lat, lon = rng.uniform(-60, 70), rng.uniform(-180, 180)
+        expected = min(cities, key=lambda c: haversine_km(lat, lon, c["latitude"], c["longitude"]))
+        assert geocoder.reverse(lat, lon) == expected
+
+
+def test_reverse_finds_far_away_cities_near_the_poles_and_date_line(geocoder):
+    cities = [geocoder.location(i) for i in range(geocoder.count)]
+    for lat, lon in [(89.99, 10.0), (-85.0, 30.0), (0.0, -150.0), (-40.0, -179.9), (65.0, 179.95)]:
+        expected = min(cities, key=lambda c: haversine_km(lat, lon, c["latitude"], c["longitude"]))
+        assert geocoder.reverse(lat, lon) == expected
+
+
+def test_reverse_respects_max_distance(geocoder):
+    assert geocoder.reverse(51.91, 4.35, max_distance_km=10)["city"] == "Vlaardingen"
+    assert geocoder.reverse(0.0, -140.0, max_distance_km=100) is None
+
+
+def test_index_is_rebuilt_when_gazetteer_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHUTTERSCOUT_CACHE_DIR", str(tmp_path / "cache"))
+    gazetteer = tmp_path / "towns.tsv"
+    gazetteer.write_text(
+        ROW.format(1, "Delft", "Delft", "", 52.01, 4.36, "NL", "South Holland", 100000, "Europe/Amsterdam")
+    )
+    assert get_geocoder(str(gazetteer)).lookup("Delft")
+
+    gazetteer.write_text(
+        ROW.format(2, "Gouda", "Gouda", "", 52.01, 4.71, "NL", "South Holland", 70000, "Europe/Amsterdam")
+    )
+    rebuilt = get_geocoder(str(gazetteer))
+    assert rebuilt.lookup("Delft") == []
+    assert rebuilt.lookup("Gouda")
+
+
+def test_get_location_geocodes_place_name_offline(geocoder):
+    with patch("requests.get") as mock_get:
+        result = get_location(place_name="Barcelona")
+
+        mock_get.assert_not_called()
+        assert result["country"] == "Spain"
+        assert round(result["latitude"], 1) == 41.4
+
+
+def test_get_location_fills_in_override_details(geocoder):
+    result = get_location(latitude=48.8584, longitude=2.2945, place_name="Eiffel Tower")
+
+    assert result["city"] == "Eiffel Tower"
+    assert result["country"] == "France"
+    assert result["timezone"] == "Europe/Paris"
+
+
+def test_get_location_rejects_unknown_place(geocoder):
+    with pytest.raises(ValueError, match="Cannot resolve place"):
+        get_location(place_name="Xyzzyville")
+
+
+def test_get_location_reports_an_unusable_index_as_invalid_input():
+    with patch("shutterscout_ai.tools.location.location.get_geocoder", side_effect=PermissionError("read-only cache")):
+        with pytest.raises(ValueError, match="offline geocoding unavailable: read-only cache"):
+            get_location(place_name="Barcelona")
+
+        result = get_location(latitude=48.8584, longitude=2.2945, place_name="Eiffel Tower")
+        assert (result["city"], result["country"]) == ("Eiffel Tower", "")
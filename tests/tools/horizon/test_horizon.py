@@ -0,0 +1,131 @@
+from array import array
+from datetime import date, datetime, timezone
+
+import pytest
+
+from shutterscout_ai.tools.horizon import horizon
+from shutterscout_ai.tools.horizon.horizon import (
+    DemTile,
+    DemTiles,
+    HorizonCache,
+    compute_horizon,
+    horizon_profile,
+    light_windows,
+    place_light,
+    solar_position,
+)
+
+SAMPLES = 1201
+
+
+def write_tile(directory, name, height=lambda row, column: 500):
+    """SRTM3 tile of big-endian heights"""
+    heights = array("h", (height(row, column) for row in range(SAMPLES) for column in range(SAMPLES)))
+    heights.byteswap()
+    path = directory / name
+    path.write_bytes(heights.tobytes())
+    return path
+
+
+@pytest.fixture(scope="module")
+def terrain(tmp_path_factory):
+    """Flat plain at 500 m with a 1500 m ridge from 7.55°E, about 4 km east of 46.5°N 7.5°E"""
+    directory = tmp_path_factory.mktemp("dem")
+    ridge_column = round(0.55 * (SAMPLES - 1))
+    write_tile(directory, "N46E007.hgt", lambda row, column: 1500 if column >= ridge_column else 500)
+    return DemTiles(str(directory))
+
+
+def test_solar_position_at_june_solstice_noon():
+    elevation, azimuth = solar_position(datetime(2025, 6, 21, 12, tzinfo=timezone.utc), 0.0, 0.0)
+
+    assert elevation == pytest.approx(66.56, abs=0.3)
+    assert azimuth == pytest.approx(0.0, abs=2.0) or azimuth == pytest.approx(360.0, abs=2.0)
+
+
+def test_flat_sunrise_matches_published_time():
+    light = light_windows(51.9181, 4.4739, date(2025, 2, 12), [0.0] * 180)
+
+    # Published times for Rotterdam: 08:03 and 17:50 CET
+    sunrise = datetime.fromisoformat(light["flat_sunrise"])
+    sunset = datetime.fromisoformat(light["flat_sunset"])
+    assert abs((sunrise - datetime(2025, 2, 12, 7, 3, tzinfo=timezone.utc)).total_seconds()) < 180
+    assert abs((sunset - datetime(2025, 2, 12, 16, 50, tzinfo=timezone.utc)).total_seconds()) < 180
+    assert light["sunrise"] == light["flat_sunrise"]
+    assert light["sunrise_delay_minutes"] == 0.0
+
+
+def test_elevation_is_read_from_tile(terrain):
+    assert terrain.elevation(46.5, 7.5) == 500
+    assert terrain.elevation(46.5, 7.6) == 1500
+    assert terrain.elevation(45.5, 7.5) is None
+    assert terrain.covers(46.9, 7.1) and not terrain.covers(47.1, 7.1)
+
+
+def test_ridge_raises_the_eastern_horizon(terrain):
+    profile = compute_horizon(terrain, 46.5, 7.5)
+
+    east, west = profile[45], profile[135]
+    assert east == pytest.approx(14.0, abs=1.5)
+    assert west < 0.5
+
+
+def test_ridge_delays_sunrise_but_not_sunset(terrain):
+    profile = compute_horizon(terrain, 46.5, 7.5)
+    light = light_windows(46.5, 7.5, date(2025, 6, 21), profile)
+
+    assert light["sunrise_delay_minutes"] > 60
+    assert light["golden_morning_minutes"] == 0.0
+    assert abs(light["sunset_advance_minutes"]) < 2
+    assert light["golden_evening_minutes"] > 30
+
+
+def test_sun_that_never_clears_the_skyline_is_not_lit():
+    light = light_windows(46.5, 7.5, date(2025, 12, 21), [45.0] * 180)
+
+    assert not light["lit"]
+    assert (light["sunrise"], light["sunset"]) == ("", "")
+    assert light["flat_sunrise"]
+    assert light_windows(46.5, 7.5, date(2025, 12, 21), [0.0] * 180)["lit"]
+
+
+def test_missing_dem_directory_is_not_created(tmp_path, monkeypatch):
+    monkeypatch.delenv("SHUTTERSCOUT_DEM_DIR", raising=False)
+    monkeypatch.setenv("SHUTTERSCOUT_DATA_DIR", str(tmp_path))
+
+    assert not horizon.get_dem().covers(46.5, 7.5)
+    assert not (tmp_path / "dem").exists()
+
+
+def test_profiles_are_cached_on_disk(terrain, tmp_path, monkeypatch):
+    first = horizon_profile(terrain, 46.5, 7.5, cache=HorizonCache(str(tmp_path)))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("horizon recomputed")
+
+    monkeypatch.setattr(horizon, "compute_horizon", fail)
+    second = horizon_profile(terrain, 46.5, 7.5, cache=HorizonCache(str(tmp_path)))
+
+    assert second == pytest.approx(first, abs=1e-4)
+    assert len(list(tmp_path.glob("*.f32"))) == 1
+
+
+def test_place_light_skips_places_without_tiles(terrain, tmp_path):
+    places = [
+        {"name": "Valley", "latitude": 46.5, "longitude": 7.5},
+        {"name": "Elsewhere", "latitude": 51.9, "longitude": 4.4},
+    ]
+    light = place_light(places, date(2025, 6, 21), dem=terrain, cache=HorizonCache(str(tmp_path)))
+
+    assert list(light) == ["Valley"]
+    assert light["Valley"]["max_horizon_degrees"] > 10
+
+
+def test_files_that_are_not_tiles_count_as_missing(tmp_path):
+    (tmp_path / "N10E010.hgt").write_bytes(b"\x00" * 100)
+    with pytest.raises(ValueError, match="not an SRTM tile"):
+        DemTile(str(tmp_path / "N10E010.hgt"), 10, 10)
+
+    tiles = DemTiles(str(tmp_path))
+    assert tiles.tile(10, 10) is None
+    assert not tiles.covers(10.5, 10.5)
@@ -0,0 +1,127 @@
+import random
+import time
+from datetime import datetime
+
+import pytest
+
+from shutterscout_ai.tools.itinerary.itinerary import TravelMatrix, light_factor, plan_day
+
+LOCATION = {
+    "latitude": 51.9181,
+    "longitude": 4.4739,
+    "city": "Rotterdam",
+    "region": "South Holland",
+    "country": "Netherlands",
+    "timezone": "Europe/Amsterdam",
+}
+
+DAY = {
+    "time": "2025-02-12T05:00:00Z",
+    "temperature_min": 1.7,
+    "temperature_max": 6.2,
+    "cloud_cover": 40,
+    "precipitation_probability": 0,
+    "visibility": 20.0,
+    "sunrise_time": "2025-02-12T06:59:00Z",
+    "sunset_time": "2025-02-12T16:54:00Z",
+    "wind_speed": 1.6,
+    "humidity": 92,
+}
+
+
+def place(name, latitude, longitude):
+    return {"name": name, "latitude": latitude, "longitude": longitude}
+
+
+def photos(views):
+    return [{"id": "1", "title": "Photo", "url": "https://live.staticflickr.com/1/1_a.jpg", "views": views}]
+
+
+def test_travel_matrix_is_symmetric_road_estimate():
+    matrix = TravelMatrix.from_points([(51.9181, 4.4739), (52.3676, 4.9041)], speed_kmh=60.0, detour_factor=1.0)
+
+    assert matrix.distance_km[0][1] == matrix.distance_km[1][0] == pytest.approx(57.8, abs=0.5)
+    assert matrix.travel_minutes[0][1] == pytest.approx(matrix.distance_km[0][1])
+    assert matrix.distance_km[0][0] == 0.0
+
+
+def test_light_factor_prefers_some_cloud_over_overcast_and_rain():
+    assert light_factor(DAY) == 1.0
+    assert light_factor({**DAY, "cloud_cover": 5}) < 1.0
+    assert light_factor({**DAY, "cloud_cover": 100, "precipitation_probability": 80}) < 0.2
+
+
+def test_every_visit_starts_inside_a_light_window():
+    places = [place(f"Spot {i}", 51.9181 + i * 0.01, 4.4739 + i * 0.01) for i in range(8)]
+    plan = plan_day(LOCATION, [DAY], places, {"Spot 3": photos(10000)})
+
+    windows = {window["name"]: window for window in plan["windows"]}
+    assert plan["date"] == "2025-02-12"
+    assert windows["golden_morning"]["start"] == "2025-02-12T07:59+01:00"
+    assert plan["visits"]
+    for visit in plan["visits"]:
+        window = windows[visit["window"]]
+        assert window["start"] <= visit["start"] and visit["end"] <= window["end"]
+    for earlier, later in zip(plan["visits"], plan["visits"][1:]):
+        assert earlier["end"] <= later["arrival"]
+    assert "Spot 3" in [visit["place"] for visit in plan["visits"]]
+    assert len(plan["visits"]) + len(plan["unvisited"]) == len(places)
+
+
+def test_unreachable_places_are_left_out():
+    near = place("Near", 51.92, 4.48)
+    far = place("Far", 40.4168, -3.7038)
+    plan = plan_day(LOCATION, [DAY], [far, near], {"Far": photos(10**6)})
+
+    assert [visit["place"] for visit in plan["visits"]] == ["Near"]
+    assert plan["unvisited"] == ["Far"]
+
+
+def test_travel_time_between_stops_is_respected():
+    # Two places an hour apart: both fit in the evening, but not back to back in the morning window
+    matrix = TravelMatrix([[0, 0, 0], [0, 0, 0], [0, 0, 0]], [[0, 1, 1], [1, 0, 60], [1, 60, 0]])
+    plan = plan_day(LOCATION, [DAY], [place("A", 0, 0), place("B", 0, 0)], service_minutes=30, matrix=matrix)
+
+    assert len(plan["visits"]) == 2
+    first, second = plan["visits"]
+    gap = datetime.fromisoformat(second["arrival"]) - datetime.fromisoformat(first["end"])
+    assert gap.total_seconds() == 3600
+    assert first["window"] != second["window"]
+
+
+def test_invalid_day_or_matrix_raises():
+    with pytest.raises(ValueError, match="No forecast for day 2"):
+        plan_day(LOCATION, [DAY], [], day=2)
+    with pytest.raises(ValueError, match="Travel matrix covers"):
+        plan_day(LOCATION, [DAY], [place("A", 0, 0)], matrix=TravelMatrix([[0.0]], [[0.0]]))
+
+
+def test_plans_sixty_places_quickly():
+    rng = random.Random(7)
+    # Close together with short stops, so most of them fit in the day's windows and the route gets long
+    places = [place(f"Spot {i}", 51.9 + rng.uniform(-0.02, 0.02), 4.47 + rng.uniform(-0.03, 0.03)) for i in range(60)]
+    photos_by_place = {spot["name"]: photos(rng.randint(0, 50000)) for spot in places}
+
+    start = time.perf_counter()
+    plan = plan_day(LOCATION, [DAY], places, photos_by_place, service_minutes=5)
+
+    assert time.perf_counter() - start < 1.0
+    assert len(plan["visits"]) >= 25
+
+
+def test_terrain_sun_times_shorten_golden_windows():
+    places = [place(f"Spot {i}", 0, 0) for i in range(6)]
+    size = len(places) + 1
+    matrix = TravelMatrix([[0.0] * size for _ in range(size)], [[0.0] * size for _ in range(size)])
+    open_sky = plan_day(LOCATION, [DAY], places, matrix=matrix)
+
+    # A skyline that hides the sun for the whole golden hour, morning and evening
+    hidden = {spot["name"]: ("2025-02-12T07:59:00Z", "2025-02-12T15:54:00Z") for spot in places}
+    valley = plan_day(LOCATION, [DAY], places, matrix=matrix, sun_by_place=hidden)
+
+    assert len(open_sky["visits"]) == 6
+    assert {visit["window"] for visit in valley["visits"]} == {"blue_morning", "blue_evening"}
+
+    # In shadow all day is not the same as no terrain data: golden hour is gone too
+    shadow = plan_day(LOCATION, [DAY], places, matrix=matrix, sun_by_place=dict.fromkeys(hidden))
+    assert {visit["window"] for visit in shadow["visits"]} == {"blue_morning", "blue_evening"}
@@ -2,7 +2,14 @@ from unittest.mock import patch
 
 import pytest
 
-from shutterscout_ai.tools.location.location import get_location
+from shutterscout_ai.tools.location.location import _location_ttl, clear_location_cache, get_location
+
+
+@pytest.fixture(autouse=True)
+def empty_location_cache():
+    clear_location_cache()
+    yield
+    clear_location_cache()
 
 
 @pytest.fixture
@@ -41,3 +48,52 @@ def test_get_location_error():
         
         with pytest.raises(Exception):
             get_location()
+
+
+def test_get_location_is_cached(mock_location_response):
+    """Test that repeat lookups for the same IP are served from the cache"""
+    with patch("requests.get") as mock_get:
+        mock_get.return_value.json.return_value = mock_location_response
+
+        first = get_location()
+        first["city"] = "Mutated"
+        second = get_location()
+
+        assert mock_get.call_count == 1
+        assert second["city"] == "Vlaardingen"
+
+
+def test_get_location_for_ip_address(mock_location_response):
+    """Test lookups for an explicit IP address use the per-IP endpoint"""
+    with patch("requests.get") as mock_get:
+        mock_get.return_value.json.return_value = mock_location_response
+
+        get_location(ip_address="213.93.94.134")
+
+        assert mock_get.call_args[0][0] == "https://ipapi.co/213.93.94.134/json/"
+
+
+def test_get_location_override_skips_lookup():
+    """Test explicit coordinates are returned without calling the API"""
+    with patch("requests.get") as mock_get:
+        result = get_location(latitude=48.8584, longitude=2.2945, place_name="Paris")
+
+        mock_get.assert_not_called()
+        assert result["latitude"] == 48.8584
+        assert result["longitude"] == 2.2945
+        assert result["city"] == "Paris"
+
+
+def test_get_location_override_requires_both_coordinates():
+    """Test a single coordinate is rejected"""
+    with pytest.raises(ValueError, match="latitude and longitude must be given together"):
+        get_location(latitude=48.8584)
+
+
+@pytest.mark.parametrize(
+    "configured, expected", [("", 3600.0), ("0", 0.0), ("600", 600.0), ("1h", 3600.0), ("-5", 3600.0)]
+)
+def test_location_ttl_falls_back_on_malformed_values(monkeypatch, configured, expected):
+    """Test a bad SHUTTERSCOUT_LOCATION_TTL uses the default instead of breaking imports"""
+    monkeypatch.setenv("SHUTTERSCOUT_LOCATION_TTL", configured)
+    assert _location_ttl() == expected
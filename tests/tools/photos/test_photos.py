@@ -2,7 +2,13 @@ import os
 
 import pytest
 
-from shutterscout_ai.tools.photos.photos import PhotoSize, get_photo_urls, search_flickr_photos
+from shutterscout_ai.tools.photos.photos import (
+    PhotoSize,
+    deduplicate_photos,
+    get_photo_urls,
+    rank_photos,
+    search_flickr_photos,
+)
 
 
 def test_search_flickr_photos_missing_api_key():
@@ -60,3 +66,43 @@ def test_get_photo_urls_with_size():
     urls = get_photo_urls(sample_photos, PhotoSize.LARGE_SQUARE)
     assert len(urls) == 1
     assert urls[0]["url"] == "https://farm66.staticflickr.com/789/123_abc_q.jpg"
+
+
+def test_get_photo_urls_keeps_ranking_extras():
+    sample_photos = [
+        {
+            "id": "123",
+            "secret": "abc",
+            "server": "789",
+            "farm": 66,
+            "title": "Test",
+            "views": "42",
+            "datetaken": "2024-05-01 06:12:00",
+        }
+    ]
+
+    urls = get_photo_urls(sample_photos)
+    assert urls[0]["views"] == 42
+    assert urls[0]["date_taken"] == "2024-05-01 06:12:00"
+
+
+def test_deduplicate_photos_ranks_and_drops_repeated_ids():
+    def photo(photo_id, views, date_taken):
+        return {"id": photo_id, "title": photo_id, "url": f"u{photo_id}", "views": views, "date_taken": date_taken}
+
+    photos_by_place = {
+        "Markthal": [photo("1", 10, "2024-01-01 08:00:00"), photo("2", 50, "2023-01-01 08:00:00")],
+        "Erasmusbrug": [photo("2", 50, "2023-01-01 08:00:00"), photo("3", 10, "2024-06-01 08:00:00")],
+        "Euromast": [photo("1", 10, "2024-01-01 08:00:00")],
+    }
+
+    result = deduplicate_photos(photos_by_place)
+
+    assert [p["id"] for p in result["Markthal"]] == ["2", "1"]
+    assert [p["id"] for p in result["Erasmusbrug"]] == ["3"]
+    assert "Euromast" not in result
+    assert [p["id"] for p in rank_photos([photo("a", 5, "2020"), photo("b", 5, "2024"), photo("c", 9, "")])] == [
+        "c",
+        "b",
+        "a",
+    ]
@@ -0,0 +1,147 @@
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+import requests
+from PIL import Image
+
+from shutterscout_ai.tools.photos.photos import PhotoSize
+from shutterscout_ai.tools.photos.thumbnails import (
+    ThumbnailCache,
+    collect_photo_assets,
+    difference_hash,
+    download_thumbnails,
+    hamming_distance,
+    thumbnail_url,
+)
+
+
+def jpeg(pattern: str, size: int = 150, quality: int = 90) -> bytes:
+    image = Image.new("L", (size, size))
+    for x in range(size):
+        for y in range(size):
+            if pattern == "gradient":
+                image.putpixel((x, y), (x * 255) // size)
+            else:
+                image.putpixel((x, y), 255 if (x // 15 + y // 15) % 2 else 0)
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def response(content: bytes, status: int = 200) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status
+    result._content = content
+    return result
+
+
+def photo(photo_id: str, views: int = 0, date_taken: str = "2024-01-01 08:00:00"):
+    return {
+        "id": photo_id,
+        "title": f"Photo {photo_id}",
+        "url": f"https://farm66.staticflickr.com/789/{photo_id}_abc.jpg",
+        "views": views,
+        "date_taken": date_taken,
+    }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ThumbnailCache(str(tmp_path / "thumbnails"))
+
+
+def test_thumbnail_url():
+    assert thumbnail_url(photo("123")) == "https://farm66.staticflickr.com/789/123_abc_q.jpg"
+    assert (
+        thumbnail_url({**photo("123"), "url": "https://farm66.staticflickr.com/789/123_abc_q.jpg"}, PhotoSize.MEDIUM)
+        == "https://farm66.staticflickr.com/789/123_abc.jpg"
+    )
+    with pytest.raises(ValueError, match="Not a Flickr static photo URL"):
+        thumbnail_url({**photo("123"), "url": "https://example.com/a.png"})
+
+
+def test_cache_is_content_addressed_and_size_bounded(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=250)
+    first = cache.put("https://a", b"x" * 100)
+    assert cache.put("https://b", b"x" * 100) == first
+    assert cache.total_bytes == 100
+
+    cache.put("https://c", b"y" * 100)
+    cache.get("https://a")  # most recently used now
+    cache.put("https://d", b"z" * 100)
+
+    assert cache.total_bytes <= 250
+    assert cache.get("https://a") == first
+    assert cache.get("https://c") is None
+    # The index is written on flush, merged with what other processes wrote meanwhile
+    other = ThumbnailCache(str(tmp_path), max_bytes=250)
+    other.put("https://e", b"z" * 100)
+    other.flush()
+    cache.flush()
+    reopened = ThumbnailCache(str(tmp_path), max_bytes=250)
+    assert reopened.get("https://d") is not None
+    assert reopened.get("https://e") == reopened.get("https://d")
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_eviction_leaves_room_for_later_puts(tmp_path):
+    cache = ThumbnailCache(str(tmp_path), max_bytes=1000)
+    for number in range(10):
+        cache.put(f"https://{number}", bytes([number]) * 100)
+    cache.put("https://10", b"z" * 100)
+    assert cache.total_bytes <= 900
+
+    # Below the low-water mark there is room again, so the next put does not rescan the directory
+    with patch.object(ThumbnailCache, "_blobs", side_effect=AssertionError("cache rescanned")):
+        cache.put("https://11", b"y" * 100)
+    assert cache.get("https://11") is not None
+
+
+def test_download_thumbnails_uses_cache_and_skips_failures(cache):
+    def fake_get(url, **kwargs):
+        return response(b"", 404) if "2_abc" in url else response(jpeg("gradient"))
+
+    with patch("requests.get", side_effect=fake_get) as mock_get:
+        paths = download_thumbnails([photo("1"), photo("2")], cache=cache)
+        assert list(paths) == ["1"]
+
+        download_thumbnails([photo("1")], cache=cache)
+        assert mock_get.call_count == 2
+
+    # A cache that cannot be written to only skips those thumbnails
+    with (
+        patch("requests.get", return_value=response(jpeg("gradient"))),
+        patch.object(cache, "put", side_effect=OSError("No space left on device")),
+    ):
+        assert list(download_thumbnails([photo("1"), photo("3")], cache=cache)) == ["1"]
+
+
+def test_difference_hash_tolerates_recompression(tmp_path):
+    original, recompressed, different = tmp_path / "a.jpg", tmp_path / "b.jpg", tmp_path / "c.jpg"
+    original.write_bytes(jpeg("gradient"))
+    recompressed.write_bytes(jpeg("gradient", size=100, quality=40))
+    different.write_bytes(jpeg("checkerboard"))
+
+    assert hamming_distance(difference_hash(str(original)), difference_hash(str(recompressed))) <= 6
+    assert hamming_distance(difference_hash(str(original)), difference_hash(str(different))) > 6
+    assert difference_hash(str(tmp_path)) is None
+
+
+def test_collect_photo_assets_merges_duplicates_across_places(cache):
+    images = {"1": jpeg("gradient"), "2": jpeg("gradient", size=100, quality=40), "3": jpeg("checkerboard")}
+
+    def fake_get(url, **kwargs):
+        return response(images[url.rsplit("/", 1)[1].split("_")[0]])
+
+    photos_by_place = {
+        "Markthal": [photo("1", views=10), photo("3", views=5)],
+        "Erasmusbrug": [photo("2", views=90), photo("1", views=10)],
+    }
+    with patch("requests.get", side_effect=fake_get):
+        assets = collect_photo_assets(photos_by_place, cache=cache, processes=2)
+
+    assert [asset["id"] for asset in assets] == ["2", "3"]
+    assert assets[0]["places"] == ["Erasmusbrug", "Markthal"]
+    assert assets[0]["thumbnail_path"].startswith(cache.directory)
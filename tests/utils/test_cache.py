@@ -0,0 +1,66 @@
+import pytest
+
+from shutterscout_ai.utils import instrumentation
+from shutterscout_ai.utils.cache import TTLCache
+from shutterscout_ai.utils.instrumentation import CACHE_HITS_TOTAL, CACHE_MISSES_TOTAL
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache("test", ttl=10, clock=clock)
+    cache.set("key", "value")
+
+    clock.now = 9.9
+    assert cache.get("key") == "value"
+    clock.now = 10.0
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache("test", ttl=10, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_get_or_set_does_not_cache_failures():
+    cache = TTLCache("test", ttl=10)
+
+    def failing():
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_set("key", failing)
+    assert cache.get_or_set("key", lambda: "value") == "value"
+    assert cache.get_or_set("key", failing) == "value"
+
+
+def test_zero_ttl_disables_caching():
+    cache = TTLCache("test", ttl=0)
+    cache.set("key", "value")
+    assert cache.get("key") is None
+
+
+def test_hits_and_misses_are_counted():
+    instrumentation.metrics.reset()
+    cache = TTLCache("counted", ttl=10)
+    cache.get("key")
+    cache.set("key", "value")
+    cache.get("key")
+
+    assert instrumentation.metrics.counter_value(CACHE_MISSES_TOTAL, cache="counted") == 1
+    assert instrumentation.metrics.counter_value(CACHE_HITS_TOTAL, cache="counted") == 1
@@ -0,0 +1,88 @@
+import io
+import json
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from shutterscout_ai.utils import decoding
+from shutterscout_ai.utils.decoding import Projection, decode_json, project
+
+DOCUMENT = {
+    "timelines": {
+        "daily": [
+            {"time": "t1", "values": {"temperatureMin": 1.5, "uvIndex": 3}, "extra": [1, 2]},
+            {"time": "t2", "values": {"temperatureMin": 2.5, "uvIndex": 4}},
+        ],
+        "hourly": [{"time": "h1"}],
+    },
+    "location": {"lat": 1.0},
+}
+
+PROJECTION = Projection(("timelines.daily[].time", "timelines.daily[].values.temperatureMin"))
+EXPECTED = {
+    "timelines": {
+        "daily": [
+            {"time": "t1", "values": {"temperatureMin": 1.5}},
+            {"time": "t2", "values": {"temperatureMin": 2.5}},
+        ]
+    }
+}
+
+
+def _buffered_response(payload: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = payload
+    response._content_consumed = True
+    return response
+
+
+def _streamed_response(payload: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(payload)
+    return response
+
+
+def test_project_keeps_nesting_and_drops_other_fields():
+    assert project(DOCUMENT, PROJECTION.tree) == EXPECTED
+
+
+def test_project_leaves_missing_keys_missing():
+    assert project({"other": 1}, PROJECTION.tree) == {}
+
+
+def test_stream_prefix():
+    assert PROJECTION.stream_prefix() == "timelines.daily"
+    assert Projection(("stat", "photos.photo[].id")).stream_prefix() is None
+
+
+def test_decode_json_buffered_response():
+    response = _buffered_response(json.dumps(DOCUMENT).encode())
+    assert decode_json(response, PROJECTION) == EXPECTED
+    assert decode_json(response) == DOCUMENT
+
+
+@pytest.mark.skipif(decoding.ijson is None, reason="ijson with a C backend is not installed")
+def test_decode_json_streamed_response_matches_buffered():
+    payload = json.dumps(DOCUMENT).encode()
+    assert decode_json(_streamed_response(payload), PROJECTION) == EXPECTED
+    assert decode_json(_streamed_response(b'{"other": []}'), PROJECTION) == {}
+
+
+def test_decode_json_falls_back_to_response_json():
+    response = MagicMock()
+    response.json.return_value = DOCUMENT
+    assert decode_json(response, PROJECTION) == EXPECTED
+
+
+def test_decode_json_invalid_body():
+    with pytest.raises(ValueError, match="Invalid JSON in response"):
+        decode_json(_buffered_response(b"{not json"), PROJECTION)
+
+
+def test_json_backend_override(monkeypatch):
+    monkeypatch.setenv("SHUTTERSCOUT_JSON_BACKEND", "json")
+    assert decoding.json_backend() == "json"
+    assert decoding.loads(b'{"a": 1}') == {"a": 1}
@@ -0,0 +1,110 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from shutterscout_ai.utils import instrumentation
+from shutterscout_ai.utils.exporters import OTelExporter, render_json, render_prometheus
+from shutterscout_ai.utils.http import fetch
+from shutterscout_ai.utils.instrumentation import (
+    HTTP_REQUESTS_TOTAL,
+    MetricsRegistry,
+    add_span_exporter,
+    remove_span_exporter,
+    span,
+    submit_traced,
+)
+
+
+@pytest.fixture
+def exporter():
+    exporter = OTelExporter()
+    add_span_exporter(exporter)
+    instrumentation.metrics.reset()
+    yield exporter
+    remove_span_exporter(exporter)
+
+
+def test_nested_spans_share_trace(exporter):
+    with span("outer") as outer:
+        with span("inner", key="value"):
+            pass
+
+    inner, finished_outer = exporter.drain()
+    assert inner.name == "inner"
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_id == outer.span_id
+    assert inner.attributes == {"key": "value"}
+    assert finished_outer.parent_id is None
+
+
+def test_span_records_error(exporter):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("bad input")
+
+    (failed,) = exporter.drain()
+    assert failed.error == "ValueError: bad input"
+
+
+def test_submit_traced_propagates_parent(exporter):
+    with span("parent") as parent, ThreadPoolExecutor(max_workers=2) as executor:
+        assert submit_traced(executor, "child", lambda x: x * 2, 21).result() == 42
+
+    child = next(s for s in exporter.drain() if s.name == "child")
+    assert child.parent_id == parent.span_id
+
+
+def test_disabled_instrumentation_records_nothing(exporter):
+    instrumentation.set_enabled(False)
+    try:
+        with span("ignored") as current:
+            assert current is None
+    finally:
+        instrumentation.set_enabled(True)
+    assert exporter.drain() == []
+
+
+def test_render_prometheus():
+    registry = MetricsRegistry()
+    registry.describe("requests_total", "Requests")
+    registry.increment("requests_total", tool="weather")
+    registry.increment("requests_total", 2, tool="weather")
+    registry.observe("latency_ms", 30.0, buckets=(10, 50), tool="weather")
+    registry.observe("latency_ms", 70.0, buckets=(10, 50), tool="weather")
+
+    text = render_prometheus(registry)
+
+    assert "# HELP requests_total Requests" in text
+    assert 'requests_total{tool="weather"} 3' in text
+    assert 'latency_ms_bucket{tool="weather",le="10"} 0' in text
+    assert 'latency_ms_bucket{tool="weather",le="50"} 1' in text
+    assert 'latency_ms_bucket{tool="weather",le="+Inf"} 2' in text
+    assert 'latency_ms_count{tool="weather"} 2' in text
+
+
+def test_render_otel_metrics_and_json():
+    registry = MetricsRegistry()
+    registry.increment("hits", cache="location")
+    registry.observe("latency_ms", 3.0, buckets=(5,))
+
+    document = OTelExporter().render_metrics(registry)
+    names = [m["name"] for m in document["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]]
+    assert names == ["hits", "latency_ms"]
+
+    summary = render_json(registry)
+    assert summary["counters"]["hits"] == [{"labels": {"cache": "location"}, "value": 1.0}]
+    assert summary["histograms"]["latency_ms"][0]["buckets"] == {"5": 1, "+Inf": 1}
+
+
+def test_fetch_records_request_metrics(exporter):
+    with patch("requests.get") as mock_get:
+        mock_get.return_value = MagicMock(status_code=200, _content=b"x" * 10)
+
+        fetch("get_weather_forecast", "https://example.com", params={"a": 1})
+
+        mock_get.assert_called_once_with("https://example.com", params={"a": 1})
+
+    assert instrumentation.metrics.counter_value(HTTP_REQUESTS_TOTAL, tool="get_weather_forecast", outcome="200") == 1
+    (http_span,) = exporter.drain()
+    assert http_span.attributes["http.response_bytes"] == 10
@@ -0,0 +1,51 @@
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from shutterscout_ai.utils.http import fetch
+from shutterscout_ai.utils.profiling import ProfileSession, SamplingProfiler
+
+
+def _busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampling_profiler_collects_folded_stacks():
+    sampler = SamplingProfiler(interval=0.001)
+    sampler.start()
+    _busy_wait(0.05)
+    sampler.stop()
+
+    assert sampler.samples > 0
+    folded = sampler.folded()
+    assert "_busy_wait" in folded
+    first_line = folded.splitlines()[0]
+    assert first_line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_profile_session_writes_outputs_and_attributes_requests(tmp_path):
+    with patch("requests.get") as mock_get:
+        mock_get.return_value = MagicMock(status_code=200, _content=b"{}" * 50)
+
+        with ProfileSession(["cprofile", "sampling", "memory"], output_dir=str(tmp_path), interval=0.001) as session:
+            fetch("get_weather_forecast", "https://example.com")
+            fetch("get_weather_forecast", "https://example.com")
+            fetch("get_location", "https://example.com")
+            _busy_wait(0.02)
+
+    assert sorted(os.listdir(tmp_path)) == ["cprofile.prof", "memory.txt", "sampling.folded", "summary.txt"]
+
+    attribution = {entry["tool"]: entry for entry in session.request_attribution()}
+    assert attribution["get_weather_forecast"]["requests"] == 2
+    assert attribution["get_weather_forecast"]["bytes"] == 200
+    assert attribution["get_location"]["requests"] == 1
+    assert "Outbound requests by tool" in session.summary
+
+
+def test_profile_session_rejects_unknown_mode():
+    with pytest.raises(ValueError, match="Unknown profile modes: perf"):
+        ProfileSession(["perf"])
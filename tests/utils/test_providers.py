@@ -0,0 +1,169 @@
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from shutterscout_ai.tools.weather.weather import get_weather_forecast
+from shutterscout_ai.utils.instrumentation import PROVIDER_CALLS_TOTAL, PROVIDER_RETRIES_TOTAL, metrics
+from shutterscout_ai.utils.providers import ProviderRegistry
+
+
+class StubProvider:
+    def __init__(self, name, result=None, error=None, delay=0.0):
+        self.name = name
+        self.result = result
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def fetch(provider):
+    return provider.fetch()
+
+
+def test_failover_tries_providers_in_configured_order():
+    first = StubProvider("first", error=RuntimeError("down"))
+    second = StubProvider("second", result=["ok"])
+    third = StubProvider("third", result=["unused"])
+    registry = ProviderRegistry("test", [first, second, third], defaults=("first", "second", "third"))
+
+    assert registry.call(fetch) == ["ok"]
+    assert (first.calls, second.calls, third.calls) == (1, 1, 0)
+
+
+def test_last_error_is_raised_unchanged_when_every_provider_fails():
+    error = ValueError("bad key")
+    registry = ProviderRegistry("test", [StubProvider("a", error=RuntimeError("down")), StubProvider("b", error=error)])
+
+    with pytest.raises(ValueError) as excinfo:
+        registry.call(fetch)
+    assert excinfo.value is error
+
+
+def test_first_invalid_answer_is_returned_when_none_is_valid():
+    registry = ProviderRegistry("test", [StubProvider("a", result=[]), StubProvider("b", result=[])])
+    assert registry.call(fetch) == []
+
+
+def test_slow_or_failing_providers_move_down_the_order():
+    slow = StubProvider("slow", result=["slow"], delay=0.05)
+    fast = StubProvider("fast", result=["fast"])
+    registry = ProviderRegistry("test", [slow, fast])
+
+    # Both get measured once: "slow" answers the first call, "fast" is still unmeasured for the second
+    assert registry.call(fetch) == ["slow"]
+    assert registry.call(fetch) == ["fast"]
+    assert [provider.name for provider in registry.ordered()] == ["fast", "slow"]
+
+    fast.error = RuntimeError("down")
+    for _ in range(3):
+        assert registry.call(fetch) == ["slow"]
+    assert registry.ordered()[0].name == "slow"
+
+
+def test_race_returns_first_valid_answer(monkeypatch):
+    monkeypatch.setenv("SHUTTERSCOUT_TEST_POLICY", "race")
+    release = threading.Event()
+    slow = StubProvider("slow", result=["slow"])
+    slow.fetch = lambda: release.wait(5) and ["slow"]
+    fast = StubProvider("fast", result=["fast"])
+    registry = ProviderRegistry("test", [slow, fast])
+
+    try:
+        assert registry.call(fetch) == ["fast"]
+    finally:
+        release.set()
+
+
+def test_race_skips_invalid_answers(monkeypatch):
+    monkeypatch.setenv("SHUTTERSCOUT_TEST_POLICY", "race")
+    empty = StubProvider("empty", result=[])
+    slow = StubProvider("slow", result=["slow"], delay=0.02)
+    registry = ProviderRegistry("test", [empty, slow])
+
+    assert registry.call(fetch) == ["slow"]
+
+
+def test_providers_and_policy_come_from_environment(monkeypatch):
+    registry = ProviderRegistry("test", [StubProvider("a"), StubProvider("b")], defaults=("a",))
+    assert [provider.name for provider in registry.enabled()] == ["a"]
+
+    monkeypatch.setenv("SHUTTERSCOUT_TEST_PROVIDERS", "b, a")
+    assert [provider.name for provider in registry.enabled()] == ["b", "a"]
+
+    monkeypatch.setenv("SHUTTERSCOUT_TEST_PROVIDERS", "a,missing")
+    with pytest.raises(ValueError, match="Unknown test providers: missing"):
+        registry.enabled()
+
+    monkeypatch.setenv("SHUTTERSCOUT_TEST_POLICY", "random")
+    with pytest.raises(ValueError, match="Unknown test provider policy"):
+        registry.policy()
+
+
+def test_duplicate_provider_names_are_rejected():
+    registry = ProviderRegistry("test", [StubProvider("a")])
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register(StubProvider("a"))
+
+
+def test_calls_are_counted_by_outcome():
+    metrics.reset()
+    registry = ProviderRegistry("test", [StubProvider("a", error=RuntimeError("down")), StubProvider("b", result=[1])])
+    registry.call(fetch)
+
+    assert metrics.counter_value(PROVIDER_CALLS_TOTAL, kind="test", provider="a", outcome="error") == 1
+    assert metrics.counter_value(PROVIDER_CALLS_TOTAL, kind="test", provider="b", outcome="ok") == 1
+    assert metrics.counter_value(PROVIDER_RETRIES_TOTAL, kind="test") == 1
+
+    registry.call(fetch)
+    # The failing provider now ranks last, so the next call needs no retry
+    assert metrics.counter_value(PROVIDER_RETRIES_TOTAL, kind="test") == 1
+
+
+def test_weather_falls_back_to_open_meteo(monkeypatch):
+    monkeypatch.delenv("TOMORROW_API_KEY", raising=False)
+    monkeypatch.setenv("SHUTTERSCOUT_WEATHER_PROVIDERS", "tomorrow,open-meteo")
+    open_meteo = {
+        "daily": {
+            "time": ["2025-02-12"],
+            "temperature_2m_min": [1.7],
+            "temperature_2m_max": [6.2],
+            "cloud_cover_mean": [93],
+            "precipitation_probability_mean": [1],
+            "visibility_mean": [13440.0],
+            "sunrise": ["2025-02-12T06:59"],
+            "sunset": ["2025-02-12T16:54"],
+            "wind_speed_10m_mean": [1.6],
+            "relative_humidity_2m_mean": [92],
+        }
+    }
+    with patch("requests.get") as mock_get:
+        mock_response = MagicMock()
+        mock_response.json.return_value = open_meteo
+        mock_get.return_value = mock_response
+
+        result = get_weather_forecast(51.9187, 4.364)
+
+    assert "api.open-meteo.com" in mock_get.call_args[0][0]
+    assert result == [
+        {
+            "time": "2025-02-12T00:00:00Z",
+            "temperature_min": 1.7,
+            "temperature_max": 6.2,
+            "cloud_cover": 93,
+            "precipitation_probability": 1,
+            "visibility": 13.44,
+            "sunrise_time": "2025-02-12T06:59:00Z",
+            "sunset_time": "2025-02-12T16:54:00Z",
+            "wind_speed": 1.6,
+            "humidity": 92,
+        }
+    ]
@@ -0,0 +1,139 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from shutterscout_ai.benchmarks.fixtures import replay_providers
+from shutterscout_ai.tools.itinerary.itinerary import plan_day
+from shutterscout_ai.watch.watcher import JsonlAlertSink, Watcher, weather_changed
+
+SPOTS = [
+    {"latitude": 51.9181, "longitude": 4.4739, "place_name": "Rotterdam"},
+    {"latitude": 48.8566, "longitude": 2.3522, "place_name": "Paris"},
+]
+
+
+@pytest.fixture
+def watched(tmp_path):
+    """A watcher after its first cycle against the recorded (overcast) forecasts"""
+    alerts = tmp_path / "alerts.jsonl"
+    watcher = Watcher(SPOTS, str(tmp_path / "state"), JsonlAlertSink(str(alerts)))
+    with replay_providers(latency_scale=0):
+        stats = watcher.run_cycle()
+    assert (stats["added"], stats["alerts"]) == (2, 0)
+    return watcher, alerts
+
+
+def clearing_in_paris(watcher):
+    """Weather poll where tomorrow clears up in Paris only"""
+    forecasts = {key: state["combined"]["weather"] for key, state in watcher.locations.items()}
+
+    def forecast(latitude, longitude):
+        weather = next(w for key, w in forecasts.items() if key.startswith(f"{latitude:.5f},{longitude:.5f}"))
+        if latitude < 50:
+            weather = [weather[0], {**weather[1], "cloud_cover": 40, "visibility": 20.0}] + weather[2:]
+        return weather
+
+    return forecast
+
+
+def test_later_cycles_only_poll_the_weather(watched):
+    watcher, _ = watched
+
+    with replay_providers(latency_scale=0) as transport:
+        stats = watcher.run_cycle()
+
+    assert (stats["polled"], stats["changed"], stats["alerts"]) == (2, 0, 0)
+    assert dict(transport.calls) == {"api.tomorrow.io": 2}
+
+
+def test_only_changed_locations_are_rescored_and_alerted(watched):
+    watcher, alerts = watched
+
+    with (
+        patch("shutterscout_ai.watch.watcher.get_weather_forecast", side_effect=clearing_in_paris(watcher)),
+        patch("shutterscout_ai.watch.watcher.plan_day", wraps=plan_day) as planned,
+    ):
+        stats = watcher.run_cycle()
+
+    assert (stats["changed"], stats["alerts"]) == (1, 1)
+    assert planned.call_count == 1
+    (alert,) = [json.loads(line) for line in alerts.read_text().splitlines()]
+    assert (alert["place_name"], alert["date"]) == ("Paris", "2025-02-13")
+    assert alert["score"] >= watcher.threshold > alert["previous_score"]
+    assert alert["itinerary"]["date"] == "2025-02-13"
+    # What is stored and handed to the model is tomorrow's plan, not the first cycle's plan for today
+    (paris,) = [state["combined"] for state in watcher.locations.values() if state["spec"]["place_name"] == "Paris"]
+    assert paris["itinerary"] == alert["itinerary"]
+    assert "horizon_light" not in paris
+
+
+def test_recommendations_see_tomorrows_itinerary(watched):
+    watcher, _ = watched
+    watcher.recommend = True
+
+    with (
+        patch("shutterscout_ai.watch.watcher.get_weather_forecast", side_effect=clearing_in_paris(watcher)),
+        patch("shutterscout_ai.watch.watcher.get_location_recommendations", return_value="# Go") as recommend,
+    ):
+        watcher.run_cycle()
+
+    combined = recommend.call_args.kwargs["combined_data"]
+    assert combined["itinerary"]["date"] == "2025-02-13"
+    assert "horizon_light" not in combined
+
+
+def test_restarted_watch_does_not_repeat_alerts(watched):
+    watcher, alerts = watched
+    forecast = clearing_in_paris(watcher)
+    with patch("shutterscout_ai.watch.watcher.get_weather_forecast", side_effect=forecast):
+        watcher.run_cycle()
+
+        restarted = Watcher(SPOTS, watcher.state_dir, JsonlAlertSink(str(alerts)))
+        stats = restarted.run_cycle()
+
+    assert (stats["added"], stats["changed"], stats["alerts"]) == (0, 0, 0)
+    assert len(alerts.read_text().splitlines()) == 1
+
+
+def test_failures_while_evaluating_only_skip_that_location(watched):
+    watcher, alerts = watched
+    forecast = clearing_in_paris(watcher)
+
+    def broken_forecast(latitude, longitude):
+        weather = forecast(latitude, longitude)
+        return weather if latitude < 50 else [weather[0], {**weather[1], "cloud_cover": None}] + weather[2:]
+
+    def full_disk(alert):
+        raise OSError("No space left on device")
+
+    watcher.sink = full_disk
+    with patch("shutterscout_ai.watch.watcher.get_weather_forecast", side_effect=broken_forecast):
+        stats = watcher.run_cycle()
+        assert (stats["polled"], stats["failed"], stats["alerts"]) == (2, 2, 0)
+
+        # Nothing was stored for the failed alert, so it is sent once the sink works again
+        watcher.sink = JsonlAlertSink(str(alerts))
+        stats = watcher.run_cycle()
+    assert (stats["changed"], stats["alerts"], stats["failed"]) == (1, 1, 1)
+    assert len(alerts.read_text().splitlines()) == 1
+
+
+def test_small_forecast_changes_are_ignored():
+    day = {
+        "time": "2025-02-13T05:00:00Z",
+        "temperature_min": 2.7,
+        "temperature_max": 7.2,
+        "cloud_cover": 83,
+        "precipitation_probability": 1,
+        "visibility": 13.44,
+        "sunrise_time": "2025-02-13T06:59:00Z",
+        "sunset_time": "2025-02-13T16:54:00Z",
+        "wind_speed": 1.6,
+        "humidity": 92,
+    }
+    today = {**day, "time": "2025-02-12T05:00:00Z"}
+
+    assert not weather_changed([today, day], [today, {**day, "cloud_cover": 80, "visibility": 13.0}])
+    assert weather_changed([today, day], [today, {**day, "cloud_cover": 70}])
+    assert weather_changed([today, day], [day, {**day, "time": "2025-02-14T05:00:00Z"}])